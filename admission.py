@@ -0,0 +1,169 @@
+"""
+Admission control for the inference endpoints
+
+Each worker process runs at most ADMISSION_CONCURRENCY detection/embedding
+passes at once. Requests beyond that wait in a priority queue - attendance
+capture (/recognize) before the live overlay (/detect_face) before
+enrolment (/add_student) - and are shed quickly instead of piling up inside
+the WSGI server until they time out:
+
+- 429 when the request's class already has its maximum number of requests
+  queued (clients are sending faster than this worker can serve)
+- 503 when the request waited its class's maximum time without a slot
+
+Both come with a Retry-After estimated from the queue ahead and the recent
+inference time. The last ADMISSION_RESERVED slot(s) only ever go to
+attendance captures, so a burst of overlay polls can't delay a capture.
+
+Limits are per process; under gunicorn each worker admits its own.
+"""
+
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+ADMISSION_CONCURRENCY = int(os.environ.get('ADMISSION_CONCURRENCY', 2))
+ADMISSION_RESERVED = int(os.environ.get('ADMISSION_RESERVED', 1))
+
+# Lower number = served first
+PRIORITIES = {'attendance': 0, 'overlay': 1, 'enrolment': 2}
+
+# Priority class -> (max requests queued, max seconds to wait for a slot)
+CLASS_LIMITS = {
+    'attendance': (32, 10.0),
+    'overlay': (4, 0.25),  # A frame that waited longer is stale anyway
+    'enrolment': (4, 30.0),
+}
+
+
+class Overloaded(Exception):
+    """A request was shed; status is 429 or 503, retry_after is in seconds"""
+
+    def __init__(self, priority_class, status, retry_after):
+        super().__init__(f"{priority_class} request shed with {status}")
+        self.priority_class = priority_class
+        self.status = status
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bounded inference concurrency with priority classes and fast load shedding"""
+
+    def __init__(self, concurrency=ADMISSION_CONCURRENCY, reserved=ADMISSION_RESERVED, limits=None):
+        self.concurrency = max(1, concurrency)
+        self.reserved = max(0, min(reserved, self.concurrency - 1))
+        self.limits = dict(CLASS_LIMITS if limits is None else limits)
+        self.in_flight = 0
+        self.service_seconds = None  # Smoothed time a slot is held
+        self.admitted = Counter()
+        self.rejected = Counter()  # (class, status) -> count
+        self._waiting = []  # Heap of (priority, sequence) tickets
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+    def capacity(self, priority_class):
+        """Slots a class may occupy (everything but the reserve, except for attendance)"""
+        return self.concurrency if PRIORITIES[priority_class] == 0 else self.concurrency - self.reserved
+
+    def retry_after(self, ahead):
+        """Whole seconds until roughly `ahead` queued requests have been served"""
+        service = self.service_seconds or 1.0
+        return max(1, math.ceil((ahead + 1) * service / self.concurrency))
+
+    def acquire(self, priority_class):
+        """Block until a slot is free for this class, or raise Overloaded"""
+        max_queued, max_wait = self.limits[priority_class]
+        ticket = (PRIORITIES[priority_class], next(self._sequence))
+        capacity = self.capacity(priority_class)
+
+        with self._cond:
+            if not self._waiting and self.in_flight < capacity:
+                self.in_flight += 1
+                self.admitted[priority_class] += 1
+                return
+
+            queued = sum(1 for priority, _ in self._waiting if priority == ticket[0])
+            if queued >= max_queued:
+                self._reject(priority_class, 429)
+
+            heapq.heappush(self._waiting, ticket)
+            deadline = time.monotonic() + max_wait
+            while self._waiting[0] != ticket or self.in_flight >= capacity:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()  # The head may have changed
+                    self._reject(priority_class, 503)
+                self._cond.wait(remaining)
+
+            heapq.heappop(self._waiting)
+            self.in_flight += 1
+            self.admitted[priority_class] += 1
+            self._cond.notify_all()  # The next ticket may fit in another free slot
+
+    def _reject(self, priority_class, status):
+        ahead = sum(1 for priority, _ in self._waiting if priority <= PRIORITIES[priority_class])
+        self.rejected[(priority_class, status)] += 1
+        raise Overloaded(priority_class, status, self.retry_after(ahead))
+
+    def release(self, held_seconds=None):
+        with self._cond:
+            self.in_flight -= 1
+            if held_seconds is not None:
+                self.service_seconds = (held_seconds if self.service_seconds is None
+                                        else self.service_seconds + 0.2 * (held_seconds - self.service_seconds))
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, priority_class, waiting=None):
+        """Hold a slot for the block; `waiting` is a context manager around the wait (e.g. a timer)"""
+        with waiting or nullcontext():
+            self.acquire(priority_class)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start)
+
+    def stats(self):
+        with self._cond:
+            waiting = Counter(priority for priority, _ in self._waiting)
+            return {
+                'concurrency': self.concurrency,
+                'reserved': self.reserved,
+                'in_flight': self.in_flight,
+                'waiting': {name: waiting[priority] for name, priority in PRIORITIES.items()},
+                'admitted': {name: self.admitted[name] for name in PRIORITIES},
+                'rejected': {name: {str(status): self.rejected[(name, status)] for status in (429, 503)}
+                             for name in PRIORITIES},
+            }
+
+    def render_prometheus(self):
+        stats = self.stats()
+        lines = [
+            "# HELP face_admission_in_flight Inference slots in use in this process",
+            "# TYPE face_admission_in_flight gauge",
+            f"face_admission_in_flight {stats['in_flight']}",
+            "# HELP face_admission_waiting Requests queued for an inference slot",
+            "# TYPE face_admission_waiting gauge",
+        ]
+        lines += [f'face_admission_waiting{{class="{name}"}} {count}' for name, count in stats['waiting'].items()]
+        lines += [
+            "# HELP face_admission_admitted_total Requests given an inference slot",
+            "# TYPE face_admission_admitted_total counter",
+        ]
+        lines += [f'face_admission_admitted_total{{class="{name}"}} {count}'
+                  for name, count in stats['admitted'].items()]
+        lines += [
+            "# HELP face_admission_rejected_total Requests shed with 429/503",
+            "# TYPE face_admission_rejected_total counter",
+        ]
+        lines += [f'face_admission_rejected_total{{class="{name}",status="{status}"}} {count}'
+                  for name, by_status in stats['rejected'].items() for status, count in by_status.items()]
+        return "\n".join(lines) + "\n"
@@ -1,16 +1,39 @@
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify, flash, send_from_directory
+from flask import Flask, Response, render_template, request, redirect, url_for, session, jsonify, flash, send_from_directory, has_request_context, g
 from flask_cors import CORS
-from datetime import datetime
-from deepface import DeepFace
+from datetime import date, datetime, timedelta
 import numpy as np
 import os
 import csv
+import functools
+import json
+import logging
+import threading
+import uuid
 import mysql.connector
 from PIL import Image
 import base64
 from io import BytesIO
-import cv2
+from contextlib import nullcontext
 from db import __get_db_connection
+from gallery import SharedGallery, build_identity_arrays, identities_within, nearest_identity
+import detectors
+import attendance_summary
+import attendance_partitions
+import migrations
+from frame_cache import FrameResultCache, ResultTokenStore, frame_hash
+from motion_gate import MotionGate
+from embedding_cache import EmbeddingCache
+from metrics import LatencyAverage, StageTimer, stage_metrics
+from logging_setup import configure_logging, get_logger
+from admission import AdmissionController, Overloaded
+from roster_cache import RosterCache
+
+log = get_logger('app')
+recognize_log = get_logger('recognize')
+detect_log = get_logger('detect')
+gallery_log = get_logger('gallery')
+register_log = get_logger('register')
+attendance_log = get_logger('attendance')
 
 app = Flask(__name__)
 app.secret_key = 'supersecretkey'
@@ -18,92 +41,404 @@ CORS(app)
 KNOWN_FACES_FOLDER = 'known_faces'
 
 # DeepFace configuration
-FACE_MODEL = 'Facenet'  # Good balance of accuracy and speed
-DETECTOR_BACKEND = 'opencv'  # Most reliable
+FACE_MODEL = 'Facenet'  # Default model; reembed.py switches the served model via app_settings
+DETECTOR_BACKEND = detectors.get_profile('attendance').backend  # Per-endpoint profiles live in detectors.py
 DISTANCE_THRESHOLD = 15.0  # Adjusted for real-world face recognition conditions
+FACE_REGION_MARGIN = 0.25  # Context kept around an overlay box so the aligned detector can find landmarks
+# Bump when preprocessing changes in a way that makes stored embeddings incomparable
+# (2: aligned retinaface crops for enrolment and attendance - run reembed.py to switch)
+EMBEDDING_VERSION = 2
+LEGACY_MODEL_TAG = 'Facenet/opencv/v1'  # Encodings stored before embeddings were tagged
+
+# Several embeddings per student: enrolment photos plus (optionally) confident attendance captures
+MAX_EMBEDDINGS_PER_STUDENT = 10
+GALLERY_AUGMENT = os.environ.get('GALLERY_AUGMENT', '0') == '1'
+AUGMENT_THRESHOLD = 6.0  # Only learn from captures this close to the student's existing embeddings
+AUGMENT_MIN_NOVELTY = 1.0  # ...but not near-duplicates of what we already have
+DUPLICATE_THRESHOLD = 3.0  # Registration refuses faces this close to a student (much stricter than attendance)
+DUPLICATE_REPORT_LIMIT = 3  # Closest matches logged for a refused registration
 # Force reload after removing fake images - CLEANED
 
-# Global storage for face embeddings and names
-known_face_embeddings = []
-known_face_names = []
+# Working frame sizes; the live pages downscale to these before upload (see /detection_config)
+DETECTION_FRAME_SIZE = (400, 300)  # /detect_face, matches the overlay canvas
+RECOGNITION_MAX_SIZE = (800, 800)  # /recognize
+UPLOAD_FORMATS = ['image/webp', 'image/jpeg']  # Browsers use the first one they can encode
+DETECTION_UPLOAD_QUALITY = 0.7
+RECOGNITION_UPLOAD_QUALITY = 0.9
+
+# Live-page detection polling (static/capture.js). Pages poll at POLL_INTERVAL_MS with one
+# request in flight; once /detect_face averages over DETECT_SLOW_MS in this worker, responses
+# carry a recommended_interval_ms that stretches the interval in proportion, up to the max.
+POLL_INTERVAL_MS = 500
+POLL_MAX_INTERVAL_MS = 5000
+DETECT_SLOW_MS = 250
+
+# Stage timings go to /metrics; send "X-Debug-Timing: 1" (or set this) to also get a Server-Timing header
+METRICS_DEBUG_HEADER = os.environ.get('METRICS_DEBUG_HEADER', '0') == '1'
+
+# Face embeddings and names, shared across worker processes via a memory-mapped store
+face_gallery = SharedGallery()
+
+# Recent /detect_face results per camera session, reused for near-identical frames
+detection_cache = FrameResultCache()
+
+# Student rows for the roster/detail pages; writes to students must call roster_cache.invalidate()
+roster_cache = RosterCache()
+ROSTER_ETAG = os.environ.get('ROSTER_ETAG', '1') == '1'  # Let browsers revalidate roster pages with 304s
+
+# /attendance lists the current term only, so a partitioned table is pruned to recent months
+ATTENDANCE_LIST_DAYS = int(os.environ.get('ATTENDANCE_LIST_DAYS', 120))
+
+# Per-face embeddings behind /detect_face result tokens, redeemed by /recognize
+result_tokens = ResultTokenStore()
+
+# Skips inference on camera frames with no motion since the last processed one
+motion_gate = MotionGate()
+
+# Smoothed /detect_face latency of this worker, for the polling hint
+detect_latency = LatencyAverage()
+
+# Bounded, prioritised inference concurrency: attendance > overlay > enrolment (see admission.py)
+admission = AdmissionController()
+
+# Embeddings of stored photos keyed by pixel hash, model and detector (enrolment only)
+embedding_cache = EmbeddingCache()
+
+# DeepFace pulls in TensorFlow, so it is imported on first use rather than with this module
+_deepface = None
+
+# Set once init_db() and load_known_faces() have run in this process
+_started = False
+_startup_lock = threading.Lock()
+
+def get_deepface():
+    """Import DeepFace on first use so importing app stays cheap"""
+    global _deepface
+    if _deepface is None:
+        from deepface import DeepFace
+        _deepface = DeepFace
+    return _deepface
+
+def model_tag(model_name=FACE_MODEL):
+    """Tag recording which model, enrolment detector and preprocessing version produced an embedding"""
+    return f"{model_name}/{detectors.get_profile('enrolment').backend}/v{EMBEDDING_VERSION}"
+
+def model_from_tag(tag):
+    return tag.split('/')[0]
+
+def tag_profile(tag, name='attendance'):
+    """Detector profile using the detector embeddings under tag were enrolled with
 
-def extract_face_embedding(image_array):
-    """Extract face embedding from image array using DeepFace"""
+    After the enrolment detector or EMBEDDING_VERSION changes, the old gallery is
+    served until reembed.py switches it, and new embeddings must match it until then.
+    """
+    parts = tag.split('/')
+    profile = detectors.get_profile(name)
+    return profile._replace(backend=parts[1]) if len(parts) > 1 else profile
+
+def gallery_profile(gallery=None, name='attendance'):
+    """Aligned profile live embeddings must use to be comparable with the served gallery"""
+    return tag_profile(active_model_tag(gallery), name)
+
+def active_model_tag(gallery=None):
+    """Model tag of the gallery currently being served"""
+    gallery = gallery or current_gallery()
+    return gallery.meta.get('model_tag') or model_tag()
+
+def active_model(gallery=None):
+    """DeepFace model name live embeddings must use to be comparable with the gallery"""
+    return model_from_tag(active_model_tag(gallery))
+
+def extract_face_embedding(image_array, profile='attendance', model_name=None):
+    """Extract face embedding from image array using DeepFace and the given detector profile"""
+    detector = detectors.get_profile(profile) if isinstance(profile, str) else profile
     try:
         # DeepFace expects RGB images
-        result = DeepFace.represent(
+        result = get_deepface().represent(
             img_path=image_array,
-            model_name=FACE_MODEL,
-            detector_backend=DETECTOR_BACKEND,
+            model_name=model_name or active_model(),
+            detector_backend=detector.backend,
+            align=detector.align,
             enforce_detection=False  # More lenient for edge cases
         )
         
         if result and len(result) > 0:
             embedding = np.array(result[0]['embedding'])
-            print(f"DEBUG: Successfully extracted {len(embedding)}-dim embedding using represent")
+            log.debug("Extracted %d-dim embedding using represent", len(embedding))
             return embedding
         else:
-            print("DEBUG: DeepFace.represent returned empty result - no face detected")
+            log.debug("DeepFace.represent returned empty result - no face detected")
             return None
             
     except Exception as e:
-        print(f"DEBUG: Face embedding extraction failed with DeepFace.represent: {e}")
+        log.warning("Face embedding extraction failed with DeepFace.represent: %s", e)
+        return None
+
+def cached_face_embedding(image_array, profile='enrolment', model_name=None):
+    """extract_face_embedding() backed by the on-disk cache, for photos that may be seen again"""
+    detector = detectors.get_profile(profile) if isinstance(profile, str) else profile
+    model_name = model_name or active_model()
+    key = embedding_cache.key(image_array, model_name, f"{detector.backend}-align{int(detector.align)}")
+    
+    embedding = embedding_cache.get(key)
+    if embedding is not None:
+        log.debug("Embedding cache hit for %s", key[:12])
+        return embedding
+    
+    embedding = extract_face_embedding(image_array, profile=detector, model_name=model_name)
+    if embedding is not None:
+        embedding_cache.put(key, embedding)
+    return embedding
+
+def embed_face_region(image_array, face, profile, model_name=None):
+    """Embed the face inside a fast (unaligned) detector box with an aligned profile
+
+    The box is padded by FACE_REGION_MARGIN and the profile's detector re-detects
+    and aligns the face, so the embedding is comparable with the gallery's.
+    """
+    pad_x = int(face['width'] * FACE_REGION_MARGIN)
+    pad_y = int(face['height'] * FACE_REGION_MARGIN)
+    height, width = image_array.shape[:2]
+    region = image_array[max(0, face['y'] - pad_y):min(height, face['y'] + face['height'] + pad_y),
+                         max(0, face['x'] - pad_x):min(width, face['x'] + face['width'] + pad_x)]
+    return extract_face_embedding(np.ascontiguousarray(region), profile=profile, model_name=model_name)
+
+def embed_face_crop(face_array, tag):
+    """Embed a face crop detected with tag_profile(tag) (aligned), skipping the detector
+
+    The tag is required: crops from another detector or an unaligned profile
+    aren't comparable with embeddings stored under it.
+    """
+    try:
+        result = get_deepface().represent(
+            img_path=face_array,
+            model_name=model_from_tag(tag),
+            detector_backend='skip',
+            enforce_detection=False
+        )
+        return np.array(result[0]['embedding']) if result else None
+    except Exception as e:
+        log.warning("Face crop embedding failed: %s", e)
         return None
 
+def warmup_models():
+    """Load the DeepFace recognition model and detector ahead of the first request"""
+    model_name = active_model()
+    log.info("Warming up %s model with %s detector", model_name, DETECTOR_BACKEND)
+    get_deepface().build_model(model_name)
+    # Dummy passes also initialise the detector backends
+    blank = np.zeros((160, 160, 3), dtype=np.uint8)
+    extract_face_embedding(blank)
+    detectors.detect_faces(blank, 'overlay')
+
 def compare_faces(known_embeddings, face_embedding, threshold=DISTANCE_THRESHOLD):
     """Compare face embedding against known faces"""
-    if not known_embeddings or face_embedding is None:
+    if known_embeddings is None or len(known_embeddings) == 0 or face_embedding is None:
         return [], []
     
-    distances = []
-    for known_embedding in known_embeddings:
-        # Calculate cosine distance (same as DeepFace uses internally)
-        distance = np.linalg.norm(known_embedding - face_embedding)
-        distances.append(distance)
+    # Euclidean distance to every known face in one vectorized pass
+    known = np.asarray(known_embeddings, dtype=np.float32)
+    distances = np.linalg.norm(known - np.asarray(face_embedding, dtype=np.float32), axis=1)
     
-    return distances, [i for i, d in enumerate(distances) if d < threshold]
+    return distances.tolist(), np.flatnonzero(distances < threshold).tolist()
 
-def load_known_faces(folder=KNOWN_FACES_FOLDER):
-    """Load known faces from students table only"""
-    global known_face_embeddings, known_face_names
+def match_face(face_embedding, gallery=None, threshold=DISTANCE_THRESHOLD, query_tag=None):
+    """Return (name, distance) of the closest known face within threshold, else (None, closest distance)
+
+    Passing query_tag (the model tag the embedding was made with) refuses to
+    compare against a gallery built by a different model.
+    """
+    gallery = gallery or current_gallery()
+    if query_tag and query_tag != active_model_tag(gallery):
+        log.warning("Refusing to compare %s embedding with %s gallery", query_tag, active_model_tag(gallery))
+        return None, float('inf')
+    if face_embedding is None:
+        return None, float('inf')
     
+    # Prototype shortlist, then exact re-rank over the shortlisted students' embeddings
+    name, distance = nearest_identity(gallery, face_embedding)
+    if name is not None and distance < threshold:
+        return name, distance
+    return None, distance
+
+def camera_session_key():
+    """Stable per-browser key for per-camera state such as the detection cache"""
+    if 'camera_session' not in session:
+        session['camera_session'] = uuid.uuid4().hex
+    return session['camera_session']
+
+def current_gallery():
+    """Return the latest gallery snapshot, remapping it if another worker republished"""
+    face_gallery.refresh()
+    return face_gallery.snapshot()
+
+def get_active_model_tag(cursor):
+    """Model tag the gallery should be built from (switched by reembed.py)"""
+    cursor.execute("SELECT value FROM app_settings WHERE name = 'face_model_tag'")
+    row = cursor.fetchone()
+    return row[0] if row else model_tag()
+
+def save_face_embedding(cursor, student_id, embedding, tag, source='enrolment'):
+    """Store an embedding for a student, tagged with the model that produced it"""
+    cursor.execute("""
+        INSERT INTO face_embeddings (student_id, model_tag, embedding, source)
+        VALUES (%s, %s, %s, %s)
+    """, (student_id, tag, json.dumps([float(v) for v in embedding]), source))
+
+def add_attendance_embedding(name, face_embedding, distance, tag):
+    """Keep a confident attendance capture as an extra embedding for the student (GALLERY_AUGMENT=1)
+
+    Returns True when the gallery changed and needs republishing.
+    """
+    if not GALLERY_AUGMENT or not (AUGMENT_MIN_NOVELTY <= distance < AUGMENT_THRESHOLD):
+        return False
+    
+    conn = None
+    try:
+        conn = __get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT s.id, COUNT(f.id) FROM students s
+            LEFT JOIN face_embeddings f ON f.student_id = s.id AND f.model_tag = %s
+            WHERE s.serial_number = %s
+            GROUP BY s.id
+        """, (tag, name.split('_')[0]))
+        row = cursor.fetchone()
+        if not row or row[1] >= MAX_EMBEDDINGS_PER_STUDENT:
+            return False
+        
+        save_face_embedding(cursor, row[0], face_embedding, tag, source='attendance')
+        conn.commit()
+        gallery_log.info("Added attendance embedding #%d for %s", row[1] + 1, name, extra={'distance': round(distance, 3)})
+        return True
+    except mysql.connector.Error as e:
+        gallery_log.error("Database error adding attendance embedding: %s", e)
+        return False
+    finally:
+        if conn is not None and conn.is_connected():
+            cursor.close()
+            conn.close()
+
+def parse_embedding_rows(rows):
+    """(serial_number, username, embedding JSON) rows -> (embeddings, "serial_username" names)
+
+    Rows with an unparseable embedding or a different dimension from the first one are skipped.
+    """
+    embeddings = []
+    names = []
+    for serial_number, username, face_encoding_str in rows:
+        if not face_encoding_str:
+            continue
+        try:
+            face_encoding = np.array(json.loads(face_encoding_str), dtype=np.float32)
+        except Exception as e:
+            gallery_log.warning("Error parsing face encoding for %s: %s", username, e)
+            continue
+        if embeddings and face_encoding.shape != embeddings[0].shape:
+            gallery_log.warning("Skipping face encoding for %s with unexpected shape %s", username, face_encoding.shape)
+            continue
+        embeddings.append(face_encoding)
+        names.append(f"{serial_number}_{username}")  # Use serial_username format
+    return embeddings, names
+
+def publish_gallery(embeddings, names, tag):
+    """Publish embeddings (grouped by student) to the shared gallery; returns the new version"""
+    # Rows arrive grouped by student, so they can be indexed per identity with a prototype each
+    identities, offsets, prototypes = build_identity_arrays(embeddings, names)
+    return face_gallery.publish(embeddings, names,
+                                arrays={'offsets': offsets, 'prototypes': prototypes},
+                                identities=identities, model=model_from_tag(tag), model_tag=tag)
+
+def publish_new_student(embeddings, name, tag):
+    """Append a newly enrolled student's embeddings to the shared gallery
+
+    Only the new rows are written on top of the latest version; if the gallery
+    can't take them (e.g. reembed.py switched the model tag meanwhile) the
+    full gallery is reloaded instead.
+    """
+    if not embeddings:
+        return
+    try:
+        version = face_gallery.append(embeddings, [name] * len(embeddings), model=model_from_tag(tag), model_tag=tag)
+        gallery_log.info("Appended %s to shared gallery version %d", name, version)
+    except ValueError as e:
+        gallery_log.info("Reloading the gallery instead of appending %s: %s", name, e)
+        load_known_faces()
+
+def load_known_faces(folder=KNOWN_FACES_FOLDER):
+    """Load the active model's face embeddings and publish them to the shared gallery"""
     known_face_embeddings = []
     known_face_names = []
+    tag = model_tag()
     
-    # Load from students table only
     try:
         conn = __get_db_connection()
         cursor = conn.cursor()
         
-        cursor.execute("SELECT serial_number, username, face_encoding FROM students WHERE face_encoding IS NOT NULL")
-        student_faces = cursor.fetchall()
-        
-        for serial_number, username, face_encoding_str in student_faces:
-            if face_encoding_str:
-                try:
-                    # Convert string back to numpy array
-                    face_encoding = np.array(eval(face_encoding_str))
-                    known_face_embeddings.append(face_encoding)
-                    known_face_names.append(f"{serial_number}_{username}")  # Use serial_username format
-                    print(f"DEBUG: Loaded face embedding from database for: {serial_number}_{username}")
-                except Exception as e:
-                    print(f"DEBUG: Error parsing face encoding for {username}: {e}")
+        # Only embeddings from the active model - mixed models are never compared
+        tag = get_active_model_tag(cursor)
+        cursor.execute("""
+            SELECT s.serial_number, s.username, f.embedding
+            FROM face_embeddings f JOIN students s ON f.student_id = s.id
+            WHERE f.model_tag = %s
+            ORDER BY s.id, f.id
+        """, (tag,))
+        known_face_embeddings, known_face_names = parse_embedding_rows(cursor.fetchall())
         
         cursor.close()
         conn.close()
         
     except mysql.connector.Error as e:
-        print(f"DEBUG: Database error loading faces: {e}")
+        gallery_log.error("Database error loading faces: %s", e)
     
-    print(f"DEBUG: Total face embeddings loaded from database: {len(known_face_embeddings)} - Names: {known_face_names}")
+    gallery_log.info("Loaded %d %s face embeddings from database", len(known_face_embeddings), tag)
+    gallery_log.debug("Gallery names: %s", known_face_names)
+    
+    version = publish_gallery(known_face_embeddings, known_face_names, tag)
+    gallery_log.info("Published shared gallery version %d", version)
     
     # Keep filesystem images for debugging - don't delete them
-    if os.path.exists(folder):
+    if os.path.exists(folder) and gallery_log.isEnabledFor(logging.DEBUG):
         try:
             files_in_folder = os.listdir(folder)
-            print(f"DEBUG: Filesystem has {len([f for f in files_in_folder if f.lower().endswith(('.jpg', '.png'))])} face images for debugging/testing")
+            gallery_log.debug("Filesystem has %d face images for debugging/testing", len([f for f in files_in_folder if f.lower().endswith(('.jpg', '.png'))]))
         except Exception as e:
-            print(f"DEBUG: Error checking filesystem images: {e}")
+            gallery_log.debug("Error checking filesystem images: %s", e)
+
+def migrate_schema(conn):
+    """Apply pending migrations (see migrations.py); a failure is logged and doesn't stop startup"""
+    try:
+        migrations.migrate(conn, log=log.info)
+    except migrations.LockTimeout as e:
+        log.warning("Schema migrations skipped: %s", e)
+    except Exception as e:
+        log.error("Schema migration failed: %s", e)
+        conn.rollback()
+
+def maintain_partitions(conn):
+    """Keep monthly attendance partitions a few months ahead (no-op for an unpartitioned table)
+
+    Also creates the triggers standing in for the partitioned table's foreign
+    keys. Held under the migration lock so workers starting together don't
+    race. A partition failure is logged and doesn't stop startup, but a
+    missing trigger does (TriggerError): deletes would orphan attendance rows.
+    """
+    cursor = conn.cursor()
+    try:
+        with migrations.schema_lock(cursor):
+            for name in attendance_partitions.ensure_triggers(cursor):
+                log.info("Created trigger %s", name)
+            added = attendance_partitions.ensure_partitions(cursor)
+        if added:
+            log.info("Added %d attendance partition(s)", added)
+    except migrations.LockTimeout as e:
+        log.warning("Attendance partition maintenance skipped: %s", e)
+    except attendance_partitions.TriggerError:
+        raise
+    except Exception as e:
+        log.error("Attendance partition maintenance failed: %s", e)
+    finally:
+        cursor.close()
 
 def init_db():
     """Initialize database with student and teacher registration system"""
@@ -126,6 +461,18 @@ def init_db():
             )
         ''')
         
+        # Teacher login tracking
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS teacher_sessions (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                teacher_id INT,
+                login_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                logout_time TIMESTAMP NULL,
+                ip_address VARCHAR(45),
+                FOREIGN KEY (teacher_id) REFERENCES teachers(id) ON DELETE CASCADE
+            )
+        ''')
+        
         # Create students table (can self-register)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS students (
@@ -136,12 +483,16 @@ def init_db():
                 phone VARCHAR(10) NOT NULL,
                 face_image LONGTEXT,
                 face_encoding TEXT,
+                has_face BOOLEAN AS (face_encoding IS NOT NULL) STORED,
                 image_path VARCHAR(255),
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
         
         # Create attendance table with manual edit capabilities
+        # (range-partitioned by month when ATTENDANCE_PARTITIONED=1, see attendance_partitions.py)
+        if attendance_partitions.ATTENDANCE_PARTITIONED:
+            attendance_partitions.create_table(cursor)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS attendance (
                 id INT AUTO_INCREMENT PRIMARY KEY,
@@ -151,25 +502,152 @@ def init_db():
                 method ENUM('Face Recognition', 'Manual') DEFAULT 'Face Recognition',
                 teacher_id INT,
                 notes TEXT,
+                INDEX idx_timestamp (timestamp),
+                INDEX idx_student_timestamp (student_id, timestamp),
                 FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE,
                 FOREIGN KEY (teacher_id) REFERENCES teachers(id) ON DELETE SET NULL
             )
         ''')
+        # Per-student, per-day counts maintained alongside attendance (see attendance_summary.py)
+        attendance_summary.create_table(cursor)
+        
+        # Create face embeddings table - every embedding is tagged with the model that produced it
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS face_embeddings (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                student_id INT NOT NULL,
+                model_tag VARCHAR(64) NOT NULL,
+                embedding TEXT NOT NULL,
+                source ENUM('enrolment', 'attendance') NOT NULL DEFAULT 'enrolment',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_model_student (model_tag, student_id),
+                FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE
+            )
+        ''')
+        
+        # Key/value settings, e.g. which model tag the gallery is served from
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS app_settings (
+                name VARCHAR(64) PRIMARY KEY,
+                value VARCHAR(255) NOT NULL
+            )
+        ''')
+        conn.commit()
+        
+        # Columns and indexes added since these tables were first created, now that they all exist
+        migrate_schema(conn)
+        maintain_partitions(conn)
+        
+        # Untagged legacy encodings in students.face_encoding were all produced by the v1 pipeline
+        cursor.execute("""
+            INSERT INTO face_embeddings (student_id, model_tag, embedding)
+            SELECT s.id, %s, s.face_encoding FROM students s
+            WHERE s.face_encoding IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM face_embeddings f WHERE f.student_id = s.id)
+        """, (LEGACY_MODEL_TAG,))
+        
+        # Keep serving the embeddings already stored until reembed.py switches tags;
+        # a fresh install starts on the current pipeline
+        cursor.execute("SELECT model_tag FROM face_embeddings GROUP BY model_tag ORDER BY COUNT(*) DESC LIMIT 1")
+        row = cursor.fetchone()
+        cursor.execute("INSERT IGNORE INTO app_settings (name, value) VALUES ('face_model_tag', %s)",
+                       (row[0] if row else model_tag(),))
         
         conn.commit()
-        print("MySQL database initialized successfully! (Tables verified/created as needed)")
+        log.info("MySQL database initialized (tables verified/created as needed)")
     except mysql.connector.Error as e:
-        print("DB Init error:", e)
+        log.error("DB init error: %s", e)
     finally:
         if conn is not None and conn.is_connected():
             cursor.close()
             conn.close()
 
-init_db()
-load_known_faces()
+def startup():
+    """Create tables and publish the face gallery (runs once per process)"""
+    global _started
+    with _startup_lock:
+        if _started:
+            return
+        configure_logging()
+        init_db()
+        load_known_faces()
+        roster_cache.invalidate()  # Rows or templates may have changed while we were down
+        _started = True
+
+def create_app():
+    """Application factory: run startup eagerly and return the Flask app"""
+    startup()
+    return app
+
+@app.before_request
+def ensure_started():
+    # Lazy fallback for launchers that don't call create_app() (python app.py, flask run)
+    if not _started:
+        startup()
+
+def open_frame(bts, max_size):
+    """Decode an uploaded frame to RGB, letting JPEG decoding downscale on the fly when it is much larger"""
+    img = Image.open(BytesIO(bts))
+    if img.format == 'JPEG':
+        img.draft('RGB', max_size)  # DCT scaling: full-size frames from old clients decode at a fraction of the cost
+    return img.convert('RGB')
 
-def mark_attendance(name):
-    now = datetime.now()
+def timed_route(route):
+    """Collect stage timings for a view (see metrics.py); stages are marked with stage()"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            g.stage_timer = StageTimer(route)
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def stage(name):
+    """Time one stage of the current request (no-op outside timed routes and requests)"""
+    timer = g.get('stage_timer') if has_request_context() else None
+    return timer.stage(name) if timer is not None else nullcontext()
+
+def inference_slot(priority_class):
+    """Admission slot around detection/embedding; time spent queued is the 'admission' stage"""
+    return admission.slot(priority_class, waiting=stage('admission'))
+
+@app.errorhandler(Overloaded)
+def shed_request(e):
+    """Fast 429/503 with Retry-After instead of queueing until the worker times out"""
+    log.info("Shedding %s request", e.priority_class, extra={'status': e.status, 'retry_after': e.retry_after})
+    response = jsonify({
+        "success": False,
+        "error": f"Server busy, please retry in {e.retry_after}s",
+        "faces": [],
+        "retry_after": e.retry_after,
+        "recommended_interval_ms": min(e.retry_after * 1000, POLL_MAX_INTERVAL_MS)
+    })
+    response.status_code = e.status
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+@app.after_request
+def record_stage_timings(response):
+    timer = g.pop('stage_timer', None)
+    if timer is not None:
+        timer.finish()
+        stage_metrics.record(timer)
+        # Only frames that ran detection: gated and frame-cache answers take almost no
+        # time and would hide real inference latency from recommended_interval_ms
+        if timer.route == 'detect_face' and 'detect' in timer.spans:
+            detect_latency.observe(timer.spans['total'])
+        if METRICS_DEBUG_HEADER or request.headers.get('X-Debug-Timing') == '1':
+            response.headers['Server-Timing'] = timer.server_timing()
+    return response
+
+def mark_attendance(name, teacher_id=None, timestamp=None):
+    """Record attendance for a recognized "serial_username" name (CSV backup + MySQL)
+
+    Inside a request the logged-in teacher is recorded; headless callers
+    (e.g. ingest.py) can pass teacher_id explicitly or leave it empty.
+    timestamp defaults to now (batch_recognize.py passes the time seen in a recording).
+    """
+    now = timestamp or datetime.now()
     date_str = now.strftime('%Y-%m-%d')
     time_str = now.strftime('%H:%M:%S')
     
@@ -179,6 +657,7 @@ def mark_attendance(name):
         writer.writerow([date_str, time_str, name])
     
     # Save to MySQL database
+    conn = None
     try:
         conn = __get_db_connection()
         cursor = conn.cursor()
@@ -195,23 +674,25 @@ def mark_attendance(name):
         
         if student_row:
             student_id = student_row[0]
-            teacher_id = session.get('user_id') if session.get('user_type') == 'teacher' else None
+            if teacher_id is None and has_request_context() and session.get('user_type') == 'teacher':
+                teacher_id = session.get('user_id')
             
             # Insert attendance record
             cursor.execute("""
                 INSERT INTO attendance (student_id, timestamp, status, method, teacher_id) 
                 VALUES (%s, %s, 'Present', 'Face Recognition', %s)
             """, (student_id, now, teacher_id))
+            attendance_summary.record_event(cursor, student_id, now, 'Present')
             
             conn.commit()
-            print(f"Attendance marked in database for {name} (Student ID: {student_id})")
+            attendance_log.info("Attendance marked in database for %s", name, extra={'student_id': student_id})
         else:
-            print(f"Student with serial number {serial_number} not found in database")
+            attendance_log.warning("Student with serial number %s not found in database", serial_number)
         
     except mysql.connector.Error as e:
-        print(f"Database attendance error: {e}")
+        attendance_log.error("Database attendance error: %s", e)
     finally:
-        if conn.is_connected():
+        if conn is not None and conn.is_connected():
             cursor.close()
             conn.close()
 
@@ -294,6 +775,8 @@ def register():
                 # Save face image if provided
                 face_encoding_str = None
                 image_path = None
+                face_embedding = None
+                tag = active_model_tag()
                 
                 if face_image:
                     try:
@@ -309,59 +792,44 @@ def register():
                         image_path = os.path.join(KNOWN_FACES_FOLDER, filename)
                         img.save(image_path, format='PNG')
                         
-                        # Extract face embedding
+                        # Extract face embedding (admitted like /add_student's)
                         img_array = np.array(img, dtype=np.uint8)
-                        face_embedding = extract_face_embedding(img_array)
+                        with inference_slot('enrolment'):
+                            face_embedding = cached_face_embedding(img_array, profile=tag_profile(tag, 'enrolment'), model_name=model_from_tag(tag))
                         if face_embedding is not None:
                             face_encoding_str = str(face_embedding.tolist())
+                    except Overloaded as e:
+                        flash(f"Server is busy recognising faces, please try again in {e.retry_after}s", "warning")
+                        return render_template('register.html')
                     except Exception as e:
-                        print(f"Error processing face image: {e}")
+                        register_log.warning("Error processing face image: %s", e)
                 
-                # Check for duplicate faces before inserting
-                if face_encoding_str:
-                    # Load current known faces from database only (not filesystem)
-                    temp_embeddings, temp_names = load_faces_for_duplicate_check()
-                    
-                    # Convert the new face encoding back to numpy array
-                    try:
-                        new_face_embedding = np.array(eval(face_encoding_str))
-                        
-                        print(f"DEBUG: Checking for duplicate faces. Known faces: {len(temp_embeddings)}")
-                        print(f"DEBUG: Known face names: {temp_names}")
-                        
-                        # Check against existing faces from database only
-                        if len(temp_embeddings) > 0:
-                            # Use a stricter threshold for duplicate detection (lower = more similar)
-                            DUPLICATE_THRESHOLD = 3.0  # Much stricter than attendance threshold
-                            distances, matches = compare_faces(temp_embeddings, new_face_embedding, DUPLICATE_THRESHOLD)
-                            
-                            print(f"DEBUG: Face distances: {[f'{name}: {dist:.3f}' for name, dist in zip(temp_names, distances)]}")
-                            print(f"DEBUG: Duplicate threshold: {DUPLICATE_THRESHOLD}")
-                            print(f"DEBUG: Matches found: {len(matches)}")
-                            
-                            if matches:
-                                # Found a match - this person is already registered
-                                best_match_idx = min(matches, key=lambda i: distances[i])
-                                existing_name = temp_names[best_match_idx]
-                                distance = distances[best_match_idx]
-                                
-                                print(f"DEBUG: Duplicate detected! {existing_name} with distance {distance:.3f}")
-                                flash(f"Face already registered! Our AI detected you match an existing student: {existing_name} (similarity: {distance:.2f}). Please contact administrator if this is an error.", "danger")
-                                return render_template('register.html')
-                                
-                    except Exception as e:
-                        print(f"Error checking for duplicate faces: {e}")
-                        # Continue with registration if face comparison fails
+                # Check for duplicate faces before inserting, against the in-memory gallery
+                if face_embedding is not None:
+                    duplicates = find_duplicate_faces(face_embedding, tag)
+                    if duplicates:
+                        # Found a match - this person is already registered
+                        existing_name, distance = duplicates[0]
+                        register_log.info("Duplicate face detected: %s", existing_name,
+                                          extra={'distance': round(distance, 3),
+                                                 'matches': [f"{name}:{dist:.3f}" for name, dist in duplicates]})
+                        flash(f"Face already registered! Our AI detected you match an existing student: {existing_name} (similarity: {distance:.2f}). Please contact administrator if this is an error.", "danger")
+                        return render_template('register.html')
                 
                 cursor.execute('''
                     INSERT INTO students (username, email, serial_number, phone, face_image, face_encoding, image_path)
                     VALUES (%s, %s, %s, %s, %s, %s, %s)
                 ''', (username, email, serial_number, phone, face_image, face_encoding_str, image_path))
                 
+                if face_embedding is not None:
+                    save_face_embedding(cursor, cursor.lastrowid, face_embedding, tag)
+                
                 conn.commit()
+                roster_cache.invalidate()
                 
-                # Reload known faces to include new student
-                load_known_faces()
+                # Add the new student to the served gallery
+                if face_embedding is not None:
+                    publish_new_student([face_embedding], f"{serial_number}_{username}", tag)
                 
                 # Provide appropriate success message based on whether face was captured
                 if face_encoding_str:
@@ -432,26 +900,63 @@ def dashboard():
         return redirect(url_for('login'))
     return render_template('dashboard.html')
 
+# Roster projections: short columns plus the stored has_face flag, so list and detail pages
+# never read face_encoding or face_image
+ROSTER_QUERY = """
+    SELECT id, serial_number, username, email, phone, has_face, created_at
+    FROM students ORDER BY serial_number
+"""
+STUDENT_DETAIL_QUERY = """
+    SELECT id, serial_number, username, email, phone, image_path, has_face, created_at
+    FROM students WHERE id = %s
+"""
+
+def query_students(query, params=()):
+    conn = __get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+    finally:
+        conn.close()
+
+def cached_student(student_id):
+    """Detail row of one student (see STUDENT_DETAIL_QUERY), or None"""
+    rows = roster_cache.get(('student', student_id), lambda: query_students(STUDENT_DETAIL_QUERY, (student_id,)))
+    return rows[0] if rows else None
+
+def conditional_page(page, data_key, render):
+    """Render a page built from the cached rows under data_key (load them first), or answer 304
+    if the browser's copy is current
+
+    Skipped while flash messages are pending, since those are part of the page.
+    """
+    etag = roster_cache.etag(data_key, page, session.get('user'))
+    if not ROSTER_ETAG or etag is None or session.get('_flashes'):
+        return render()
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = app.make_response(render())
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
 @app.route('/student')
 def student():
     if not session.get('user'):
         return redirect(url_for('login'))
     
-    # Get all students from database
+    # Get all students (cached; no embedding or image data)
     students_list = []
     try:
-        conn = __get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, serial_number, username, email, phone, face_encoding, created_at FROM students ORDER BY serial_number")
-        students_list = cursor.fetchall()
+        students_list = roster_cache.get('roster', lambda: query_students(ROSTER_QUERY))
     except mysql.connector.Error as e:
-        print(f"Database error: {e}")
-    finally:
-        if conn and conn.is_connected():
-            cursor.close()
-            conn.close()
+        log.error("Database error: %s", e)
     
-    return render_template('student.html', students=students_list)
+    return conditional_page('student', 'roster', lambda: render_template('student.html', students=students_list))
 
 @app.route('/add_student', methods=['POST'])
 def add_student():
@@ -462,7 +967,7 @@ def add_student():
     username = request.form.get('username')
     email = request.form.get('email')
     phone = request.form.get('phone')
-    photo = request.files.get('photo')
+    photos = [p for p in request.files.getlist('photo') if p and p.filename]  # One or more uploads
     face_image_data = request.form.get('face_image')  # Base64 from camera
     
     # Validation - either photo file OR camera capture required
@@ -470,7 +975,7 @@ def add_student():
         flash("All fields are required", "danger")
         return redirect(url_for('student'))
     
-    if not photo and not face_image_data:
+    if not photos and not face_image_data:
         flash("Photo is required (upload file or capture from camera)", "danger")
         return redirect(url_for('student'))
     
@@ -482,6 +987,7 @@ def add_student():
         flash("Phone number must be exactly 10 digits", "danger")
         return redirect(url_for('student'))
     
+    conn = None
     try:
         # Save photo to known_faces folder
         if not os.path.exists(KNOWN_FACES_FOLDER):
@@ -490,21 +996,31 @@ def add_student():
         filename = f"{serial_number}_{username.replace(' ', '_')}.png"
         filepath = os.path.join(KNOWN_FACES_FOLDER, filename)
         
-        # Handle camera capture (base64) or file upload
+        # Handle camera capture (base64) and/or file uploads
+        images = []
         if face_image_data:
             # Camera capture - decode base64
             img_data = base64.b64decode(face_image_data.split(',')[1])
-            img = Image.open(BytesIO(img_data)).convert('RGB')
-        else:
+            images.append(Image.open(BytesIO(img_data)).convert('RGB'))
+        for photo in photos[:MAX_EMBEDDINGS_PER_STUDENT - len(images)]:
             # File upload
-            img = Image.open(photo).convert('RGB')
+            images.append(Image.open(photo).convert('RGB'))
         
-        # Save image
-        img.save(filepath, format='PNG')
+        # Save images - the first one is the student's main photo
+        images[0].save(filepath, format='PNG')
+        for i, img in enumerate(images[1:], start=2):
+            img.save(os.path.join(KNOWN_FACES_FOLDER, f"{serial_number}_{username.replace(' ', '_')}_{i}.png"), format='PNG')
         
-        # Extract face embedding
-        img_array = np.array(img, dtype=np.uint8)
-        face_embedding = extract_face_embedding(img_array)
+        # Extract face embeddings with the model the gallery is currently served from
+        tag = active_model_tag()
+        face_embeddings = []
+        with inference_slot('enrolment'):
+            for img in images:
+                img_array = np.array(img, dtype=np.uint8)
+                embedding = cached_face_embedding(img_array, profile=tag_profile(tag, 'enrolment'), model_name=model_from_tag(tag))
+                if embedding is not None:
+                    face_embeddings.append(embedding)
+        face_embedding = face_embeddings[0] if face_embeddings else None
         
         # Insert into database
         conn = __get_db_connection()
@@ -516,15 +1032,22 @@ def add_student():
         ''', (serial_number, username, email, phone, filepath, 
               str(face_embedding.tolist()) if face_embedding is not None else None))
         
+        student_id = cursor.lastrowid
+        for embedding in face_embeddings:
+            save_face_embedding(cursor, student_id, embedding, tag)
+        
         conn.commit()
+        roster_cache.invalidate()
         
-        # Reload known faces
-        load_known_faces()
+        # Add the new student to the served gallery
+        publish_new_student(face_embeddings, f"{serial_number}_{username}", tag)
         
         flash(f"Student {username} (#{serial_number}) added successfully!", "success")
         
     except mysql.connector.IntegrityError:
         flash("Serial number or username already exists", "danger")
+    except Overloaded as e:
+        flash(f"Server is busy recognising faces, please try again in {e.retry_after}s", "warning")
     except Exception as e:
         flash(f"Error adding student: {e}", "danger")
     finally:
@@ -539,8 +1062,12 @@ def attendance():
     if not session.get('user'):
         return redirect(url_for('login'))
     
-    # Read attendance data from database
+    # Read attendance data from database (?since=YYYY-MM-DD, default: the last ATTENDANCE_LIST_DAYS days)
     attendance_data = []
+    try:
+        since = date.fromisoformat(request.args['since'])
+    except (KeyError, ValueError):
+        since = date.today() - timedelta(days=ATTENDANCE_LIST_DAYS)
     try:
         conn = __get_db_connection()
         cursor = conn.cursor()
@@ -551,8 +1078,9 @@ def attendance():
                    s.username, s.serial_number, a.status, a.method, a.notes
             FROM attendance a 
             JOIN students s ON a.student_id = s.id 
+            WHERE a.timestamp >= %s
             ORDER BY a.timestamp DESC
-        """)
+        """, (since,))
         
         rows = cursor.fetchall()
         for row in rows:
@@ -568,13 +1096,48 @@ def attendance():
             })
             
     except mysql.connector.Error as e:
-        print(f"Database error reading attendance: {e}")
+        log.error("Database error reading attendance: %s", e)
     finally:
         if conn and conn.is_connected():
             cursor.close()
             conn.close()
     
-    return render_template('attendance.html', attendance_data=attendance_data)
+    return render_template('attendance.html', attendance_data=attendance_data, since=since)
+
+@app.route('/attendance_summary')
+def attendance_report():
+    """Daily headcounts and per-student attendance rates from attendance_daily (?since=&until=, YYYY-MM-DD)"""
+    if not session.get('user'):
+        return jsonify({"error": "Not logged in", "success": False}), 401
+    
+    try:
+        until = date.fromisoformat(request.args['until']) if request.args.get('until') else date.today()
+        since = date.fromisoformat(request.args['since']) if request.args.get('since') else until - timedelta(days=30)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid date: {e}", "success": False}), 400
+    
+    conn = None
+    try:
+        conn = __get_db_connection()
+        cursor = conn.cursor()
+        headcount = attendance_summary.daily_headcount(cursor, since, until)
+        rates = attendance_summary.attendance_rates(cursor, since, until)
+    except mysql.connector.Error as e:
+        log.error("Database error reading attendance summary: %s", e)
+        return jsonify({"error": "Database error", "success": False}), 500
+    finally:
+        if conn and conn.is_connected():
+            cursor.close()
+            conn.close()
+    
+    return jsonify({
+        "success": True,
+        "since": since.isoformat(),
+        "until": until.isoformat(),
+        "days": [{"day": day.isoformat(), "attended": attended, "late": late} for day, attended, late in headcount],
+        "students": [{"serial_number": serial, "name": name, "days_attended": attended, "days_late": late,
+                      "rate": round(rate, 4)} for serial, name, attended, late, rate in rates]
+    })
 
 @app.route('/realtime')
 def realtime():
@@ -587,101 +1150,154 @@ def test_response():
     """Test endpoint to verify server responses"""
     return jsonify(recognized=["TEST: Server is working correctly"])
 
-@app.route('/recognize', methods=['POST'])
-def recognize():
-    if not session.get('user'):
-        return jsonify({"error": "Not logged in", "success": False}), 401
-        
-    data = request.json
-    if not data or 'image' not in data:
-        return jsonify({"error": "No image data", "success": False}), 400
-
-    img_data = data['image']
+def embed_uploaded_frame(img_data, gallery):
+    """Single-face embedding of a /recognize upload: (embedding, None) or (None, error response)"""
     try:
-        bts = base64.b64decode(img_data.split(',')[1])
-        img = Image.open(BytesIO(bts)).convert('RGB')
+        with stage('decode'):
+            bts = base64.b64decode(img_data.split(',')[1])
+        with stage('image'):
+            img = open_frame(bts, RECOGNITION_MAX_SIZE)
     except Exception as e:
-        return jsonify({"error": f"Invalid image data: {e}", "success": False}), 400
+        return None, (jsonify({"error": f"Invalid image data: {e}", "success": False}), 400)
 
-    img.thumbnail((800, 800))
-    arr = np.ascontiguousarray(np.array(img, dtype=np.uint8))
+    with stage('resize'):
+        img.thumbnail(RECOGNITION_MAX_SIZE)
+        arr = np.ascontiguousarray(np.array(img, dtype=np.uint8))
     
-    print(f"DEBUG: Incoming image array shape: {arr.shape}, dtype: {arr.dtype}")
+    recognize_log.debug("Incoming image array shape: %s, dtype: %s", arr.shape, arr.dtype)
     
     # Make sure it's RGB (3 channels)
     if len(arr.shape) != 3 or arr.shape[2] != 3:
-        return jsonify({"error": "Image must be RGB", "success": False}), 400
+        return None, (jsonify({"error": "Image must be RGB", "success": False}), 400)
     
-    # Use the SAME detection and embedding extraction method for consistency
-    print("DEBUG: Extracting face embedding with DeepFace (single method)...")
-    face_embedding = extract_face_embedding(arr)
+    model_name = active_model(gallery)
+    profile = gallery_profile(gallery)
     
-    if face_embedding is None:
-        print("DEBUG: No face detected in the image")
-        return jsonify({"error": "⚠️ No face detected. Please position yourself in front of the camera", "success": False}), 400
+    # Detection and embedding run under an attendance-priority admission slot
+    with inference_slot('attendance'):
+        # Use the SAME detection and embedding extraction method for consistency
+        with stage('detect_embed'):
+            face_embedding = extract_face_embedding(arr, profile=profile, model_name=model_name)
     
-    # Check for multiple faces using the same method that successfully detected a face
-    try:
-        # Use represent to check for multiple faces since it already worked for extraction
-        all_representations = DeepFace.represent(
-            img_path=arr,
-            model_name=FACE_MODEL,
-            detector_backend=DETECTOR_BACKEND,
-            enforce_detection=False  # Same as extract_face_embedding
-        )
+        if face_embedding is None:
+            recognize_log.info("No face detected in the image")
+            return None, (jsonify({"error": "⚠️ No face detected. Please position yourself in front of the camera", "success": False}), 400)
+    
+        # Check for multiple faces using the same method that successfully detected a face
+        try:
+            # Use represent to check for multiple faces since it already worked for extraction
+            with stage('multi_face_check'):
+                all_representations = get_deepface().represent(
+                    img_path=arr,
+                    model_name=model_name,
+                    detector_backend=profile.backend,
+                    align=profile.align,
+                    enforce_detection=False  # Same as extract_face_embedding
+                )
         
-        num_faces = len(all_representations) if all_representations else 0
-        print(f"DEBUG: Number of faces detected by represent: {num_faces}")
+            num_faces = len(all_representations) if all_representations else 0
+            recognize_log.debug("Number of faces detected by represent: %d", num_faces)
         
-        if num_faces > 1:
-            print("DEBUG: Multiple faces detected - attendance registration blocked")
-            return jsonify({
-                "error": f"Multiple faces detected ({num_faces}). Please ensure only one person is in the frame.",
-                "success": False,
-                "multiple_faces": True
-            }), 400
+            if num_faces > 1:
+                recognize_log.info("Multiple faces detected - attendance registration blocked", extra={'faces': num_faces})
+                return None, (jsonify({
+                    "error": f"Multiple faces detected ({num_faces}). Please ensure only one person is in the frame.",
+                    "success": False,
+                    "multiple_faces": True
+                }), 400)
             
-    except Exception as e:
-        print(f"DEBUG: Multiple face check error: {e}")
-        # If multiple face check fails but we have an embedding, continue (assume single face)
+        except Exception as e:
+            recognize_log.warning("Multiple face check error: %s", e)
+            # If multiple face check fails but we have an embedding, continue (assume single face)
+
+    return face_embedding, None
+
+def token_version(gallery):
+    """What a result token's embeddings depend on: the gallery and the aligned profile they were made with"""
+    return (gallery.version, tuple(gallery_profile(gallery)))
+
+def embedding_from_result_token(token, gallery):
+    """Embedding of the single face in a /detect_face result token
+
+    Returns (embedding, None), (None, error response) for multiple faces, or
+    (None, None) when the token can't be used (expired, other session or
+    worker, gallery changed, no face or no embedding) and the frame has to be
+    processed normally. "No face" is left to the full pipeline because the
+    attendance detector finds faces the fast overlay detector can miss.
+    """
+    faces = result_tokens.redeem(token, camera_session_key(), token_version(gallery))
+    if not faces:
+        return None, None
+    if len(faces) > 1:
+        recognize_log.info("Multiple faces in detection result - attendance registration blocked", extra={'faces': len(faces)})
+        return None, (jsonify({
+            "error": f"Multiple faces detected ({len(faces)}). Please ensure only one person is in the frame.",
+            "success": False,
+            "multiple_faces": True
+        }), 400)
+    return faces[0], None
+
+@app.route('/recognize', methods=['POST'])
+@timed_route('recognize')
+def recognize():
+    if not session.get('user'):
+        return jsonify({"error": "Not logged in", "success": False}), 401
+        
+    data = request.json
+    if not data or ('image' not in data and 'result_token' not in data):
+        return jsonify({"error": "No image data", "success": False}), 400
+
+    # One gallery snapshot per request: the embedding is made with the model it was built from
+    gallery = current_gallery()
+    
+    # Scan & Submit right after an overlay poll: reuse that result's embedding, no second inference
+    face_embedding = None
+    if data.get('result_token'):
+        with stage('result_token'):
+            face_embedding, error = embedding_from_result_token(data['result_token'], gallery)
+        if error:
+            return error
     
-    print(f"DEBUG: Known face embeddings: {len(known_face_embeddings)} ({known_face_names})")
+    if face_embedding is None:
+        if 'image' not in data:
+            return jsonify({"error": "Detection result expired, please send the frame",
+                            "success": False, "token_expired": True}), 410
+        face_embedding, error = embed_uploaded_frame(data['image'], gallery)
+        if error:
+            return error
+    
+    known_face_embeddings, known_face_names = gallery.embeddings, gallery.names
+    recognize_log.debug("Matching against %d known face embeddings", len(known_face_embeddings))
     
     if len(known_face_embeddings) == 0:
-        print("DEBUG: No known faces in database to compare against")
+        recognize_log.warning("No known faces in database to compare against")
         return jsonify({
             "success": False,
             "recognized": False,
             "message": "No registered students found in database"
         })
     
-    # Compare with known faces
-    distances, matches = compare_faces(known_face_embeddings, face_embedding, DISTANCE_THRESHOLD)
-    
-    print(f"DEBUG: Distances to all known faces: {[f'{name}: {dist:.3f}' for name, dist in zip(known_face_names, distances)]}")
-    print(f"DEBUG: Recognition threshold: {DISTANCE_THRESHOLD}")
-    print(f"DEBUG: Matches found: {len(matches)}")
+    # Compare with known faces (prototype shortlist + exact re-rank)
+    with stage('match'):
+        recognized_name, distance = match_face(face_embedding, gallery)
     
-    if matches:
-        # Get the best match (smallest distance)
-        best_match_idx = min(matches, key=lambda i: distances[i])
-        recognized_name = known_face_names[best_match_idx]
-        distance = distances[best_match_idx]
+    if recognized_name:
+        recognize_log.info("Face recognized as %s", recognized_name, extra={'distance': round(distance, 3)})
+        with stage('mark_attendance'):
+            mark_attendance(recognized_name)
         
-        print(f"DEBUG: Face recognized as {recognized_name} (distance: {distance:.3f})")
-        mark_attendance(recognized_name)
+        # Confident captures can become extra embeddings for this student
+        with stage('augment'):
+            if add_attendance_embedding(recognized_name, face_embedding, distance, active_model_tag(gallery)):
+                load_known_faces()
         
         # Get student details for display
         try:
-            conn = mysql.connector.connect(
-                host='localhost',
-                user='root',
-                password='',
-                database='face_project'
-            )
-            cursor = conn.cursor()
-            cursor.execute("SELECT serial_number, username FROM students WHERE username = %s", (recognized_name,))
-            student_data = cursor.fetchone()
+            with stage('student_lookup'):
+                conn = __get_db_connection()
+                cursor = conn.cursor()
+                cursor.execute("SELECT serial_number, username FROM students WHERE username = %s", (recognized_name,))
+                student_data = cursor.fetchone()
             
             if student_data:
                 serial_number, username = student_data
@@ -709,7 +1325,7 @@ def recognize():
                     }
                 })
         except Exception as e:
-            print(f"Error fetching student details: {e}")
+            recognize_log.error("Error fetching student details: %s", e)
             # Format message for display
             message = f"Welcome {recognized_name}! Attendance marked successfully."
             return jsonify({
@@ -726,10 +1342,7 @@ def recognize():
                 cursor.close()
                 conn.close()
     else:
-        print(f"DEBUG: Face not recognized - all distances >= {DISTANCE_THRESHOLD}")
-        min_distance = min(distances) if distances else float('inf')
-        closest_name = known_face_names[distances.index(min_distance)] if distances else "None"
-        print(f"DEBUG: Closest match was {closest_name} at distance {min_distance:.3f}")
+        recognize_log.info("Face not recognized", extra={'distance': round(distance, 3), 'threshold': DISTANCE_THRESHOLD})
         return jsonify({
             "success": False,
             "recognized": False,
@@ -793,7 +1406,7 @@ def setting():
         if row:
             teacher_data = {'email': row[0] or ''}
     except mysql.connector.Error as e:
-        print(f"Database error: {e}")
+        log.error("Database error: %s", e)
     finally:
         if conn and conn.is_connected():
             cursor.close()
@@ -818,6 +1431,9 @@ def manual_attendance():
     student_serial = request.form.get('student_serial')
     status = request.form.get('status')
     notes = request.form.get('notes', '')
+    if status not in attendance_summary.STATUS_COLUMNS:
+        flash(f"Invalid attendance status: {status}", "attendance_danger")
+        return redirect(url_for('attendance'))
     
     try:
         conn = __get_db_connection()
@@ -832,10 +1448,12 @@ def manual_attendance():
             teacher_id = session.get('user_id')
             
             # Insert manual attendance record
+            now = datetime.now()
             cursor.execute("""
-                INSERT INTO attendance (student_id, status, method, teacher_id, notes) 
-                VALUES (%s, %s, 'Manual', %s, %s)
-            """, (student_id, status, teacher_id, notes))
+                INSERT INTO attendance (student_id, timestamp, status, method, teacher_id, notes) 
+                VALUES (%s, %s, %s, 'Manual', %s, %s)
+            """, (student_id, now, status, teacher_id, notes))
+            attendance_summary.record_event(cursor, student_id, now, status)
             
             conn.commit()
             flash(f"Manual attendance recorded for student #{student_serial}", "attendance_success")
@@ -858,17 +1476,23 @@ def edit_attendance(attendance_id):
     
     status = request.form.get('status')
     notes = request.form.get('notes', '')
+    if status not in attendance_summary.STATUS_COLUMNS:
+        flash(f"Invalid attendance status: {status}", "attendance_danger")
+        return redirect(url_for('attendance'))
     
     try:
         conn = __get_db_connection()
         cursor = conn.cursor()
         
         # Update attendance record
+        affected_day = attendance_summary.event_day(cursor, attendance_id)
         cursor.execute("""
             UPDATE attendance 
             SET status = %s, notes = %s, teacher_id = %s
             WHERE id = %s
         """, (status, notes, session.get('user_id'), attendance_id))
+        if affected_day:
+            attendance_summary.refresh_day(cursor, *affected_day)
         
         conn.commit()
         flash("Attendance record updated successfully", "attendance_success")
@@ -892,7 +1516,10 @@ def delete_attendance(attendance_id):
         cursor = conn.cursor()
         
         # Delete attendance record
+        affected_day = attendance_summary.event_day(cursor, attendance_id)
         cursor.execute("DELETE FROM attendance WHERE id = %s", (attendance_id,))
+        if affected_day:
+            attendance_summary.refresh_day(cursor, *affected_day)
         conn.commit()
         flash("Attendance record deleted successfully", "attendance_success")
         
@@ -905,39 +1532,38 @@ def delete_attendance(attendance_id):
     
     return redirect(url_for('attendance'))
 
-def load_faces_for_duplicate_check():
-    """Load known faces from database only for duplicate checking during registration"""
-    temp_embeddings = []
-    temp_names = []
-    
-    try:
-        conn = __get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT serial_number, username, face_encoding FROM students WHERE face_encoding IS NOT NULL")
-        student_faces = cursor.fetchall()
-        
-        for serial_number, username, face_encoding_str in student_faces:
-            if face_encoding_str:
-                try:
-                    # Convert string back to numpy array
-                    face_encoding = np.array(eval(face_encoding_str))
-                    temp_embeddings.append(face_encoding)
-                    temp_names.append(f"{serial_number}_{username}")
-                    print(f"DEBUG: Loaded face for duplicate check: {serial_number}_{username}")
-                except Exception as e:
-                    print(f"DEBUG: Error parsing face encoding for duplicate check {username}: {e}")
-        
-        cursor.close()
-        conn.close()
-        
-    except mysql.connector.Error as e:
-        print(f"DEBUG: Database error loading faces for duplicate check: {e}")
-    
-    print(f"DEBUG: Loaded {len(temp_embeddings)} faces from database for duplicate checking")
-    return temp_embeddings, temp_names
+def find_duplicate_faces(face_embedding, tag, threshold=DUPLICATE_THRESHOLD, limit=DUPLICATE_REPORT_LIMIT):
+    """Registered students whose face is within threshold of face_embedding, closest first
+
+    Uses the shared in-memory gallery (one radius query) instead of reading
+    and parsing every stored embedding per registration. An embedding made
+    with a different model than the gallery's is never compared.
+    """
+    gallery = current_gallery()
+    if tag != active_model_tag(gallery):
+        register_log.warning("Skipping duplicate check: %s embedding vs %s gallery", tag, active_model_tag(gallery))
+        return []
+    duplicates = identities_within(gallery, face_embedding, threshold, limit)
+    register_log.debug("%d students within duplicate threshold %s of %d known embeddings",
+                       len(duplicates), threshold, len(gallery.embeddings))
+    return duplicates
+
+def recommended_poll_interval():
+    """Polling interval (ms) to advertise to live pages, or None when not overloaded"""
+    if detect_latency.seconds is None:
+        return None
+    latency_ms = detect_latency.seconds * 1000
+    if latency_ms <= DETECT_SLOW_MS:
+        return None
+    return int(min(POLL_INTERVAL_MS * latency_ms / DETECT_SLOW_MS, POLL_MAX_INTERVAL_MS))
+
+def with_poll_hint(result):
+    """A /detect_face result plus recommended_interval_ms when this worker is slow"""
+    interval = recommended_poll_interval()
+    return dict(result, recommended_interval_ms=interval) if interval else result
 
 @app.route('/detect_face', methods=['POST'])
+@timed_route('detect_face')
 def detect_face():
     """Real-time face detection for live camera feed - works for all users"""
     
@@ -947,113 +1573,153 @@ def detect_face():
 
     img_data = data['image']
     try:
-        bts = base64.b64decode(img_data.split(',')[1])
-        img = Image.open(BytesIO(bts)).convert('RGB')
+        with stage('decode'):
+            bts = base64.b64decode(img_data.split(',')[1])
+        with stage('image'):
+            img = open_frame(bts, DETECTION_FRAME_SIZE)
     except Exception as e:
         return jsonify({"error": f"Invalid image data: {e}", "faces": []}), 400
 
-    img.thumbnail((400, 300))  # Match canvas size
-    arr = np.ascontiguousarray(np.array(img, dtype=np.uint8))
+    with stage('resize'):
+        img.thumbnail(DETECTION_FRAME_SIZE)  # No-op for frames the client already downscaled
+        arr = np.ascontiguousarray(np.array(img, dtype=np.uint8))
     
     # Make sure it's RGB (3 channels)
     if len(arr.shape) != 3 or arr.shape[2] != 3:
         return jsonify({"error": "Image must be RGB", "faces": []}), 400
     
-    try:
-        # Use the SAME face detection method as /recognize endpoint for consistency
-        face_objs = DeepFace.extract_faces(
-            img_path=arr,
-            detector_backend=DETECTOR_BACKEND,
-            enforce_detection=False,  # Same as /recognize endpoint
-            align=True
-        )
+    gallery = current_gallery()
+    session_key = camera_session_key()
+    cache_version = (gallery.version, bool(session.get('user')))
+    
+    # Unchanged scene: skip inference and resend this camera's last result
+    # (cameras are scoped to the session, so a client can't touch another's gate)
+    camera_key = (session_key, str(data.get('camera_id') or 'default')[:64])
+    with stage('motion_gate'):
+        gated = motion_gate.check(camera_key, img, cache_version)
+    if gated is not None:
+        return jsonify(with_poll_hint(dict(gated, gated=True)))
+    
+    # Static scenes: reuse the result for a near-identical recent frame from this camera
+    with stage('frame_cache'):
+        hash_value = frame_hash(img)
+        cached = detection_cache.get(session_key, hash_value, cache_version)
+    if cached is not None:
+        motion_gate.remember(camera_key, cached, cache_version, cached=True)
+        return jsonify(with_poll_hint(dict(cached, cached=True)))
+    
+    with inference_slot('overlay'):
+        try:
+            # Fast overlay profile: boxes only, no alignment (see detectors.py)
+            with stage('detect'):
+                faces = detectors.detect_faces(arr, 'overlay')
         
-        faces_detected = []
+            faces_detected = []
+            face_embeddings = []  # Kept server-side behind the result token
+            identify = session.get('user') and len(gallery.embeddings) > 0
         
-        # Process each detected face using the same logic as /recognize
-        for i, face_obj in enumerate(face_objs):
-            # To get coordinates, we need to use analyze since extract_faces doesn't return coordinates
-            try:
-                face_analysis = DeepFace.analyze(
-                    img_path=arr,
-                    actions=['emotion'],
-                    detector_backend=DETECTOR_BACKEND,
-                    enforce_detection=False  # Same as extract_faces
-                )
-                
-                if not isinstance(face_analysis, list):
-                    face_analysis = [face_analysis]
-                
-                if i < len(face_analysis):
-                    region = face_analysis[i].get('region', {})
-                    x = region.get('x', 0)
-                    y = region.get('y', 0)
-                    w = region.get('w', 100)
-                    h = region.get('h', 100)
-                else:
-                    # Fallback coordinates
-                    x, y, w, h = 50, 50, 100, 100
-            except:
-                # Fallback coordinates if analyze fails
-                x, y, w, h = 50, 50, 100, 100
+            for face in faces:
+                face_name = "UNREGISTERED"
+                display_name = "UNREGISTERED"
+                status = "unregistered"
+                face_embedding = None
             
-            # Try to identify the face if logged in - SAME LOGIC AS /recognize
-            face_name = "UNREGISTERED"
-            display_name = "UNREGISTERED"
-            status = "unregistered"
-            
-            if session.get('user') and len(known_face_embeddings) > 0:
-                # Use the SAME embedding extraction method as /recognize endpoint
-                face_embedding = extract_face_embedding(arr)
-                if face_embedding is not None:
-                    distances, matches = compare_faces(known_face_embeddings, face_embedding, DISTANCE_THRESHOLD)
+                # Try to identify the face if logged in - the Haar box is re-detected and
+                # aligned with the gallery's profile so distances match the gallery's
+                if identify:
+                    with stage('embed'):
+                        face_embedding = embed_face_region(arr, face, gallery_profile(gallery),
+                                                           model_name=active_model(gallery))
+                    if face_embedding is not None:
+                        with stage('match'):
+                            matched_name, _ = match_face(face_embedding, gallery)
                     
-                    if matches:
-                        # Found a match
-                        best_match_idx = min(matches, key=lambda i: distances[i])
-                        face_name = known_face_names[best_match_idx]  # Format: "12_swas1"
-                        status = "registered"
+                        if matched_name:
+                            # Found a match
+                            face_name = matched_name  # Format: "12_swas1"
+                            status = "registered"
                         
-                        # Format display name as "Serial: Name"
-                        if '_' in face_name:
-                            serial, name = face_name.split('_', 1)
-                            display_name = f"#{serial}: {name}"
-                        else:
-                            display_name = face_name
+                            # Format display name as "Serial: Name"
+                            if '_' in face_name:
+                                serial, name = face_name.split('_', 1)
+                                display_name = f"#{serial}: {name}"
+                            else:
+                                display_name = face_name
             
-            faces_detected.append({
-                "x": x,
-                "y": y,
-                "width": w,
-                "height": h,
-                "name": face_name,
-                "display_name": display_name,
-                "status": status
-            })
-        
-        return jsonify({
-            "success": True,
-            "faces": faces_detected,
-            "total_faces": len(faces_detected)
-        })
+                face_embeddings.append(face_embedding)
+                faces_detected.append({
+                    "x": face['x'],
+                    "y": face['y'],
+                    "width": face['width'],
+                    "height": face['height'],
+                    "name": face_name,
+                    "display_name": display_name,
+                    "status": status
+                })
         
-    except Exception as e:
-        print(f"Face detection error: {e}")
-        # Check if it's a "No face detected" error from DeepFace
-        if "Face could not be detected" in str(e) or "no face" in str(e).lower():
-            print("DEBUG: No face detected by DeepFace - returning empty result")
-            return jsonify({
-                "success": True,
-                "faces": [],
-                "total_faces": 0
-            })
-        else:
-            print(f"DEBUG: Unexpected face detection error: {e}")
-            return jsonify({
+            result = {
                 "success": True,
-                "faces": [],
-                "total_faces": 0
-            })
+                "faces": faces_detected,
+                "total_faces": len(faces_detected),
+                # Box coordinates are in this frame size; clients scale them to their canvas
+                "frame_width": img.width,
+                "frame_height": img.height
+            }
+            if identify:
+                # Scan & Submit can send this instead of the frame (see /recognize)
+                result["result_token"] = result_tokens.issue(session_key, face_embeddings, token_version(gallery))
+            detection_cache.put(session_key, hash_value, result, cache_version)
+            motion_gate.remember(camera_key, result, cache_version)
+            detect_log.debug("Detected %d face(s)", len(faces_detected), extra={'camera': camera_key[1]})
+            return jsonify(with_poll_hint(result))
+        
+        except Exception as e:
+            # Check if it's a "No face detected" error from DeepFace
+            if "Face could not be detected" in str(e) or "no face" in str(e).lower():
+                detect_log.debug("No face detected by DeepFace - returning empty result")
+                return jsonify(with_poll_hint({
+                    "success": True,
+                    "faces": [],
+                    "total_faces": 0
+                }))
+            else:
+                detect_log.warning("Unexpected face detection error: %s", e)
+                return jsonify(with_poll_hint({
+                    "success": True,
+                    "faces": [],
+                    "total_faces": 0
+                }))
+
+@app.route('/motion_stats')
+def motion_stats():
+    """Motion gate and frame cache statistics per camera id, for tuning thresholds per room"""
+    if not session.get('user'):
+        return jsonify({"error": "Not logged in", "success": False}), 401
+    
+    return jsonify({
+        "success": True,
+        "cameras": motion_gate.stats(),
+        "frame_cache": {"hits": detection_cache.hits, "misses": detection_cache.misses}
+    })
+
+@app.route('/detection_config')
+def detection_config():
+    """Frame sizes, encodings and polling rate for the live pages (see static/capture.js)"""
+    return jsonify({
+        "detect": {"width": DETECTION_FRAME_SIZE[0], "height": DETECTION_FRAME_SIZE[1],
+                   "formats": UPLOAD_FORMATS, "quality": DETECTION_UPLOAD_QUALITY},
+        "recognize": {"width": RECOGNITION_MAX_SIZE[0], "height": RECOGNITION_MAX_SIZE[1],
+                      "formats": UPLOAD_FORMATS, "quality": RECOGNITION_UPLOAD_QUALITY},
+        "poll": {"interval_ms": POLL_INTERVAL_MS, "max_interval_ms": POLL_MAX_INTERVAL_MS}
+    })
+
+@app.route('/metrics')
+def metrics():
+    """Per-stage latency histograms and admission counters in Prometheus text format (?format=json for recent percentiles)"""
+    if request.args.get('format') == 'json':
+        return jsonify({"success": True, "stages": stage_metrics.percentiles(), "admission": admission.stats()})
+    return Response(stage_metrics.render_prometheus() + admission.render_prometheus(),
+                    mimetype='text/plain; version=0.0.4')
 
 # Student management routes - View, Edit, Delete
 @app.route('/view_student/<int:student_id>')
@@ -1061,21 +1727,17 @@ def view_student(student_id):
     if not session.get('user'):
         return redirect(url_for('login'))
     
+    conn = None
     try:
-        conn = __get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id, serial_number, username, email, phone, image_path, 
-                   face_encoding, created_at 
-            FROM students WHERE id = %s
-        """, (student_id,))
-        student = cursor.fetchone()
+        student = cached_student(student_id)
         
         if not student:
             flash("Student not found", "danger")
             return redirect(url_for('student'))
             
         # Get attendance history
+        conn = __get_db_connection()
+        cursor = conn.cursor()
         cursor.execute("""
             SELECT DATE(timestamp) as date, TIME(timestamp) as time, 
                    status, method, notes
@@ -1083,6 +1745,7 @@ def view_student(student_id):
             ORDER BY timestamp DESC LIMIT 10
         """, (student_id,))
         attendance_history = cursor.fetchall()
+        attendance_totals = attendance_summary.student_totals(cursor, student_id)
         
     except mysql.connector.Error as e:
         flash(f"Database error: {e}", "danger")
@@ -1092,7 +1755,8 @@ def view_student(student_id):
             cursor.close()
             conn.close()
     
-    return render_template('view_student.html', student=student, attendance_history=attendance_history)
+    return render_template('view_student.html', student=student, attendance_history=attendance_history,
+                           attendance_totals=attendance_totals)
 
 @app.route('/edit_student/<int:student_id>', methods=['GET', 'POST'])
 def edit_student(student_id):
@@ -1113,6 +1777,7 @@ def edit_student(student_id):
                 WHERE id = %s
             """, (username, phone, email, student_id))
             conn.commit()
+            roster_cache.invalidate()
             flash("Student updated successfully!", "success")
             return redirect(url_for('student'))
             
@@ -1125,27 +1790,17 @@ def edit_student(student_id):
     
     # GET request - show edit form
     try:
-        conn = __get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id, serial_number, username, email, phone, face_encoding, created_at
-            FROM students WHERE id = %s
-        """, (student_id,))
-        student = cursor.fetchone()
-        
-        if not student:
-            flash("Student not found", "danger")
-            return redirect(url_for('student'))
-            
+        student = cached_student(student_id)
     except mysql.connector.Error as e:
         flash(f"Database error: {e}", "danger")
         return redirect(url_for('student'))
-    finally:
-        if conn and conn.is_connected():
-            cursor.close()
-            conn.close()
     
-    return render_template('edit_student.html', student=student)
+    if not student:
+        flash("Student not found", "danger")
+        return redirect(url_for('student'))
+    
+    return conditional_page('edit', ('student', student_id),
+                            lambda: render_template('edit_student.html', student=student))
 
 @app.route('/delete_student/<int:student_id>', methods=['POST'])
 def delete_student(student_id):
@@ -1163,16 +1818,18 @@ def delete_student(student_id):
         if student:
             serial_number, username, image_path = student
             
-            # Delete from database (attendance records will be deleted by CASCADE)
+            # Delete from database (a partitioned attendance table has no foreign key to cascade from)
+            cursor.execute("DELETE FROM attendance WHERE student_id = %s", (student_id,))
             cursor.execute("DELETE FROM students WHERE id = %s", (student_id,))
             conn.commit()
+            roster_cache.invalidate()
             
             # Remove image file if exists
             if image_path and os.path.exists(image_path):
                 try:
                     os.remove(image_path)
                 except Exception as e:
-                    print(f"Error removing image file: {e}")
+                    log.warning("Error removing image file: %s", e)
             
             # Reload known faces to remove deleted student
             load_known_faces()
@@ -1201,4 +1858,5 @@ if __name__ == '__main__':
     print("🚀 Starting Flask application...")
     print("📍 Access the app at: http://localhost:5001")
     print("🔄 Auto-reload is ENABLED - app will restart when files change")
+    print("🏭 For production use: python3 serve.py")
     app.run(debug=True, port=5001, use_reloader=True)
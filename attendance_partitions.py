@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Monthly range partitioning and archival of the attendance table
+
+`attendance` only ever grows. Partitioned by month on timestamp, queries
+that filter on a date range (the attendance list's current-term window,
+per-day edits, summary refreshes) are pruned to the partitions they touch,
+and a finished month can be archived by exporting its partition to a
+compressed file and dropping it - an instant metadata change instead of a
+long DELETE.
+
+MySQL requires every unique key of a partitioned table to include the
+partitioning column and doesn't allow foreign keys on it, so the
+partitioned layout has PRIMARY KEY (id, timestamp) and plain indexes
+instead. Two AFTER DELETE triggers stand in for the foreign keys' actions,
+so deletions made outside the app are covered too: one on students deletes
+the student's attendance rows (ON DELETE CASCADE) and one on teachers sets
+teacher_id to NULL (ON DELETE SET NULL). With binary logging on, creating
+them needs SUPER or log_bin_trust_function_creators=1; startup refuses to
+run a partitioned table without them rather than leave rows orphaned.
+
+Partitions are named pYYYYMM after the month they hold; the first one also
+holds anything older and pmax catches anything beyond the last month.
+init_db creates new tables partitioned when ATTENDANCE_PARTITIONED=1 and
+adds partitions ATTENDANCE_PARTITION_MONTHS ahead on every startup. Every
+change to the partition layout, here or at startup, holds the migration
+lock (migrations.schema_lock) so only one process reorganises at a time.
+attendance_daily keeps the per-day counts of archived months, so reports
+still cover them, and attendance_summary.backfill() never rebuilds days
+before the first live partition.
+
+Usage:
+    python3 attendance_partitions.py --status
+    python3 attendance_partitions.py --convert
+    python3 attendance_partitions.py --archive --before 2026-09-01 --dry-run
+    python3 attendance_partitions.py --archive --before 2026-09-01 --format parquet
+"""
+
+import argparse
+import csv
+import gzip
+import os
+import sys
+from datetime import date, datetime
+
+import mysql.connector
+
+from db import __get_db_connection
+from migrations import schema_lock
+
+ATTENDANCE_PARTITIONED = os.environ.get('ATTENDANCE_PARTITIONED', '0') == '1'
+ATTENDANCE_PARTITION_MONTHS = int(os.environ.get('ATTENDANCE_PARTITION_MONTHS', 3))  # months ahead
+ATTENDANCE_ARCHIVE_DIR = os.environ.get('ATTENDANCE_ARCHIVE_DIR', 'attendance_archive')
+
+ARCHIVE_COLUMNS = ['id', 'student_id', 'serial_number', 'username', 'timestamp',
+                   'status', 'method', 'teacher_id', 'notes']
+
+CREATE_PARTITIONED_TABLE = '''
+    CREATE TABLE IF NOT EXISTS attendance (
+        id INT AUTO_INCREMENT,
+        student_id INT NOT NULL,
+        timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        status ENUM('Present', 'Absent', 'Late') DEFAULT 'Present',
+        method ENUM('Face Recognition', 'Manual') DEFAULT 'Face Recognition',
+        teacher_id INT,
+        notes TEXT,
+        PRIMARY KEY (id, timestamp),
+        INDEX idx_timestamp (timestamp),
+        INDEX idx_student_timestamp (student_id, timestamp),
+        INDEX idx_teacher (teacher_id)
+    )
+'''
+
+# Stand-ins for attendance's ON DELETE CASCADE / SET NULL once the table is partitioned
+TRIGGERS = {
+    'students_delete_attendance': '''
+        CREATE TRIGGER students_delete_attendance AFTER DELETE ON students
+        FOR EACH ROW DELETE FROM attendance WHERE student_id = OLD.id
+    ''',
+    'teachers_clear_attendance': '''
+        CREATE TRIGGER teachers_clear_attendance AFTER DELETE ON teachers
+        FOR EACH ROW UPDATE attendance SET teacher_id = NULL WHERE teacher_id = OLD.id
+    ''',
+}
+
+
+class TriggerError(RuntimeError):
+    """A foreign-key stand-in trigger couldn't be created on a partitioned attendance table"""
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(day, months):
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"p{month:%Y%m}"
+
+
+def partition_definitions(first_month, last_month):
+    """PARTITION clauses for each month in [first_month, last_month] followed by pmax"""
+    clauses = []
+    month = month_start(first_month)
+    while month <= last_month:
+        clauses.append(f"PARTITION {partition_name(month)} VALUES LESS THAN "
+                       f"(UNIX_TIMESTAMP('{add_months(month, 1)} 00:00:00'))")
+        month = add_months(month, 1)
+    clauses.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    return ",\n        ".join(clauses)
+
+
+def partition_by(first_month, last_month):
+    return (f"PARTITION BY RANGE (UNIX_TIMESTAMP(timestamp)) (\n"
+            f"        {partition_definitions(first_month, last_month)}\n    )")
+
+
+def list_partitions(cursor):
+    """[(name, upper bound datetime or None for pmax, approximate rows)] in order; [] if not partitioned"""
+    cursor.execute("""
+        SELECT PARTITION_NAME,
+               IF(PARTITION_DESCRIPTION = 'MAXVALUE', NULL, FROM_UNIXTIME(PARTITION_DESCRIPTION)),
+               TABLE_ROWS
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'attendance' AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """)
+    return [(name, bound, rows or 0) for name, bound, rows in cursor.fetchall()]
+
+
+def live_since(partitions):
+    """First day the partitions still cover (start of the first month), or None if not partitioned
+
+    Older months have been archived; their raw rows are gone and only
+    attendance_daily remembers them.
+    """
+    bounds = [bound for _, bound, _ in partitions if bound is not None]
+    return add_months(month_start(bounds[0].date()), -1) if bounds else None
+
+
+def create_table(cursor, months_ahead=ATTENDANCE_PARTITION_MONTHS):
+    """Create attendance partitioned from this month (no-op if the table exists)"""
+    this_month = month_start(date.today())
+    cursor.execute(CREATE_PARTITIONED_TABLE + partition_by(this_month, add_months(this_month, months_ahead)))
+
+
+def ensure_triggers(cursor):
+    """Create any missing TRIGGERS if attendance is partitioned; returns the names created
+
+    Raises TriggerError if one can't be created, since deletes would then
+    leave orphaned or dangling attendance rows.
+    """
+    if not list_partitions(cursor):
+        return []
+    cursor.execute("""
+        SELECT TRIGGER_NAME FROM information_schema.TRIGGERS
+        WHERE TRIGGER_SCHEMA = DATABASE() AND TRIGGER_NAME IN (%s, %s)
+    """, tuple(TRIGGERS))
+    existing = {name for (name,) in cursor.fetchall()}
+    created = []
+    for name, sql in TRIGGERS.items():
+        if name in existing:
+            continue
+        try:
+            cursor.execute(sql)
+        except mysql.connector.Error as e:
+            raise TriggerError(f"Cannot create trigger {name} on the partitioned attendance table ({e}). "
+                               f"Grant TRIGGER (and SUPER, or set log_bin_trust_function_creators=1 "
+                               f"when binary logging is on) and restart") from e
+        created.append(name)
+    return created
+
+
+def ensure_partitions(cursor, months_ahead=ATTENDANCE_PARTITION_MONTHS):
+    """Split pmax so there are monthly partitions up to months_ahead; returns partitions added"""
+    partitions = list_partitions(cursor)
+    bounds = [bound for _, bound, _ in partitions if bound is not None]
+    if not bounds:
+        return 0
+    next_month = month_start(max(bounds).date())
+    last_month = add_months(month_start(date.today()), months_ahead)
+    if next_month > last_month:
+        return 0
+    cursor.execute(f"ALTER TABLE attendance REORGANIZE PARTITION pmax INTO (\n"
+                   f"        {partition_definitions(next_month, last_month)}\n    )")
+    return (last_month.year - next_month.year) * 12 + last_month.month - next_month.month + 1
+
+
+def convert_table(cursor, months_ahead=ATTENDANCE_PARTITION_MONTHS):
+    """Partition an existing attendance table in place; returns False if it already is
+
+    Drops the table's foreign keys (students ON DELETE CASCADE, teachers ON
+    DELETE SET NULL) and widens the primary key to (id, timestamp); TRIGGERS
+    take over both actions. Rebuilds the table, so run it in a maintenance
+    window.
+    """
+    if list_partitions(cursor):
+        return False
+    cursor.execute("""
+        SELECT CONSTRAINT_NAME FROM information_schema.REFERENTIAL_CONSTRAINTS
+        WHERE CONSTRAINT_SCHEMA = DATABASE() AND TABLE_NAME = 'attendance'
+    """)
+    for (constraint,) in cursor.fetchall():
+        cursor.execute(f"ALTER TABLE attendance DROP FOREIGN KEY `{constraint}`")
+
+    cursor.execute("UPDATE attendance SET timestamp = CURRENT_TIMESTAMP WHERE timestamp IS NULL")
+    cursor.execute("""
+        ALTER TABLE attendance
+            MODIFY timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            DROP PRIMARY KEY,
+            ADD PRIMARY KEY (id, timestamp)
+    """)
+    cursor.execute("SELECT MIN(timestamp) FROM attendance")
+    oldest = cursor.fetchone()[0]
+    this_month = month_start(date.today())
+    first_month = month_start(oldest.date()) if oldest else this_month
+    cursor.execute(f"ALTER TABLE attendance {partition_by(first_month, add_months(this_month, months_ahead))}")
+    ensure_triggers(cursor)
+    return True
+
+
+def archive_path(out_dir, name, fmt):
+    return os.path.join(out_dir, f"attendance_{name}.{'parquet' if fmt == 'parquet' else 'csv.gz'}")
+
+
+def write_archive(rows, path, fmt='csv'):
+    """Write ARCHIVE_COLUMNS rows to a gzip CSV or Parquet file (atomically); returns rows written"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if fmt == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        columns = list(zip(*rows)) if rows else [()] * len(ARCHIVE_COLUMNS)
+        table = pa.table({name: list(values) for name, values in zip(ARCHIVE_COLUMNS, columns)})
+        pq.write_table(table, tmp_path, compression='zstd')
+    else:
+        with gzip.open(tmp_path, 'wt', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(ARCHIVE_COLUMNS)
+            writer.writerows(rows)
+    os.replace(tmp_path, path)
+    return len(rows)
+
+
+def archivable(partitions, before):
+    """Partitions whose every row is older than `before` (a month start)"""
+    cutoff = datetime.combine(month_start(before), datetime.min.time())
+    return [(name, bound, rows) for name, bound, rows in partitions if bound is not None and bound <= cutoff]
+
+
+def archive(cursor, before, out_dir=ATTENDANCE_ARCHIVE_DIR, fmt='csv', dry_run=False):
+    """Export and drop every partition older than `before`; returns [(partition, rows, path)]
+
+    Each file is fully written before its partition is dropped, so an
+    interrupted run leaves the partition in place and is safe to repeat.
+    """
+    archived = []
+    for name, _, _ in archivable(list_partitions(cursor), before):
+        path = archive_path(out_dir, name, fmt)
+        if dry_run:
+            cursor.execute(f"SELECT COUNT(*) FROM attendance PARTITION ({name})")
+            archived.append((name, cursor.fetchone()[0], path))
+            continue
+        cursor.execute(f"""
+            SELECT a.id, a.student_id, s.serial_number, s.username, a.timestamp,
+                   a.status, a.method, a.teacher_id, a.notes
+            FROM attendance PARTITION ({name}) a
+            LEFT JOIN students s ON s.id = a.student_id
+            ORDER BY a.timestamp, a.id
+        """)
+        count = write_archive(cursor.fetchall(), path, fmt)
+        cursor.execute(f"ALTER TABLE attendance DROP PARTITION {name}")
+        archived.append((name, count, path))
+    return archived
+
+
+def parse_date(value):
+    return date.fromisoformat(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partition the attendance table by month and archive old months")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument('--status', action='store_true', help="List partitions and their approximate row counts")
+    action.add_argument('--convert', action='store_true', help="Partition an existing attendance table")
+    action.add_argument('--archive', action='store_true', help="Export and drop partitions older than --before")
+    parser.add_argument('--before', type=parse_date, help="Archive months before this date (YYYY-MM-DD)")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv',
+                        help="Archive file format (parquet needs pyarrow)")
+    parser.add_argument('--out', default=ATTENDANCE_ARCHIVE_DIR, help="Archive directory")
+    parser.add_argument('--months-ahead', type=int, default=ATTENDANCE_PARTITION_MONTHS)
+    parser.add_argument('--dry-run', action='store_true', help="Show what --archive would do")
+    args = parser.parse_args()
+
+    if args.archive and not args.before:
+        parser.error("--archive needs --before")
+    if args.format == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("❌ Error: pyarrow is not installed. Run: pip install pyarrow (or use --format csv)")
+            return 1
+
+    conn = __get_db_connection()
+    cursor = conn.cursor()
+    try:
+        if args.convert:
+            print("🔄 Partitioning attendance by month (rebuilds the table)...")
+            with schema_lock(cursor):
+                if not convert_table(cursor, args.months_ahead):
+                    print("ℹ️  attendance is already partitioned")
+                ensure_partitions(cursor, args.months_ahead)
+                ensure_triggers(cursor)
+            conn.commit()
+        elif args.archive:
+            if not list_partitions(cursor):
+                print("❌ attendance is not partitioned. Run with --convert first")
+                return 1
+            with schema_lock(cursor):
+                for name, count, path in archive(cursor, args.before, args.out, args.format, args.dry_run):
+                    verb = "Would archive" if args.dry_run else "Archived"
+                    print(f"📦 {verb} {name}: {count} rows -> {path}")
+            conn.commit()
+
+        partitions = list_partitions(cursor)
+        if not partitions:
+            print("ℹ️  attendance is not partitioned")
+        for name, bound, rows in partitions:
+            print(f"   {name:<8} < {bound or 'MAXVALUE'}  ~{rows} rows")
+    finally:
+        cursor.close()
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Per-student, per-day attendance summary (attendance_daily)
+
+Reports such as attendance rate per student, headcount per day and late
+counts read this small table instead of scanning raw attendance events
+joined with students. It has one row per (student, day) with the number of
+Present / Late / Absent events and the first and last event time.
+
+The table is maintained in the same transaction as the event it
+summarises:
+
+- record_event() after an INSERT into attendance (recognition and manual
+  entries) bumps the day's counters
+- refresh_day() after an UPDATE or DELETE recomputes that student's day
+  from its few raw rows
+
+Rows that existed before the table, or that were written behind the app's
+back, are rebuilt with the backfill command. On a partitioned table it
+starts at the first live partition: archived months have no raw rows left,
+so their summary rows are kept as they are.
+
+Usage:
+    python3 attendance_summary.py --backfill
+    python3 attendance_summary.py --backfill --since 2026-09-01 --until 2026-12-31
+    python3 attendance_summary.py --report --since 2026-09-01
+"""
+
+import argparse
+import sys
+from datetime import date, timedelta
+
+import attendance_partitions
+from db import __get_db_connection
+from logging_setup import get_logger
+
+log = get_logger('summary')
+
+STATUS_COLUMNS = {'Present': 'present_count', 'Late': 'late_count', 'Absent': 'absent_count'}
+
+CREATE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS attendance_daily (
+        student_id INT NOT NULL,
+        day DATE NOT NULL,
+        present_count INT NOT NULL DEFAULT 0,
+        late_count INT NOT NULL DEFAULT 0,
+        absent_count INT NOT NULL DEFAULT 0,
+        first_seen DATETIME NOT NULL,
+        last_seen DATETIME NOT NULL,
+        PRIMARY KEY (student_id, day),
+        INDEX idx_day (day),
+        FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE
+    )
+'''
+
+# One (student, day) group of raw events, in the summary's column order
+_AGGREGATE = '''
+    SELECT student_id, DATE(timestamp),
+           SUM(status = 'Present'), SUM(status = 'Late'), SUM(status = 'Absent'),
+           MIN(timestamp), MAX(timestamp)
+    FROM attendance
+'''
+
+
+def create_table(cursor):
+    cursor.execute(CREATE_TABLE)
+
+
+def record_event(cursor, student_id, timestamp, status='Present'):
+    """Count one new attendance event (call in the INSERT's transaction); False for an unknown status"""
+    column = STATUS_COLUMNS.get(status)
+    if column is None:
+        log.warning("Not counting attendance event with unknown status %r", status, extra={'student_id': student_id})
+        return False
+    cursor.execute(f"""
+        INSERT INTO attendance_daily (student_id, day, {column}, first_seen, last_seen)
+        VALUES (%s, DATE(%s), 1, %s, %s)
+        ON DUPLICATE KEY UPDATE {column} = {column} + 1,
+            first_seen = LEAST(first_seen, VALUES(first_seen)),
+            last_seen = GREATEST(last_seen, VALUES(last_seen))
+    """, (student_id, timestamp, timestamp, timestamp))
+    return True
+
+
+def event_day(cursor, attendance_id):
+    """(student_id, day) of an attendance row, or None - read it before editing or deleting the row"""
+    cursor.execute("SELECT student_id, DATE(timestamp) FROM attendance WHERE id = %s", (attendance_id,))
+    return cursor.fetchone()
+
+
+def refresh_day(cursor, student_id, day):
+    """Recompute one student's day from the raw events (after an UPDATE or DELETE)"""
+    cursor.execute("DELETE FROM attendance_daily WHERE student_id = %s AND day = %s", (student_id, day))
+    cursor.execute(f"""
+        INSERT INTO attendance_daily
+            (student_id, day, present_count, late_count, absent_count, first_seen, last_seen)
+        {_AGGREGATE}
+        WHERE student_id = %s AND timestamp >= %s AND timestamp < %s
+        GROUP BY student_id, DATE(timestamp)
+    """, (student_id, day, day + timedelta(days=1)))
+
+
+def backfill(cursor, since=None, until=None):
+    """Rebuild the summary for [since, until] (inclusive dates; None = unbounded); returns rows written
+
+    since is raised to the first live partition so archived months keep their counts.
+    """
+    oldest = attendance_partitions.live_since(attendance_partitions.list_partitions(cursor))
+    if oldest and (since is None or since < oldest):
+        log.warning("Backfill starts at %s, the first live attendance partition; earlier summary rows are kept", oldest)
+        since = oldest
+    if since and until and until < since:
+        return 0
+    conditions, params = [], []
+    if since:
+        conditions.append("timestamp >= %s")
+        params.append(since)
+    if until:
+        conditions.append("timestamp < %s")
+        params.append(until + timedelta(days=1))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    day_conditions = [c.replace('timestamp', 'day') for c in conditions]
+    cursor.execute(f"DELETE FROM attendance_daily {'WHERE ' + ' AND '.join(day_conditions) if day_conditions else ''}",
+                   params)
+    cursor.execute(f"""
+        INSERT INTO attendance_daily
+            (student_id, day, present_count, late_count, absent_count, first_seen, last_seen)
+        {_AGGREGATE}
+        {where}
+        GROUP BY student_id, DATE(timestamp)
+    """, params)
+    return cursor.rowcount
+
+
+def student_totals(cursor, student_id, since=None):
+    """{'days_attended', 'days_late', 'days_absent', 'last_seen'} for one student from the summary"""
+    cursor.execute("""
+        SELECT SUM(present_count + late_count > 0), SUM(late_count > 0),
+               SUM(present_count + late_count = 0 AND absent_count > 0), MAX(last_seen)
+        FROM attendance_daily WHERE student_id = %s AND day >= %s
+    """, (student_id, since or date.min))
+    attended, late, absent, last_seen = cursor.fetchone()
+    return {'days_attended': int(attended or 0), 'days_late': int(late or 0),
+            'days_absent': int(absent or 0), 'last_seen': last_seen}
+
+
+def daily_headcount(cursor, since, until):
+    """[(day, students attended, students late)] for each day with events in [since, until]"""
+    cursor.execute("""
+        SELECT day, SUM(present_count + late_count > 0), SUM(late_count > 0)
+        FROM attendance_daily WHERE day BETWEEN %s AND %s
+        GROUP BY day ORDER BY day
+    """, (since, until))
+    return [(day, int(attended or 0), int(late or 0)) for day, attended, late in cursor.fetchall()]
+
+
+def attendance_rates(cursor, since, until):
+    """[(serial_number, username, days attended, days late, rate)] over the school days in [since, until]
+
+    School days are the days on which anyone attended.
+    """
+    cursor.execute("""
+        SELECT COUNT(DISTINCT day) FROM attendance_daily
+        WHERE day BETWEEN %s AND %s AND present_count + late_count > 0
+    """, (since, until))
+    school_days = cursor.fetchone()[0] or 0
+    cursor.execute("""
+        SELECT s.serial_number, s.username,
+               COALESCE(SUM(d.present_count + d.late_count > 0), 0), COALESCE(SUM(d.late_count > 0), 0)
+        FROM students s
+        LEFT JOIN attendance_daily d ON d.student_id = s.id AND d.day BETWEEN %s AND %s
+        GROUP BY s.id, s.serial_number, s.username
+        ORDER BY s.serial_number
+    """, (since, until))
+    return [(serial, name, int(attended), int(late), attended / school_days if school_days else 0.0)
+            for serial, name, attended, late in cursor.fetchall()]
+
+
+def parse_date(value):
+    return date.fromisoformat(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain and query the daily attendance summary")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument('--backfill', action='store_true', help="Rebuild attendance_daily from raw attendance")
+    action.add_argument('--report', action='store_true', help="Print daily headcounts and attendance rates")
+    parser.add_argument('--since', type=parse_date, help="First day (YYYY-MM-DD)")
+    parser.add_argument('--until', type=parse_date, help="Last day (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    conn = __get_db_connection()
+    cursor = conn.cursor()
+    try:
+        create_table(cursor)
+        if args.backfill:
+            print(f"🔄 Rebuilding attendance_daily ({args.since or 'start'} .. {args.until or 'now'})...")
+            backfill(cursor, args.since, args.until)
+            conn.commit()
+            cursor.execute("SELECT COUNT(*) FROM attendance_daily")
+            print(f"✅ attendance_daily has {cursor.fetchone()[0]} student-days")
+        else:
+            since = args.since or date.today() - timedelta(days=30)
+            until = args.until or date.today()
+            print(f"📅 Daily headcount {since} .. {until}")
+            for day, attended, late in daily_headcount(cursor, since, until):
+                print(f"   {day}  {attended:>5} attended  {late:>4} late")
+            print("\n👥 Attendance rate per student")
+            for serial, name, attended, late, rate in attendance_rates(cursor, since, until):
+                print(f"   #{serial:<10} {name:<24} {attended:>4} days  {late:>3} late  {rate:6.1%}")
+    finally:
+        cursor.close()
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Offline attendance from a recorded lecture video
+
+Streams a video file through a generator pipeline with bounded memory:
+
+    sampled frames -> detected face crops -> batches -> embeddings -> gallery matches
+
+and produces a per-student first-seen / last-seen report. Only one batch of
+crops is held in memory at a time, whatever the length of the video.
+Frames that are not sampled are grabbed but never converted, so a 1080p
+recording is processed much faster than real time at the default 1 fps.
+
+Usage:
+    python3 batch_recognize.py lecture.mp4
+    python3 batch_recognize.py lecture.mp4 --fps 0.5 --report report.csv
+    python3 batch_recognize.py lecture.mp4 --recorded-at "2025-03-14 09:00" --mark-attendance
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+import cv2
+import numpy as np
+
+import app as attendance_app
+import detectors
+
+MAX_FRAME_SIDE = 800  # Same working size as /recognize
+
+
+def sampled_frames(path, sample_fps, max_side=MAX_FRAME_SIDE):
+    """Yield (seconds into video, RGB frame) at sample_fps"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video {path}")
+
+    interval = 1.0 / sample_fps
+    next_sample = 0.0
+    try:
+        while cap.grab():
+            seconds = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            if seconds < next_sample:
+                continue
+            next_sample = seconds + interval
+
+            ok, frame = cap.retrieve()
+            if not ok:
+                continue
+
+            scale = max_side / max(frame.shape[:2])
+            if scale < 1:
+                frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            yield seconds, np.ascontiguousarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    finally:
+        cap.release()
+
+
+def face_crops(frames, profile):
+    """Yield (seconds, face crop) for every face in every sampled frame"""
+    for seconds, frame in frames:
+        for face in detectors.detect_faces(frame, profile):
+            yield seconds, face['face']
+
+
+def batched(items, batch_size):
+    """Group an iterator into lists of at most batch_size"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def embed_batch(crops, tag):
+    """Embed a list of face crops detected with tag's profile, in one DeepFace call when supported"""
+    if len(crops) > 1 and embed_batch.supports_batches:
+        try:
+            results = attendance_app.get_deepface().represent(
+                img_path=list(crops),
+                model_name=attendance_app.model_from_tag(tag),
+                detector_backend='skip',
+                enforce_detection=False
+            )
+            if len(results) == len(crops) and isinstance(results[0], list):
+                return [np.array(r[0]['embedding']) if r else None for r in results]
+        except Exception:
+            pass
+        # Older DeepFace releases only take one image per call
+        embed_batch.supports_batches = False
+
+    return [attendance_app.embed_face_crop(crop, tag) for crop in crops]
+
+embed_batch.supports_batches = True
+
+
+def recognize_video(path, sample_fps, batch_size, profile):
+    """Run the pipeline and return {name: {first_seen, last_seen, sightings, best_distance}}"""
+    gallery = attendance_app.current_gallery()
+    if len(gallery.embeddings) == 0:
+        print("❌ No registered students in the gallery")
+        return {}
+
+    # Detect and embed the way the served gallery was enrolled, whatever the current defaults are
+    tag = attendance_app.active_model_tag(gallery)
+    detector = attendance_app.gallery_profile(gallery, profile)
+    seen = {}
+    for batch in batched(face_crops(sampled_frames(path, sample_fps), detector), batch_size):
+        embeddings = embed_batch([crop for _, crop in batch], tag)
+        for (seconds, _), face_embedding in zip(batch, embeddings):
+            if face_embedding is None:
+                continue
+            name, distance = attendance_app.match_face(face_embedding, gallery, query_tag=tag)
+            if name is None:
+                continue
+
+            entry = seen.setdefault(name, {'first_seen': seconds, 'last_seen': seconds,
+                                           'sightings': 0, 'best_distance': distance})
+            entry['first_seen'] = min(entry['first_seen'], seconds)
+            entry['last_seen'] = max(entry['last_seen'], seconds)
+            entry['sightings'] += 1
+            entry['best_distance'] = min(entry['best_distance'], distance)
+    return seen
+
+
+def format_offset(seconds):
+    return str(timedelta(seconds=int(seconds)))
+
+
+def write_report(seen, report_path):
+    rows = [
+        {'student': name, 'first_seen': format_offset(e['first_seen']), 'last_seen': format_offset(e['last_seen']),
+         'sightings': e['sightings'], 'best_distance': round(float(e['best_distance']), 3)}
+        for name, e in sorted(seen.items(), key=lambda item: item[1]['first_seen'])
+    ]
+
+    if report_path and report_path.endswith('.json'):
+        with open(report_path, 'w') as f:
+            json.dump(rows, f, indent=2)
+        return
+
+    out = open(report_path, 'w', newline='') if report_path else sys.stdout
+    try:
+        writer = csv.DictWriter(out, fieldnames=['student', 'first_seen', 'last_seen', 'sightings', 'best_distance'])
+        writer.writeheader()
+        writer.writerows(rows)
+    finally:
+        if report_path:
+            out.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline attendance from a recorded video")
+    parser.add_argument('video', help="Path to the recording")
+    parser.add_argument('--fps', type=float, default=1.0, help="Frames sampled per second of video")
+    parser.add_argument('--batch-size', type=int, default=16, help="Face crops embedded per batch")
+    # Only aligned profiles: unaligned overlay crops aren't comparable with the gallery
+    parser.add_argument('--profile', default='attendance', choices=['attendance', 'enrolment'],
+                        help="Detector profile used on sampled frames (its backend follows the served gallery)")
+    parser.add_argument('--report', help="Write the report to a .csv or .json file (default: stdout)")
+    parser.add_argument('--mark-attendance', action='store_true',
+                        help="Insert an attendance row per recognized student")
+    parser.add_argument('--recorded-at', help="Wall-clock start of the recording, 'YYYY-MM-DD HH:MM[:SS]'")
+    args = parser.parse_args()
+
+    recorded_at = None
+    if args.recorded_at:
+        fmt = '%Y-%m-%d %H:%M:%S' if args.recorded_at.count(':') == 2 else '%Y-%m-%d %H:%M'
+        recorded_at = datetime.strptime(args.recorded_at, fmt)
+
+    attendance_app.startup()
+
+    print(f"🎬 Processing {args.video} at {args.fps} fps (batch size {args.batch_size})...", file=sys.stderr)
+    start = time.perf_counter()
+    seen = recognize_video(args.video, args.fps, args.batch_size, args.profile)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Recognized {len(seen)} student(s) in {elapsed:.1f}s", file=sys.stderr)
+
+    write_report(seen, args.report)
+
+    if args.mark_attendance:
+        for name, entry in seen.items():
+            timestamp = recorded_at + timedelta(seconds=entry['first_seen']) if recorded_at else None
+            attendance_app.mark_attendance(name, timestamp=timestamp)
+        print(f"📝 Attendance marked for {len(seen)} student(s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Detector profile benchmark
+
+Runs every detector profile from detectors.py over a folder of images and
+reports per-profile latency (mean/p50/p95) and box recall against
+ground-truth annotations.
+
+Images are resized the same way the endpoints do it (400x300 for the live
+overlay, 800x800 for attendance/enrolment) and annotations are scaled to
+match.
+
+Usage:
+    python3 benchmarks/bench_detectors.py --images known_faces/
+    python3 benchmarks/bench_detectors.py --images data/ --annotations data/boxes.json --json out.json
+
+The annotations file maps image filename -> list of [x, y, w, h] boxes in
+original image coordinates. Without it, every image is assumed to contain
+exactly one face and recall falls back to "at least one box found".
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import detectors
+
+# Working resolution each endpoint feeds to its detector
+PROFILE_SIZES = {
+    'overlay': (400, 300),
+    'attendance': (800, 800),
+    'enrolment': (800, 800),
+}
+
+IOU_THRESHOLD = 0.5
+
+
+def iou(a, b):
+    """Intersection over union of two (x, y, w, h) boxes"""
+    ax2, ay2 = a[0] + a[2], a[1] + a[3]
+    bx2, by2 = b[0] + b[2], b[1] + b[3]
+    iw = max(0, min(ax2, bx2) - max(a[0], b[0]))
+    ih = max(0, min(ay2, by2) - max(a[1], b[1]))
+    inter = iw * ih
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union else 0.0
+
+
+def load_images(folder):
+    for filename in sorted(os.listdir(folder)):
+        if filename.lower().endswith(('.jpg', '.jpeg', '.png')):
+            yield filename, Image.open(os.path.join(folder, filename)).convert('RGB')
+
+
+def bench_profile(profile, images, annotations, repeats):
+    size = PROFILE_SIZES.get(profile, (800, 800))
+    latencies = []
+    matched = total = 0
+
+    for filename, original in images:
+        img = original.copy()
+        img.thumbnail(size)
+        arr = np.ascontiguousarray(np.array(img, dtype=np.uint8))
+        scale = img.width / original.width
+
+        for _ in range(repeats):
+            start = time.perf_counter()
+            faces = detectors.detect_faces(arr, profile)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        boxes = [(f['x'], f['y'], f['width'], f['height']) for f in faces]
+        if filename in annotations:
+            truth = [[v * scale for v in box] for box in annotations[filename]]
+            total += len(truth)
+            matched += sum(1 for t in truth if any(iou(t, b) >= IOU_THRESHOLD for b in boxes))
+        elif not annotations:
+            total += 1
+            matched += 1 if boxes else 0
+
+    latencies = np.array(latencies)
+    return {
+        'profile': profile,
+        'backend': detectors.get_profile(profile).backend,
+        'size': f"{size[0]}x{size[1]}",
+        'frames': int(len(latencies)),
+        'mean_ms': float(latencies.mean()) if len(latencies) else 0.0,
+        'p50_ms': float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+        'p95_ms': float(np.percentile(latencies, 95)) if len(latencies) else 0.0,
+        'recall': matched / total if total else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark detector profiles")
+    parser.add_argument('--images', required=True, help="Folder of test images")
+    parser.add_argument('--annotations', help="JSON file of ground-truth boxes per image")
+    parser.add_argument('--profiles', default=','.join(detectors.PROFILES),
+                        help="Comma-separated profiles to run (default: all)")
+    parser.add_argument('--repeats', type=int, default=3, help="Timed runs per image")
+    parser.add_argument('--json', help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    annotations = {}
+    if args.annotations:
+        with open(args.annotations) as f:
+            annotations = json.load(f)
+
+    images = list(load_images(args.images))
+    if not images:
+        print(f"❌ No images found in {args.images}")
+        sys.exit(1)
+
+    print(f"📷 {len(images)} images, {args.repeats} runs each\n")
+    print(f"{'profile':<12} {'backend':<12} {'size':<9} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'recall':>8}")
+
+    results = []
+    for profile in args.profiles.split(','):
+        # Untimed pass so model/cascade loading doesn't skew the numbers
+        detectors.detect_faces(np.zeros((300, 400, 3), dtype=np.uint8), profile)
+        r = bench_profile(profile, images, annotations, args.repeats)
+        results.append(r)
+        print(f"{r['profile']:<12} {r['backend']:<12} {r['size']:<9} {r['mean_ms']:>9.1f} "
+              f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['recall']:>8.1%}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the recognition internals
+
+Times the pieces of the recognition path in isolation, with synthetic data
+and no database:
+
+- match/*    compare_faces(), the two-stage nearest_identity() search and
+             the identities_within() radius query behind /register's
+             duplicate check
+- gallery/*  parsing embedding rows (load_known_faces) and publishing +
+             mapping the shared gallery
+- decode/*   base64 data URL -> PIL -> thumbnail -> numpy, per format and
+             resolution (what /recognize and /detect_face do per frame)
+- embed/*    extract_face_embedding(), embedding cache hits and
+             embed_face_crop() around a stub model
+
+Gallery cases run at every --sizes (default 100 / 10k / 100k embeddings),
+image cases at every --resolutions. The stub stands in for DeepFace (a
+deterministic embedding derived from the pixels, plus an optional fixed
+--stub-cost-ms), so embed/* measures our own overhead; pass --real-model to
+time DeepFace itself.
+
+Each case is calibrated to run for at least ~20 ms per sample and the
+median and minimum of --repeat samples are reported. Results can be saved
+with --json and compared against a stored run with --baseline. The
+comparison uses the minimum, which is the least sensitive to other load on
+the machine; a case more than --tolerance slower than the baseline is
+flagged and the exit status is 1. Changes are measured relative to the
+run's median change over all cases the two runs share: a slower or busier
+host moves every case, a regression moves a few. A case beyond the
+tolerance is timed a second time and the faster run counts. Timings still
+only compare on the same setup: each run records the CPU, Python, numpy
+and model it ran with, and against a baseline from a different setup
+slowdowns are a warning only (--any-machine fails on them anyway).
+
+Usage:
+    python3 benchmarks/bench_recognition.py --json bench.json
+    python3 benchmarks/bench_recognition.py --baseline benchmarks/baseline.json
+    python3 benchmarks/bench_recognition.py --json benchmarks/baseline.json   # refresh the baseline
+    python3 benchmarks/bench_recognition.py --quick --filter match/
+"""
+
+import argparse
+import base64
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from io import BytesIO
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as attendance_app
+from embedding_cache import EmbeddingCache
+from gallery import SharedGallery, identities_within, nearest_identity
+
+EMBEDDING_DIM = 128  # Facenet
+DEFAULT_SIZES = '100,10000,100000'
+DEFAULT_RESOLUTIONS = '640x480,1280x720,1920x1080'
+QUICK_SIZES = '100,10000'
+QUICK_RESOLUTIONS = '640x480'
+MIN_SAMPLE_SECONDS = 0.02
+
+
+class StubDeepFace:
+    """Stands in for DeepFace: a deterministic embedding per image, at a fixed cost"""
+
+    def __init__(self, dim=EMBEDDING_DIM, cost_ms=0.0):
+        self.dim = dim
+        self.cost = cost_ms / 1000.0
+
+    def build_model(self, model_name):
+        return None
+
+    def represent(self, img_path, model_name=None, detector_backend='opencv', align=True, enforce_detection=True):
+        arr = np.asarray(img_path)
+        if self.cost:
+            time.sleep(self.cost)
+        seed = zlib.crc32(np.ascontiguousarray(arr[::16, ::16]).tobytes())
+        embedding = np.random.default_rng(seed).standard_normal(self.dim)
+        h, w = arr.shape[:2]
+        return [{'embedding': embedding.tolist(), 'facial_area': {'x': 0, 'y': 0, 'w': w, 'h': h},
+                 'face_confidence': 1.0}]
+
+
+def synthetic_gallery(size, per_identity, rng):
+    """size embeddings in identities of per_identity rows, grouped like load_known_faces returns them"""
+    identities = max(1, size // per_identity)
+    centers = rng.standard_normal((identities, EMBEDDING_DIM)).astype(np.float32) * 5
+    owner = np.minimum(np.arange(size) // per_identity, identities - 1)
+    embeddings = centers[owner] + rng.standard_normal((size, EMBEDDING_DIM)).astype(np.float32)
+    names = [f"{i:06d}_student{i}" for i in owner]
+    return list(embeddings), names
+
+
+def synthetic_frame(width, height, rng):
+    """Camera-like frame: smooth background, a few shapes and sensor noise (compresses like a real one)"""
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = np.stack([np.broadcast_to(x, (height, width)), np.broadcast_to(y, (height, width)),
+                     np.full((height, width), 128, dtype=np.float32)], axis=2)
+    noisy = np.clip(base + rng.normal(0, 6, base.shape), 0, 255).astype(np.uint8)
+    img = Image.fromarray(noisy)
+    draw = ImageDraw.Draw(img)
+    for _ in range(4):
+        cx, cy, r = rng.integers(0, width), rng.integers(0, height), rng.integers(20, max(21, height // 4))
+        draw.ellipse([cx - r, cy - r, cx + r, cy + r], fill=tuple(int(v) for v in rng.integers(0, 255, 3)))
+    return img
+
+
+def data_url(img, fmt):
+    buffer = BytesIO()
+    options = {'quality': 80} if fmt == 'JPEG' else {}
+    img.save(buffer, format=fmt, **options)
+    return f"data:image/{fmt.lower()};base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+def decode_frame(img_data, max_size):
+    """The endpoints' per-frame decode path"""
+    bts = base64.b64decode(img_data.split(',')[1])
+    img = Image.open(BytesIO(bts)).convert('RGB')
+    img.thumbnail(max_size)
+    return np.ascontiguousarray(np.array(img, dtype=np.uint8))
+
+
+def measure(fn, repeat):
+    """Median/min seconds per call over repeat samples of a calibrated number of calls"""
+    fn()  # Warm-up (imports, caches, page faults)
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SAMPLE_SECONDS or number >= 1 << 16:
+            break
+        number *= 2
+    # Slow cases (seconds per call) don't need as many samples
+    repeat = min(repeat, 3) if elapsed / number > 1.0 else repeat
+
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    samples = np.array(samples)
+    return {
+        'median_ms': float(np.median(samples)) * 1000,
+        'min_ms': float(samples.min()) * 1000,
+        'spread_pct': float((samples.max() - samples.min()) / np.median(samples) * 100),
+        'number': number,
+        'repeat': len(samples),
+    }
+
+
+def run_cases(args, wanted):
+    """Measure and print every case whose name passes wanted(name); returns {name: result}"""
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, fn in build_cases(args, workdir):
+            if not wanted(name):
+                continue
+            r = results[name] = measure(fn, args.repeat)
+            print(f"{name:<40} {r['median_ms']:>10.3f} {r['min_ms']:>10.3f} {r['spread_pct']:>7.1f}% "
+                  f"{r['number'] * r['repeat']:>8}")
+    return results
+
+
+def build_cases(args, workdir):
+    """Yield (case name, callable) pairs; data is built lazily per case group"""
+    rng = np.random.default_rng(0)
+    sizes = [int(s) for s in args.sizes.split(',')]
+    resolutions = [tuple(int(v) for v in r.split('x')) for r in args.resolutions.split(',')]
+
+    for size in sizes:
+        embeddings, names = synthetic_gallery(size, args.per_identity, rng)
+        query = embeddings[len(embeddings) // 2] + 0.1
+
+        gallery = SharedGallery(os.path.join(workdir, f"gallery-{size}"))
+        attendance_app.face_gallery = gallery
+        attendance_app.publish_gallery(embeddings, names, attendance_app.model_tag())
+        snapshot = gallery.snapshot()
+
+        yield f"match/compare_faces[n={size}]", lambda s=snapshot, q=query: attendance_app.compare_faces(s.embeddings, q)
+        yield f"match/nearest_identity[n={size}]", lambda s=snapshot, q=query: nearest_identity(s, q)
+        yield f"match/identities_within[n={size}]", \
+            lambda s=snapshot, q=query: identities_within(s, q, attendance_app.DUPLICATE_THRESHOLD)
+
+        rows = [(name.split('_')[0], name.split('_')[1], json.dumps([float(v) for v in e]))
+                for name, e in zip(names, embeddings)]
+        yield f"gallery/parse_rows[n={size}]", lambda r=rows: attendance_app.parse_embedding_rows(r)
+
+        def publish_and_map(e=embeddings, n=names, g=gallery):
+            attendance_app.face_gallery = g
+            attendance_app.publish_gallery(e, n, attendance_app.model_tag())
+            SharedGallery(g.root).refresh()  # A second worker mapping the new version
+        yield f"gallery/publish_map[n={size}]", publish_and_map
+
+    attendance_app.embedding_cache = EmbeddingCache(os.path.join(workdir, 'embedding_cache'))
+    for width, height in resolutions:
+        frame = synthetic_frame(width, height, rng)
+        for fmt in ('JPEG', 'PNG'):
+            url = data_url(frame, fmt)
+            yield f"decode/{fmt.lower()}[{width}x{height}]", lambda u=url: decode_frame(u, (800, 800))
+
+        arr = decode_frame(data_url(frame, 'JPEG'), (800, 800))
+        yield f"embed/cache_key[{width}x{height}]", lambda a=arr: EmbeddingCache.key(a, 'Facenet', 'opencv')
+        yield f"embed/extract[{width}x{height}]", lambda a=arr: attendance_app.extract_face_embedding(a)
+        yield f"embed/cached_hit[{width}x{height}]", lambda a=arr: attendance_app.cached_face_embedding(a)
+
+    crop = np.ascontiguousarray(np.array(synthetic_frame(160, 160, rng), dtype=np.uint8))
+    yield "embed/crop[160x160]", lambda: attendance_app.embed_face_crop(crop, attendance_app.model_tag())
+
+
+# Fewest shared cases for the median change to stand for the machine rather than the code
+MIN_SHARED_CASES = 5
+
+# Run metadata that must match for timings to be comparable
+MACHINE_KEYS = ('machine', 'cpu', 'cpus', 'python', 'numpy', 'model')
+
+
+def cpu_model():
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith('model name'):
+                    return line.split(':', 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or None
+
+
+def machine_differences(meta, baseline_meta):
+    """MACHINE_KEYS on which a run and its baseline differ, as 'key: baseline -> run'"""
+    return [f"{key}: {baseline_meta.get(key)} -> {meta.get(key)}"
+            for key in MACHINE_KEYS if meta.get(key) != baseline_meta.get(key)]
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def relative_changes(results, baseline):
+    """({case: slowdown relative to the median}, median ratio) over the cases both runs share
+
+    The median (with at least MIN_SHARED_CASES cases) is the machine's own
+    speed difference rather than a change in the code.
+    """
+    ratios = {name: result['min_ms'] / baseline['results'][name]['min_ms']
+              for name, result in results.items() if name in baseline['results']}
+    machine = float(np.median(list(ratios.values()))) if len(ratios) >= MIN_SHARED_CASES else 1.0
+    return {name: ratio / machine - 1 for name, ratio in ratios.items()}, machine
+
+
+def compare(results, baseline, tolerance):
+    """Print the change against a baseline run; return the names of regressed cases"""
+    regressions = []
+    changes, machine = relative_changes(results, baseline)
+    print(f"\n📉 Against baseline {baseline['meta'].get('revision') or ''} (tolerance {tolerance:.0%}, "
+          f"this run {machine - 1:+.1%} overall)")
+    for name, result in results.items():
+        base = baseline['results'].get(name)
+        if not base:
+            print(f"   {name:<40} (new case)")
+            continue
+        change = changes[name]
+        flag = ''
+        if change > tolerance:
+            flag = '  ❌ REGRESSION'
+            regressions.append(name)
+        elif change < -tolerance:
+            flag = '  ✅ faster'
+        print(f"   {name:<40} {base['min_ms']:>10.3f} -> {result['min_ms']:>10.3f} ms  {change:>+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark the recognition internals")
+    parser.add_argument('--sizes', help=f"Comma-separated gallery sizes (embeddings, default {DEFAULT_SIZES})")
+    parser.add_argument('--resolutions', help=f"Comma-separated WxH frame sizes (default {DEFAULT_RESOLUTIONS})")
+    parser.add_argument('--per-identity', type=int, default=3, help="Embeddings per synthetic student")
+    parser.add_argument('--repeat', type=int, help="Timed samples per case (default 5)")
+    parser.add_argument('--filter', help="Only run cases whose name contains this")
+    parser.add_argument('--quick', action='store_true',
+                        help="Smaller defaults for --sizes/--resolutions/--repeat (smoke run)")
+    parser.add_argument('--stub-cost-ms', type=float, default=0.0, help="Simulated model cost per stub call")
+    parser.add_argument('--real-model', action='store_true', help="Use DeepFace instead of the stub model")
+    parser.add_argument('--json', help="Write results to this JSON file")
+    parser.add_argument('--baseline', help="Compare against results saved earlier with --json")
+    # Run-to-run noise of single cases on shared hosts reaches ~40% even after the median correction
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help="Allowed slowdown beyond the run's median before flagging (0.5 = 50%%; "
+                             "tighten on a quiet dedicated machine)")
+    parser.add_argument('--any-machine', action='store_true',
+                        help="Fail on slowdowns even if the baseline was recorded on a different setup")
+    args = parser.parse_args()
+
+    # --quick only changes the defaults; explicit options still win
+    defaults = (QUICK_SIZES, QUICK_RESOLUTIONS, 3) if args.quick else (DEFAULT_SIZES, DEFAULT_RESOLUTIONS, 5)
+    args.sizes = args.sizes or defaults[0]
+    args.resolutions = args.resolutions or defaults[1]
+    args.repeat = args.repeat or defaults[2]
+    if not args.real_model:
+        attendance_app._deepface = StubDeepFace(cost_ms=args.stub_cost_ms)
+
+    print(f"{'case':<40} {'median ms':>10} {'min ms':>10} {'spread':>8} {'calls':>8}")
+    results = run_cases(args, lambda name: not args.filter or args.filter in name)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        # A busy spell on a shared host can slow any one case: time suspects again, keep the faster run
+        suspects = {name for name, change in relative_changes(results, baseline)[0].items() if change > args.tolerance}
+        if suspects:
+            print(f"\n🔁 Re-timing {len(suspects)} case(s) beyond the tolerance")
+            for name, r in run_cases(args, suspects.__contains__).items():
+                if r['min_ms'] < results[name]['min_ms']:
+                    results[name] = r
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'cpu': cpu_model(),
+            'cpus': os.cpu_count(),
+            'model': 'deepface' if args.real_model else f"stub({args.stub_cost_ms}ms)",
+        },
+        'results': results,
+    }
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results written to {args.json}")
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        differences = machine_differences(report['meta'], baseline['meta'])
+        if regressions and differences and not args.any_machine:
+            print(f"\n⚠️  Baseline was recorded on a different setup ({'; '.join(differences)}), so the "
+                  f"{len(regressions)} slower case(s) are not treated as regressions. Record a baseline "
+                  f"on this machine with --json, or pass --any-machine to fail anyway.")
+            return 0
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+        print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
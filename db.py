@@ -1,12 +1,18 @@
+import os
 import mysql.connector
 
+# Defaults match a local XAMPP/MySQL install; override e.g. to point at the
+# throwaway MySQL container used by loadtest/
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'port': int(os.environ.get('DB_PORT', 3306)),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'face_project'),
+}
+
 def __get_db_connection():
-    connection = mysql.connector.connect(
-        host='localhost',
-        user='root',
-        password='',
-        database='face_project'
-    )
+    connection = mysql.connector.connect(**DB_CONFIG)
     return connection
 
 # Add this function to test the connection
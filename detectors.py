@@ -0,0 +1,116 @@
+"""
+Pluggable face detector profiles
+
+Each endpoint picks a profile instead of sharing one hard-coded backend:
+- overlay:    live bounding boxes at high frame rate (OpenCV Haar cascade,
+              the same approach as face_detection.py, no alignment)
+- attendance: RetinaFace detection + alignment before embedding in /recognize
+- enrolment:  RetinaFace detection + alignment for registration photos
+
+Backends are either 'haar' (handled here with OpenCV directly) or any
+DeepFace detector_backend name ('opencv', 'ssd', 'mtcnn', 'retinaface',
+'yunet', ...). Profiles can be overridden with DETECTOR_<PROFILE> env vars,
+e.g. DETECTOR_ENROLMENT=retinaface. Enrolment and attendance should use the
+same backend, otherwise stored and live embeddings come from different crops.
+Overlay boxes are never embedded as they are: /detect_face re-detects and
+aligns the face inside each box with the attendance profile before matching.
+"""
+
+import os
+import threading
+import numpy as np
+from collections import namedtuple
+
+DetectorProfile = namedtuple('DetectorProfile', ['name', 'backend', 'align'])
+
+PROFILES = {
+    'overlay': DetectorProfile('overlay', os.environ.get('DETECTOR_OVERLAY', 'haar'), False),
+    'attendance': DetectorProfile('attendance', os.environ.get('DETECTOR_ATTENDANCE', 'retinaface'), True),
+    'enrolment': DetectorProfile('enrolment', os.environ.get('DETECTOR_ENROLMENT', 'retinaface'), True),
+}
+
+HAAR_CASCADE_PATH = 'haarcascade/haarcascade_frontalface_default.xml'
+
+# cv2.CascadeClassifier is not safe to share between threads, keep one per thread
+_local = threading.local()
+
+
+def get_profile(name):
+    """Look up a detector profile by name"""
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown detector profile: {name}")
+
+
+def load_haar_cascade():
+    """Load the frontal face Haar cascade, preferring the repo copy over OpenCV's bundled one"""
+    import cv2
+
+    cascade_path = HAAR_CASCADE_PATH
+    if not os.path.exists(cascade_path):
+        cascade_path = os.path.join(cv2.data.haarcascades, 'haarcascade_frontalface_default.xml')
+
+    face_cascade = cv2.CascadeClassifier(cascade_path)
+    if face_cascade.empty():
+        raise IOError(f"Cannot load {cascade_path}. Check the file content.")
+    return face_cascade
+
+
+def _thread_cascade():
+    cascade = getattr(_local, 'cascade', None)
+    if cascade is None:
+        cascade = _local.cascade = load_haar_cascade()
+    return cascade
+
+
+def haar_boxes(image_array, scale_factor=1.1, min_neighbors=4, min_size=(30, 30)):
+    """Return (x, y, w, h) boxes for an RGB or grayscale image using the Haar cascade"""
+    import cv2
+
+    if image_array.ndim == 3:
+        gray = cv2.cvtColor(image_array, cv2.COLOR_RGB2GRAY)
+    else:
+        gray = image_array
+
+    faces = _thread_cascade().detectMultiScale(gray, scale_factor, min_neighbors, minSize=min_size)
+    return [tuple(int(v) for v in face) for face in faces]
+
+
+def detect_faces(image_array, profile='overlay'):
+    """Detect faces in an RGB image with the given profile
+
+    Returns a list of dicts with x, y, width, height and face (an RGB uint8
+    crop, aligned when the profile asks for it).
+    """
+    profile = get_profile(profile) if isinstance(profile, str) else profile
+
+    if profile.backend == 'haar':
+        return [
+            {'x': x, 'y': y, 'width': w, 'height': h, 'face': image_array[y:y + h, x:x + w]}
+            for x, y, w, h in haar_boxes(image_array)
+        ]
+
+    from deepface import DeepFace
+
+    face_objs = DeepFace.extract_faces(
+        img_path=image_array,
+        detector_backend=profile.backend,
+        enforce_detection=False,
+        align=profile.align
+    )
+
+    faces = []
+    for face_obj in face_objs:
+        # With enforce_detection=False DeepFace returns the whole frame with confidence 0
+        if not face_obj.get('confidence'):
+            continue
+        area = face_obj['facial_area']
+        faces.append({
+            'x': int(area['x']),
+            'y': int(area['y']),
+            'width': int(area['w']),
+            'height': int(area['h']),
+            'face': (np.asarray(face_obj['face']) * 255).astype(np.uint8)
+        })
+    return faces
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Persistent on-disk cache of face embeddings
+
+Maps (SHA-256 of the decoded image pixels, model name, detector backend) to
+the embedding DeepFace produced for it, so re-uploaded photos, re-added
+students and gallery rebuilds from known_faces/ skip the model entirely.
+Hashing the pixels rather than the file bytes makes PNG/JPEG re-encodes of
+the same capture hit the cache.
+
+Entries are .npy files under EMBEDDING_CACHE_DIR. Hits refresh the file's
+mtime, and once the cache grows past EMBEDDING_CACHE_MAX_MB the least
+recently used entries are evicted. Failed extractions are not cached.
+
+Usage:
+    python3 embedding_cache.py --stats
+    python3 embedding_cache.py --clear
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import threading
+import numpy as np
+
+EMBEDDING_CACHE_DIR = os.environ.get('EMBEDDING_CACHE_DIR', 'embedding_cache')
+EMBEDDING_CACHE_MAX_MB = float(os.environ.get('EMBEDDING_CACHE_MAX_MB', 256))
+
+
+class EmbeddingCache:
+    """Size-bounded LRU of embeddings stored as one .npy file per image"""
+
+    def __init__(self, root=EMBEDDING_CACHE_DIR, max_bytes=int(EMBEDDING_CACHE_MAX_MB * 1024 * 1024)):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._total_bytes = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(image_array, model_name, detector_backend):
+        """Cache key for an image array under a given model/detector"""
+        image_array = np.ascontiguousarray(image_array)
+        digest = hashlib.sha256()
+        digest.update(f"{image_array.shape}|{image_array.dtype}".encode())
+        digest.update(image_array.tobytes())
+        return f"{digest.hexdigest()}-{model_name}-{detector_backend}"
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.npy")
+
+    def get(self, key):
+        """Return the cached embedding, or None on a miss"""
+        path = self._path(key)
+        try:
+            embedding = np.load(path)
+        except (FileNotFoundError, ValueError, OSError):
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)  # Mark as recently used for eviction
+        except OSError:
+            pass
+        self.hits += 1
+        return embedding
+
+    def put(self, key, embedding):
+        """Store an embedding"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        value = np.asarray(embedding, dtype=np.float32)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, value)
+
+        with self._lock:
+            try:
+                replaced = os.path.getsize(path)  # Overwriting a key frees the old entry's bytes
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp_path, path)
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += os.path.getsize(path) - replaced
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith('.npy'):
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield path, st.st_mtime, st.st_size
+
+    def _scan_size(self):
+        return sum(size for _, _, size in self._entries())
+
+    def _evict(self):
+        """Delete least recently used entries until the cache is at 90% of its budget"""
+        target = self.max_bytes * 0.9
+        entries = sorted(self._entries(), key=lambda e: e[1])
+        total = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+        self._total_bytes = total
+
+    def stats(self):
+        entries = list(self._entries())
+        return {'entries': len(entries), 'bytes': sum(size for _, _, size in entries),
+                'max_bytes': self.max_bytes, 'hits': self.hits, 'misses': self.misses}
+
+    def clear(self):
+        with self._lock:
+            shutil.rmtree(self.root, ignore_errors=True)
+            self._total_bytes = 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or clear the embedding cache")
+    parser.add_argument('--stats', action='store_true', help="Show entry count and size")
+    parser.add_argument('--clear', action='store_true', help="Delete every cached embedding")
+    args = parser.parse_args()
+
+    cache = EmbeddingCache()
+    if args.clear:
+        cache.clear()
+        print(f"🗑️  Cleared {cache.root}/")
+    stats = cache.stats()
+    print(f"📦 {stats['entries']} cached embeddings, {stats['bytes'] / 1024 / 1024:.1f} MB "
+          f"of {stats['max_bytes'] / 1024 / 1024:.0f} MB")
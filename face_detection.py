@@ -1,32 +1,33 @@
 import cv2
-import os
+from detectors import load_haar_cascade, haar_boxes
 
-cascade_path = 'haarcascade/haarcascade_frontalface_default.xml'
-if not os.path.exists(cascade_path):
-    raise IOError(f"Cannot find {cascade_path}. Please check the path.")
 
-face_cascade = cv2.CascadeClassifier(cascade_path)
-if face_cascade.empty():
-    raise IOError(f"Cannot load {cascade_path}. Check the file content.")
+def main():
+    # Fails loudly (IOError) if the cascade file is missing or broken
+    load_haar_cascade()
 
-cap = cv2.VideoCapture(0)
+    cap = cv2.VideoCapture(0)
 
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        print("Failed to grab frame from webcam.")
-        break
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            print("Failed to grab frame from webcam.")
+            break
 
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    faces = face_cascade.detectMultiScale(gray, 1.1, 4)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        faces = haar_boxes(gray)
 
-    for (x, y, w, h) in faces:
-        cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 0), 2)
+        for (x, y, w, h) in faces:
+            cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 0), 2)
 
-    cv2.imshow('Face Detection', frame)
+        cv2.imshow('Face Detection', frame)
 
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            break
 
-cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+    cap.release()
+    cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Detection-result cache for repeated, near-identical camera frames
+
+Live pages keep posting frames even when nothing in front of the camera
+changes (empty classroom, paused stream). Each frame is reduced to a 64-bit
+difference hash of a 9x8 grayscale thumbnail; if a recent frame from the
+same camera session hashes within a few bits of it, the previous detection
+result is returned instead of running the pipeline again.
+
+Entries expire after a TTL and the cache is bounded both in sessions and in
+entries per session. The cache is per process, which is fine: a miss only
+costs a normal detection.
+
+ResultTokenStore keeps the per-face embeddings of a detection result behind
+a random token for a few seconds, so /recognize can mark attendance for the
+frame the overlay just analysed without decoding and embedding it again.
+A token can be redeemed any number of times until it expires, because
+gated and cached /detect_face responses resend the token of the unchanged
+scene they stand for.
+"""
+
+import os
+import secrets
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+from PIL import Image
+
+FRAME_CACHE_TTL = float(os.environ.get('FRAME_CACHE_TTL', 5.0))  # seconds
+FRAME_CACHE_MAX_SESSIONS = int(os.environ.get('FRAME_CACHE_MAX_SESSIONS', 256))
+FRAME_CACHE_MAX_DISTANCE = int(os.environ.get('FRAME_CACHE_MAX_DISTANCE', 4))  # differing bits out of 64
+# Matches the motion gate keep-alive: gated/cached results resend the token of an unchanged scene
+RESULT_TOKEN_TTL = float(os.environ.get('RESULT_TOKEN_TTL', 10.0))  # seconds
+RESULT_TOKEN_MAX = int(os.environ.get('RESULT_TOKEN_MAX', 1024))
+
+
+def frame_hash(img):
+    """64-bit difference hash of a PIL image (robust to noise and JPEG artefacts)"""
+    small = np.asarray(img.convert('L').resize((9, 8), Image.BILINEAR), dtype=np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+class FrameResultCache:
+    """Per-session LRU of (frame hash -> detection result) with a TTL"""
+
+    def __init__(self, ttl=FRAME_CACHE_TTL, max_sessions=FRAME_CACHE_MAX_SESSIONS,
+                 max_entries=4, max_distance=FRAME_CACHE_MAX_DISTANCE):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, session_key, hash_value, version=None):
+        """Return a cached result for a near-identical frame, or None
+
+        version lets callers invalidate results computed against an older
+        gallery; entries stored with a different version never match.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entries = self._sessions.get(session_key)
+            if entries:
+                self._sessions.move_to_end(session_key)
+                entries[:] = [e for e in entries if now - e[0] < self.ttl]
+                for stored_at, stored_hash, stored_version, result in reversed(entries):
+                    if stored_version == version and bin(stored_hash ^ hash_value).count('1') <= self.max_distance:
+                        self.hits += 1
+                        return result
+            self.misses += 1
+            return None
+
+    def put(self, session_key, hash_value, result, version=None):
+        with self._lock:
+            entries = self._sessions.setdefault(session_key, [])
+            self._sessions.move_to_end(session_key)
+            entries.append((time.monotonic(), hash_value, version, result))
+            del entries[:-self.max_entries]
+
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+
+
+class ResultTokenStore:
+    """Short-lived tokens for detection results, bound to a camera session and gallery version"""
+
+    def __init__(self, ttl=RESULT_TOKEN_TTL, max_tokens=RESULT_TOKEN_MAX):
+        self.ttl = ttl
+        self.max_tokens = max_tokens
+        self._tokens = OrderedDict()  # Oldest first
+        self._lock = threading.Lock()
+
+    def issue(self, session_key, faces, version=None):
+        """Store per-face data (e.g. embeddings) and return the token that redeems it"""
+        token = secrets.token_urlsafe(16)
+        now = time.monotonic()
+        with self._lock:
+            self._tokens[token] = (now, session_key, version, faces)
+            while self._tokens:
+                issued_at = next(iter(self._tokens.values()))[0]
+                if now - issued_at < self.ttl and len(self._tokens) <= self.max_tokens:
+                    break
+                self._tokens.popitem(last=False)
+        return token
+
+    def redeem(self, token, session_key, version=None):
+        """The faces stored under token, or None if unknown, expired or issued to another session/version"""
+        with self._lock:
+            entry = self._tokens.get(token)
+        if entry is None:
+            return None
+        issued_at, owner, stored_version, faces = entry
+        if owner != session_key or stored_version != version or time.monotonic() - issued_at >= self.ttl:
+            return None
+        return faces
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
@@ -0,0 +1,275 @@
+"""
+Shared face gallery for multi-process deployments
+
+The gallery (float32 embedding matrix + identity names) is published as a
+versioned directory of .npy files. Every worker memory-maps the same files
+read-only, so the pages are shared by the OS page cache instead of being
+copied into each process. A small CURRENT pointer file carries a version
+counter; workers stat it on each access and remap only when it changes.
+
+A student can have several embeddings. Rows are grouped by identity and
+published with an offsets array plus one prototype (mean embedding) per
+identity, so nearest_identity() can rank identities by prototype first and
+then re-rank only the best few candidates against their exact embeddings.
+identities_within() answers radius queries (e.g. the duplicate check at
+registration) with one exact pass over the matrix. append() publishes a new
+student's rows on top of the latest version without rebuilding the rest.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import shutil
+import numpy as np
+from collections import namedtuple
+
+log = logging.getLogger('face.gallery')
+
+GALLERY_DIR = os.environ.get('GALLERY_DIR', 'gallery_store')
+
+# Identities re-ranked exactly after the prototype pass
+PROTOTYPE_CANDIDATES = int(os.environ.get('PROTOTYPE_CANDIDATES', 5))
+
+GallerySnapshot = namedtuple('GallerySnapshot', ['version', 'embeddings', 'names', 'meta', 'arrays'])
+
+EMPTY_SNAPSHOT = GallerySnapshot(0, np.zeros((0, 0), dtype=np.float32), [], {}, {})
+
+
+def _stack(embeddings):
+    if len(embeddings):
+        return np.ascontiguousarray(np.vstack(embeddings), dtype=np.float32)
+    return np.zeros((0, 0), dtype=np.float32)
+
+
+def build_identity_arrays(embeddings, names):
+    """Group per-row names into identities: (identities, offsets, prototypes)
+
+    Rows must already be grouped by identity; rows of identity i are
+    embeddings[offsets[i]:offsets[i + 1]].
+    """
+    if not len(names):
+        return [], np.zeros(1, dtype=np.int64), np.zeros((0, 0), dtype=np.float32)
+
+    identities = []
+    offsets = []
+    for i, name in enumerate(names):
+        if not identities or identities[-1] != name:
+            identities.append(name)
+            offsets.append(i)
+    offsets.append(len(names))
+
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    prototypes = np.array([matrix[offsets[i]:offsets[i + 1]].mean(axis=0) for i in range(len(identities))],
+                          dtype=np.float32)
+    return identities, np.array(offsets, dtype=np.int64), prototypes
+
+
+def nearest_identity(snapshot, query, candidates=PROTOTYPE_CANDIDATES):
+    """Closest identity to query as (name, distance), or (None, inf) for an empty gallery
+
+    Stage 1 ranks identities by distance to their prototype; stage 2 takes the
+    exact minimum distance over the embeddings of the top candidates only.
+    """
+    prototypes = snapshot.arrays.get('prototypes')
+    offsets = snapshot.arrays.get('offsets')
+    if prototypes is None or len(prototypes) == 0:
+        return None, float('inf')
+
+    query = np.asarray(query, dtype=np.float32)
+    proto_distances = np.linalg.norm(prototypes - query, axis=1)
+    k = min(candidates, len(proto_distances))
+    shortlist = np.argpartition(proto_distances, k - 1)[:k]
+
+    best_identity, best_distance = None, float('inf')
+    for i in shortlist:
+        rows = snapshot.embeddings[offsets[i]:offsets[i + 1]]
+        distance = float(np.linalg.norm(rows - query, axis=1).min())
+        if distance < best_distance:
+            best_identity, best_distance = i, distance
+
+    return snapshot.meta['identities'][best_identity], best_distance
+
+
+def identities_within(snapshot, query, radius, limit=3):
+    """Identities with an embedding closer than radius to query, closest first
+
+    One vectorised distance pass over every embedding, reduced to the minimum
+    per identity; returns up to limit (name, distance) pairs.
+    """
+    offsets = snapshot.arrays.get('offsets')
+    if offsets is None or len(offsets) < 2 or not len(snapshot.embeddings):
+        return []
+
+    query = np.asarray(query, dtype=np.float32)
+    distances = np.linalg.norm(snapshot.embeddings - query, axis=1)
+    per_identity = np.minimum.reduceat(distances, offsets[:-1])
+    within = np.flatnonzero(per_identity < radius)
+    closest = within[np.argsort(per_identity[within], kind='stable')[:limit]]
+    return [(snapshot.meta['identities'][i], float(per_identity[i])) for i in closest]
+
+
+class SharedGallery:
+    """Memory-mapped gallery shared by every worker process on the host"""
+
+    def __init__(self, root=GALLERY_DIR, keep_versions=3):
+        self.root = root
+        self.keep_versions = keep_versions
+        self._current_path = os.path.join(root, 'CURRENT')
+        self._lock_path = os.path.join(root, '.lock')
+        self._stat_key = None
+        self._snapshot = EMPTY_SNAPSHOT
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    def snapshot(self):
+        """Return the currently mapped gallery (an immutable snapshot)"""
+        return self._snapshot
+
+    def publish(self, embeddings, names, arrays=None, **meta):
+        """Write a new gallery version and point CURRENT at it; returns the new version
+
+        arrays are extra named numpy arrays mapped alongside the embeddings.
+        """
+        matrix = _stack(embeddings)
+        return self._write(lambda pointer: (matrix, list(names), arrays or {}, meta))
+
+    def append(self, embeddings, names, **meta):
+        """Publish the latest version plus the rows of new identities; returns the new version
+
+        The incremental counterpart of publish() for enrolment: the latest
+        version is read back under the publish lock (so another worker's
+        append isn't lost) and only the new rows are grouped into identities,
+        with their offsets and prototypes appended to the existing ones.
+        Rows must be grouped by identity and the identities must be new; meta
+        (e.g. model_tag) must match the latest version's. Raises ValueError
+        otherwise, and the caller should publish() the full gallery instead.
+        """
+        identities, offsets, prototypes = build_identity_arrays(embeddings, names)
+        rows = _stack(embeddings)
+
+        def build(pointer):
+            latest = self._map(pointer) if pointer else None
+            if latest is None or not latest.meta['count']:
+                base = {key: value for key, value in (latest.meta if latest else {}).items()
+                        if key not in ('count', 'arrays')}
+                return rows, list(names), {'offsets': offsets, 'prototypes': prototypes}, dict(base, identities=identities, **meta)
+
+            stale = sorted(key for key, value in meta.items() if latest.meta.get(key) != value)
+            if stale or 'identities' not in latest.meta:
+                raise ValueError(f"Gallery version {latest.version} differs in {stale or ['identities']}")
+            if set(identities) & set(latest.meta['identities']):
+                raise ValueError("Appended identities are already in the gallery")
+            if rows.shape[1] != latest.embeddings.shape[1]:
+                raise ValueError(f"Embedding dimension {rows.shape[1]} differs from the gallery's")
+
+            base = {key: value for key, value in latest.meta.items() if key not in ('count', 'arrays')}
+            arrays = {'offsets': np.concatenate([latest.arrays['offsets'][:-1], offsets + len(latest.names)]),
+                      'prototypes': np.vstack([latest.arrays['prototypes'], prototypes])}
+            return (np.vstack([latest.embeddings, rows]), latest.names + list(names), arrays,
+                    dict(base, identities=latest.meta['identities'] + identities))
+
+        return self._write(build)
+
+    def _write(self, build):
+        """Write the version build(latest pointer) returns as (matrix, names, arrays, meta)"""
+        os.makedirs(self.root, exist_ok=True)
+
+        with open(self._lock_path, 'a') as lock:
+            # Serialise publishers so the version counter never goes backwards
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                pointer = self._read_pointer()
+                matrix, names, arrays, meta = build(pointer)
+                version = (pointer['version'] if pointer else 0) + 1
+                version_dir = f"v{version:08d}"
+                target = os.path.join(self.root, version_dir)
+                os.makedirs(target, exist_ok=True)
+
+                np.save(os.path.join(target, 'embeddings.npy'), matrix)
+                for array_name, array in arrays.items():
+                    np.save(os.path.join(target, f"{array_name}.npy"), np.ascontiguousarray(array))
+                with open(os.path.join(target, 'meta.json'), 'w') as f:
+                    json.dump(dict(meta, names=list(names), count=int(matrix.shape[0]),
+                                   arrays=sorted(arrays)), f)
+
+                tmp_path = self._current_path + '.tmp'
+                with open(tmp_path, 'w') as f:
+                    json.dump({'version': version, 'dir': version_dir}, f)
+                os.replace(tmp_path, self._current_path)
+
+                self._prune(version)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+        self.refresh()
+        return version
+
+    def refresh(self):
+        """Remap the gallery if another process published a newer version
+
+        Costs a single stat() when nothing changed. Returns True when a
+        gallery is mapped.
+        """
+        try:
+            st = os.stat(self._current_path)
+        except FileNotFoundError:
+            return False
+
+        stat_key = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if stat_key == self._stat_key:
+            return True
+
+        pointer = self._read_pointer()
+        if not pointer:
+            return False
+
+        if pointer['version'] != self._snapshot.version:
+            try:
+                self._snapshot = self._map(pointer)
+            except (OSError, ValueError) as e:
+                log.error("Failed to map gallery version %s: %s", pointer['version'], e)
+                return self._snapshot.version > 0
+
+        self._stat_key = stat_key
+        return True
+
+    def _read_pointer(self):
+        try:
+            with open(self._current_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _map(self, pointer):
+        version_dir = os.path.join(self.root, pointer['dir'])
+        with open(os.path.join(version_dir, 'meta.json')) as f:
+            meta = json.load(f)
+
+        names = meta.pop('names')
+        if meta['count'] == 0:
+            embeddings = np.zeros((0, 0), dtype=np.float32)
+        else:
+            # Read-only mapping: every worker shares the same physical pages
+            embeddings = np.load(os.path.join(version_dir, 'embeddings.npy'), mmap_mode='r')
+
+        arrays = {}
+        for array_name in meta.get('arrays', []):
+            path = os.path.join(version_dir, f"{array_name}.npy")
+            arrays[array_name] = np.load(path, mmap_mode='r' if meta['count'] else None)
+
+        return GallerySnapshot(pointer['version'], embeddings, names, meta, arrays)
+
+    def _prune(self, latest_version):
+        """Remove old version directories (open mappings stay valid after unlink)"""
+        for entry in os.listdir(self.root):
+            if not entry.startswith('v'):
+                continue
+            try:
+                version = int(entry[1:])
+            except ValueError:
+                continue
+            if version <= latest_version - self.keep_versions:
+                shutil.rmtree(os.path.join(self.root, entry), ignore_errors=True)
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Headless multi-camera ingest worker
+
+Reads fixed classroom cameras (device index, video file or RTSP URL)
+without a browser or a display, and feeds sampled frames straight into the
+same detection -> embedding -> gallery match -> mark_attendance pipeline the
+Flask app uses, without going through HTTP.
+
+- Every source is decoded on its own thread. Frames are sampled at --fps
+  (by media time for files, wall-clock for live sources).
+- Live sources keep only the newest sampled frame; when recognition can't
+  keep up the older frame is dropped and counted. Files block instead, so
+  no part of a recording is skipped.
+- A student is marked at most once per --cooldown seconds across all streams.
+- Per-stream decode/processing FPS and drop counters are printed every
+  --stats-interval seconds.
+
+Usage:
+    python3 ingest.py --source 0
+    python3 ingest.py --source room101=rtsp://10.0.0.5/stream --source room102=rtsp://10.0.0.6/stream
+    python3 ingest.py --source lecture.mp4 --fps 1
+"""
+
+import argparse
+import queue
+import threading
+import time
+import cv2
+import numpy as np
+
+import app as attendance_app
+import detectors
+
+MAX_FRAME_SIDE = 800  # Same working size as /recognize
+
+
+class StreamStats:
+    def __init__(self):
+        self.decoded = 0
+        self.sampled = 0
+        self.processed = 0
+        self.dropped = 0
+        self.faces = 0
+        self.recognized = 0
+        self.reconnects = 0
+        self._window_start = time.monotonic()
+        self._window_decoded = 0
+        self._window_processed = 0
+
+    def rates(self):
+        """Decode and processing FPS since the previous call"""
+        now = time.monotonic()
+        elapsed = max(now - self._window_start, 1e-6)
+        decode_fps = (self.decoded - self._window_decoded) / elapsed
+        process_fps = (self.processed - self._window_processed) / elapsed
+        self._window_start, self._window_decoded, self._window_processed = now, self.decoded, self.processed
+        return decode_fps, process_fps
+
+
+def parse_source(spec):
+    """'name=url', a device index or a plain path/URL -> (name, capture source, is_live)"""
+    name, source = '', spec
+    if '=' in spec:
+        head, tail = spec.split('=', 1)
+        # Only treat it as a label if the part before '=' isn't itself a path or URL
+        if '/' not in head and ':' not in head:
+            name, source = head, tail
+
+    if source.isdigit():
+        return name or f"camera{source}", int(source), True
+    is_live = '://' in source
+    return name or source, source, is_live
+
+
+class StreamReader(threading.Thread):
+    """Decodes one video source on a dedicated thread and hands sampled frames to a queue"""
+
+    def __init__(self, name, source, is_live, sample_fps, stop_event, reconnect_delay=5.0):
+        super().__init__(name=f"reader-{name}", daemon=True)
+        self.stream_name = name
+        self.source = source
+        self.is_live = is_live
+        self.sample_interval = 1.0 / sample_fps
+        self.stop_event = stop_event
+        self.reconnect_delay = reconnect_delay
+        self.frames = queue.Queue(maxsize=1 if is_live else 8)
+        self.stats = StreamStats()
+        self.finished = False
+
+    def run(self):
+        while not self.stop_event.is_set():
+            cap = cv2.VideoCapture(self.source)
+            if not cap.isOpened():
+                print(f"❌ [{self.stream_name}] Cannot open source {self.source}")
+            else:
+                self._read(cap)
+            cap.release()
+
+            if not self.is_live:
+                break
+            # Live cameras drop out; keep retrying
+            self.stats.reconnects += 1
+            self.stop_event.wait(self.reconnect_delay)
+
+        self.finished = True
+
+    def _read(self, cap):
+        next_sample = 0.0
+        while not self.stop_event.is_set():
+            # grab() decodes without the colour conversion/copy; retrieve() only for sampled frames
+            if not cap.grab():
+                if not self.is_live:
+                    print(f"🏁 [{self.stream_name}] End of file")
+                return
+            self.stats.decoded += 1
+
+            now = time.monotonic() if self.is_live else cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            if now < next_sample:
+                continue
+            next_sample = now + self.sample_interval
+
+            ok, frame = cap.retrieve()
+            if not ok:
+                continue
+            self.stats.sampled += 1
+            self._hand_off(frame)
+
+    def _hand_off(self, frame):
+        if not self.is_live:
+            # Files: block so no sampled frame is lost
+            while not self.stop_event.is_set():
+                try:
+                    self.frames.put(frame, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+            return
+
+        # Live: keep only the newest frame, count the one we replace
+        try:
+            self.frames.put_nowait(frame)
+        except queue.Full:
+            try:
+                self.frames.get_nowait()
+                self.stats.dropped += 1
+            except queue.Empty:
+                pass
+            self.frames.put_nowait(frame)
+
+
+class IngestWorker:
+    """Runs recognition for every stream and applies a shared per-student cooldown"""
+
+    def __init__(self, readers, cooldown, profile='attendance'):
+        self.readers = readers
+        self.cooldown = cooldown
+        self.profile = profile
+        self._last_marked = {}
+        self._mark_lock = threading.Lock()
+
+    def process_stream(self, reader):
+        while not (reader.finished and reader.frames.empty()) and not reader.stop_event.is_set():
+            try:
+                frame = reader.frames.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self.process_frame(reader, frame)
+            reader.stats.processed += 1
+
+    def process_frame(self, reader, frame):
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        scale = MAX_FRAME_SIDE / max(rgb.shape[:2])
+        if scale < 1:
+            rgb = cv2.resize(rgb, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        rgb = np.ascontiguousarray(rgb)
+
+        gallery = attendance_app.current_gallery()
+        if len(gallery.embeddings) == 0:
+            return
+
+        # Detect and embed the way the served gallery was enrolled; looked up per frame
+        # because reembed.py can switch the gallery while the worker runs
+        tag = attendance_app.active_model_tag(gallery)
+        profile = attendance_app.gallery_profile(gallery, self.profile)
+        for face in detectors.detect_faces(rgb, profile):
+            reader.stats.faces += 1
+            face_embedding = attendance_app.embed_face_crop(face['face'], tag)
+            if face_embedding is None:
+                continue
+
+            name, distance = attendance_app.match_face(face_embedding, gallery, query_tag=tag)
+            if name is None:
+                continue
+            reader.stats.recognized += 1
+
+            if self._claim(name):
+                print(f"✅ [{reader.stream_name}] Recognized {name} (distance: {distance:.3f})")
+                attendance_app.mark_attendance(name)
+
+    def _claim(self, name):
+        """True if the student hasn't been marked within the cooldown window"""
+        now = time.monotonic()
+        with self._mark_lock:
+            last = self._last_marked.get(name)
+            if last is not None and now - last < self.cooldown:
+                return False
+            self._last_marked[name] = now
+            return True
+
+
+def print_stats(readers):
+    for reader in readers:
+        s = reader.stats
+        decode_fps, process_fps = s.rates()
+        print(f"📊 [{reader.stream_name}] decode {decode_fps:.1f} fps | processed {process_fps:.1f} fps | "
+              f"sampled {s.sampled} | dropped {s.dropped} | faces {s.faces} | "
+              f"recognized {s.recognized} | reconnects {s.reconnects}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless multi-camera attendance ingest")
+    parser.add_argument('--source', action='append', required=True,
+                        help="Device index, video file or RTSP URL, optionally as name=source (repeatable)")
+    parser.add_argument('--fps', type=float, default=2.0, help="Frames sampled per second per stream")
+    parser.add_argument('--cooldown', type=float, default=600.0,
+                        help="Seconds before the same student can be marked again")
+    parser.add_argument('--stats-interval', type=float, default=10.0, help="Seconds between stats lines")
+    # Only aligned profiles: unaligned overlay crops aren't comparable with the gallery
+    parser.add_argument('--profile', default='attendance', choices=['attendance', 'enrolment'],
+                        help="Detector profile used on sampled frames (its backend follows the served gallery)")
+    args = parser.parse_args()
+
+    attendance_app.startup()
+
+    stop_event = threading.Event()
+    readers = [StreamReader(*parse_source(spec), args.fps, stop_event) for spec in args.source]
+    worker = IngestWorker(readers, args.cooldown, args.profile)
+
+    processors = [
+        threading.Thread(target=worker.process_stream, args=(reader,), name=f"recognize-{reader.stream_name}", daemon=True)
+        for reader in readers
+    ]
+
+    print(f"🎥 Ingesting {len(readers)} stream(s) at {args.fps} fps: {', '.join(r.stream_name for r in readers)}")
+    for thread in readers + processors:
+        thread.start()
+
+    try:
+        while any(p.is_alive() for p in processors):
+            time.sleep(args.stats_interval)
+            print_stats(readers)
+    except KeyboardInterrupt:
+        print("\n⏹️  Stopping ingest...")
+        stop_event.set()
+        for thread in readers + processors:
+            thread.join(timeout=5)
+
+    print_stats(readers)
+
+
+if __name__ == "__main__":
+    main()
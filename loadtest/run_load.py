@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Load test: a fleet of simulated cameras against /detect_face and /recognize
+
+Each simulated camera is a thread with its own logged-in session (so it gets
+its own camera session on the server), replaying a set of real images at
+--fps, the way the live pages do. A fraction of frames (--recognize-ratio)
+goes to /recognize instead of /detect_face. Frames are sized and encoded
+per endpoint as advertised by /detection_config, like static/capture.js;
+--legacy-png sends full-size PNGs the way the pages used to, for comparison.
+
+Cameras send on a fixed schedule. A camera whose previous request is still
+running when its next frame is due skips ahead instead of bursting, and the
+skip is counted as "lagged"; a growing lag count means the server is past
+capacity at this rate.
+
+Reports per endpoint: throughput, p50/p95/p99/max latency, error rate and a
+status-code breakdown. 400s from /recognize ("no face", "multiple faces")
+are application answers and not counted as errors; 429/503 are counted
+separately as rejections. The server's own per-stage percentiles are pulled
+from /metrics at the end.
+
+Dev-box setup with a throwaway MySQL:
+    docker compose -f loadtest/docker-compose.yml up -d
+    DB_PORT=3307 python3 serve.py --workers 4 --threads 4 &
+    python3 loadtest/seed.py --images known_faces/
+
+Usage:
+    python3 loadtest/run_load.py --images known_faces/ --cameras 20 --fps 2 --duration 60
+    python3 loadtest/run_load.py --images data/frames --cameras 50 --recognize-ratio 0.05 --json load.json
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from io import BytesIO
+import numpy as np
+import requests
+from PIL import Image
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+ENDPOINTS = ('detect_face', 'recognize')
+CONFIG_KEYS = {'detect_face': 'detect', 'recognize': 'recognize'}  # Endpoint -> /detection_config entry
+
+
+def list_images(folder):
+    return sorted(os.path.join(folder, name) for name in os.listdir(folder)
+                  if name.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def fetch_upload_config(base_url):
+    """Per-endpoint upload sizes/quality from /detection_config (None if the server doesn't have it)"""
+    try:
+        response = requests.get(f"{base_url}/detection_config", timeout=5)
+        config = response.json() if response.ok else {}
+        return config if all(key in config for key in CONFIG_KEYS.values()) else None
+    except (requests.RequestException, ValueError):
+        return None
+
+
+def encode_frames(paths, target=None):
+    """Pre-encode images as the data URLs a browser canvas would send
+
+    target is one endpoint's entry from /detection_config (downscaled JPEG);
+    None sends the original resolution as PNG.
+    """
+    frames = []
+    for path in paths:
+        img = Image.open(path).convert('RGB')
+        buffer = BytesIO()
+        if target:
+            img.thumbnail((target['width'], target['height']))
+            img.save(buffer, format='JPEG', quality=int(target['quality'] * 100))
+            mime = 'jpeg'
+        else:
+            img.save(buffer, format='PNG')
+            mime = 'png'
+        frames.append(f"data:image/{mime};base64," + base64.b64encode(buffer.getvalue()).decode())
+    return frames
+
+
+def mean_upload_kb(frames):
+    return sum(len(frame) - frame.index(',') - 1 for frame in frames) * 3 / 4 / len(frames) / 1024
+
+
+class Recorder:
+    """Thread-safe collection of request outcomes, per endpoint"""
+
+    def __init__(self, measure_from):
+        self.measure_from = measure_from
+        self.latencies = {endpoint: [] for endpoint in ENDPOINTS}
+        self.statuses = {endpoint: Counter() for endpoint in ENDPOINTS}
+        self.lagged = 0
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, started, latency, status):
+        if started < self.measure_from:
+            return  # Warm-up
+        with self._lock:
+            self.statuses[endpoint][status] += 1
+            if isinstance(status, int) and status < 500 and status not in (401, 429, 503):
+                self.latencies[endpoint].append(latency)
+
+    def lag(self):
+        with self._lock:
+            self.lagged += 1
+
+
+class Camera(threading.Thread):
+    def __init__(self, index, args, frames, recorder):
+        super().__init__(name=f"camera-{index}", daemon=True)
+        self.index = index
+        self.args = args
+        self.frames = frames
+        self.recorder = recorder
+        self.start_at = None  # Set by schedule() once every camera has logged in
+        self.deadline = None
+        self.rng = random.Random(index)
+        self.session = requests.Session()
+
+    def schedule(self, start, deadline):
+        self.start_at, self.deadline = start, deadline
+
+    def login(self):
+        response = self.session.post(f"{self.args.base_url}/login", allow_redirects=False,
+                                     data={'username': self.args.teacher, 'password': self.args.password})
+        return response.status_code == 302
+
+    def run(self):
+        interval = 1.0 / self.args.fps
+        # Spread cameras over the first interval so they don't all fire together
+        next_send = self.start_at + self.rng.random() * interval
+        frame_index = self.index
+        camera_id = f"loadtest-{self.index}"
+
+        while True:
+            now = time.monotonic()
+            if now >= self.deadline:
+                return
+            if next_send > now:
+                time.sleep(next_send - now)
+
+            endpoint = 'recognize' if self.rng.random() < self.args.recognize_ratio else 'detect_face'
+            frames = self.frames[endpoint]
+            payload = {'image': frames[frame_index % len(frames)], 'camera_id': camera_id}
+            frame_index += 1
+
+            started = time.monotonic()
+            try:
+                response = self.session.post(f"{self.args.base_url}/{endpoint}", json=payload,
+                                             timeout=self.args.timeout)
+                status = response.status_code
+            except requests.RequestException as e:
+                status = type(e).__name__
+            self.recorder.record(endpoint, started, time.monotonic() - started, status)
+
+            next_send += interval
+            if time.monotonic() > next_send:
+                # Still busy when the next frame was due: drop it rather than burst
+                self.recorder.lag()
+                next_send = time.monotonic()
+
+
+def percentile_ms(values, q):
+    return float(np.percentile(values, q)) * 1000 if values else None
+
+
+def summarize(recorder, measured_seconds):
+    summary = {}
+    for endpoint in ENDPOINTS:
+        statuses = recorder.statuses[endpoint]
+        total = sum(statuses.values())
+        if not total:
+            continue
+        rejected = statuses[429] + statuses[503]
+        errors = sum(count for status, count in statuses.items()
+                     if not isinstance(status, int) or (status >= 500 and status != 503) or status == 401)
+        latencies = recorder.latencies[endpoint]
+        summary[endpoint] = {
+            'requests': total,
+            'throughput_rps': total / measured_seconds,
+            'p50_ms': percentile_ms(latencies, 50),
+            'p95_ms': percentile_ms(latencies, 95),
+            'p99_ms': percentile_ms(latencies, 99),
+            'max_ms': max(latencies) * 1000 if latencies else None,
+            'error_rate': errors / total,
+            'rejection_rate': rejected / total,
+            'statuses': {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        }
+    return summary
+
+
+def fetch_server_metrics(base_url):
+    try:
+        return requests.get(f"{base_url}/metrics", params={'format': 'json'}, timeout=5).json().get('stages', {})
+    except (requests.RequestException, ValueError):
+        return {}
+
+
+def format_ms(value):
+    return f"{value:8.1f}" if value is not None else "       -"
+
+
+def print_report(summary, lagged, server_stages, args):
+    print(f"\n📊 {args.cameras} cameras @ {args.fps} fps for {args.duration}s "
+          f"(recognize ratio {args.recognize_ratio})")
+    print(f"{'endpoint':<12} {'requests':>8} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'max ms':>8} {'errors':>7} {'rejected':>8}")
+    for endpoint, s in summary.items():
+        print(f"{endpoint:<12} {s['requests']:>8} {s['throughput_rps']:>7.1f} {format_ms(s['p50_ms'])} "
+              f"{format_ms(s['p95_ms'])} {format_ms(s['p99_ms'])} {format_ms(s['max_ms'])} "
+              f"{s['error_rate']:>7.1%} {s['rejection_rate']:>8.1%}")
+        print(f"{'':<12} statuses: {s['statuses']}")
+    offered = args.cameras * args.fps
+    print(f"\nOffered load {offered:.1f} req/s, {lagged} frames skipped because a camera was still waiting")
+
+    if server_stages:
+        print("\n🔬 Server stage percentiles (one worker's recent window, ms):")
+        for route, stages in server_stages.items():
+            for stage_name, entry in sorted(stages.items(), key=lambda item: -(item[1]['p50'] or 0)):
+                values = [entry[key] * 1000 if entry[key] is not None else None for key in ('p50', 'p90', 'p99')]
+                print(f"   {route:<12} {stage_name:<18} p50 {format_ms(values[0])}  p90 {format_ms(values[1])}  "
+                      f"p99 {format_ms(values[2])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated camera fleet load test")
+    parser.add_argument('--base-url', default='http://localhost:5001')
+    parser.add_argument('--images', required=True, help="Folder of frames to replay (jpg/png)")
+    parser.add_argument('--cameras', type=int, default=10, help="Concurrent simulated cameras")
+    parser.add_argument('--fps', type=float, default=2.0, help="Frames per second per camera")
+    parser.add_argument('--duration', type=float, default=30.0, help="Seconds to run (after warm-up)")
+    parser.add_argument('--warmup', type=float, default=5.0, help="Seconds of load not counted in the report")
+    parser.add_argument('--recognize-ratio', type=float, default=0.1,
+                        help="Fraction of frames sent to /recognize instead of /detect_face")
+    parser.add_argument('--timeout', type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument('--teacher', default='loadtest', help="Teacher account (see seed.py)")
+    parser.add_argument('--password', default='loadtest')
+    parser.add_argument('--legacy-png', action='store_true',
+                        help="Upload full-size PNGs like the pages did before client-side downscaling")
+    parser.add_argument('--json', help="Also write the summary to this file")
+    args = parser.parse_args()
+
+    paths = list_images(args.images)
+    if not paths:
+        print(f"❌ No images found in {args.images}")
+        return 1
+    config = None if args.legacy_png else fetch_upload_config(args.base_url)
+    if config is None and not args.legacy_png:
+        print("⚠️  Server has no /detection_config - sending full-size PNGs")
+    frames = {endpoint: encode_frames(paths, config and config[CONFIG_KEYS[endpoint]]) for endpoint in ENDPOINTS}
+    print(f"🖼️  Replaying {len(paths)} frames from {args.images} "
+          f"({', '.join(f'{e}: {mean_upload_kb(f):.0f} KB/frame' for e, f in frames.items())})")
+
+    recorder = Recorder(measure_from=float('inf'))
+    cameras = [Camera(i, args, frames, recorder) for i in range(args.cameras)]
+    if not all(camera.login() for camera in cameras):
+        print(f"❌ Could not log in as {args.teacher} (run loadtest/seed.py first)")
+        return 1
+
+    print(f"🚦 Starting {args.cameras} cameras ({args.warmup}s warm-up, {args.duration}s measured)...")
+    start = time.monotonic()
+    recorder.measure_from = start + args.warmup
+    for camera in cameras:
+        camera.schedule(start, start + args.warmup + args.duration)
+        camera.start()
+    for camera in cameras:
+        camera.join()
+
+    summary = summarize(recorder, args.duration)
+    server_stages = fetch_server_metrics(args.base_url)
+    print_report(summary, recorder.lagged, server_stages, args)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'config': {k: v for k, v in vars(args).items() if k != 'password'}, 'endpoints': summary, 'lagged': recorder.lagged,
+                       'server_stages': server_stages}, f, indent=2)
+        print(f"\n💾 Summary written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
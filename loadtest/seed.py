@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Seed a running app with a load-test teacher and one student per image
+
+Goes through the normal HTTP endpoints (/register, /login, /add_student), so
+the enrolment path, embedding cache and gallery publish are exercised the
+same way as in production. Safe to rerun: existing accounts are skipped.
+
+Usage:
+    python3 loadtest/seed.py --images known_faces/
+    python3 loadtest/seed.py --base-url http://localhost:5001 --images data/faces --limit 200
+"""
+
+import argparse
+import os
+import sys
+import requests
+
+from run_load import list_images
+
+DEFAULT_TEACHER = 'loadtest'
+DEFAULT_PASSWORD = 'loadtest'
+
+
+def login(session, base_url, username, password):
+    """Register the teacher if needed and log the session in; True on success"""
+    session.post(f"{base_url}/register", data={
+        'user_type': 'teacher', 'username': username, 'email': f"{username}@loadtest.local",
+        'password': password, 'teacher_secret': 'admin',
+    })
+    response = session.post(f"{base_url}/login", data={'username': username, 'password': password},
+                            allow_redirects=False)
+    return response.status_code == 302 and '/dashboard' in response.headers.get('Location', '')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enrol load-test students through the app")
+    parser.add_argument('--base-url', default='http://localhost:5001')
+    parser.add_argument('--images', required=True, help="Folder with one face photo per student")
+    parser.add_argument('--limit', type=int, help="Enrol at most this many students")
+    parser.add_argument('--teacher', default=DEFAULT_TEACHER)
+    parser.add_argument('--password', default=DEFAULT_PASSWORD)
+    args = parser.parse_args()
+
+    session = requests.Session()
+    if not login(session, args.base_url, args.teacher, args.password):
+        print(f"❌ Could not log in as {args.teacher}")
+        return 1
+
+    images = list_images(args.images)[:args.limit]
+    print(f"👥 Enrolling {len(images)} students from {args.images}...")
+    for i, path in enumerate(images, start=1):
+        with open(path, 'rb') as f:
+            session.post(f"{args.base_url}/add_student", data={
+                'serial_number': f"LT{i:04d}", 'username': f"loadtest{i:04d}",
+                'email': f"loadtest{i:04d}@loadtest.local", 'phone': f"{9000000000 + i}",
+            }, files={'photo': (os.path.basename(path), f)})
+        if i % 25 == 0:
+            print(f"   {i}/{len(images)}")
+
+    print(f"✅ Seeded. Run the load test with --teacher {args.teacher} --password {args.password}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Leveled, sampled, structured logging for the app and its workers
+
+Everything logs under the "face" logger hierarchy (face.recognize,
+face.detect, face.gallery, ...), configured from the environment:
+
+    LOG_LEVEL   DEBUG / INFO (default) / WARNING / ERROR
+    LOG_FORMAT  text (default) or json - one JSON object per line, for shipping
+    LOG_SAMPLE  per-logger sampling of records below WARNING, e.g.
+                "face.detect=0.01,face.recognize=0.2"; the longest matching
+                logger prefix wins and unlisted loggers keep everything
+
+Log calls use %-style arguments so messages are only formatted when a
+record is actually emitted; anything that costs O(gallery size) to build is
+guarded with isEnabledFor(logging.DEBUG). Structured fields are passed
+with extra={...} and become top-level keys in the JSON output.
+"""
+
+import json
+import logging
+import os
+import random
+import sys
+from datetime import datetime, timezone
+
+ROOT_LOGGER = 'face'
+
+# Attributes every LogRecord has; anything else came in through extra={...}
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def get_logger(name):
+    """Logger in the app's hierarchy, e.g. get_logger('recognize') -> face.recognize"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def record_fields(record):
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, process plus any extra fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'process': record.process,
+        }
+        entry.update(record_fields(record))
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines with extra fields appended as key=value"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s %(name)s: %(message)s')
+
+    def format(self, record):
+        line = super().format(record)
+        fields = record_fields(record)
+        if fields:
+            line += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of sub-WARNING records per logger prefix; warnings and errors always pass"""
+
+    def __init__(self, rates):
+        super().__init__()
+        # Longest prefix first so face.detect.cache beats face.detect
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def rate_for(self, name):
+        for prefix, rate in self.rates:
+            if name == prefix or name.startswith(prefix + '.'):
+                return rate
+        return 1.0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+def parse_sample_rates(spec):
+    """'face.detect=0.01,face.recognize=0.2' -> {'face.detect': 0.01, 'face.recognize': 0.2}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in (spec or '').split(','))):
+        name, _, rate = item.partition('=')
+        try:
+            rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            continue
+    return rates
+
+
+def configure_logging(level=None, fmt=None, sample=None, stream=None):
+    """Install the handler on the "face" logger (safe to call more than once)"""
+    logger = logging.getLogger(ROOT_LOGGER)
+    level = (level or os.environ.get('LOG_LEVEL', 'INFO')).upper()
+    fmt = (fmt or os.environ.get('LOG_FORMAT', 'text')).lower()
+    sample = os.environ.get('LOG_SAMPLE', '') if sample is None else sample
+
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter())
+    rates = parse_sample_rates(sample)
+    if rates:
+        handler.addFilter(SamplingFilter(rates))
+
+    for old in list(logger.handlers):
+        logger.removeHandler(old)
+    logger.addHandler(handler)
+    logger.setLevel(getattr(logging, level, logging.INFO))
+    # Keep our records out of gunicorn's / werkzeug's root handlers
+    logger.propagate = False
+    return logger
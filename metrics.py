@@ -0,0 +1,166 @@
+"""
+Stage-level latency metrics for the recognition and detection endpoints
+
+Each instrumented request gets a StageTimer; code wraps its stages in
+``with timer.stage('embed'):`` and the per-request totals are recorded into
+one histogram per (route, stage) when the request finishes. The same stage
+can be entered several times in a request (e.g. one embedding per face) and
+is recorded as the sum.
+
+render_prometheus() exposes:
+
+- face_stage_seconds: cumulative histogram (use histogram_quantile() across
+  workers and time ranges)
+- face_stage_recent_seconds: p50/p90/p99 over the last METRICS_WINDOW
+  observations of this process, for quick looks without a Prometheus server
+
+Metrics are per process; under gunicorn each worker reports its own.
+"""
+
+import bisect
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.9, 0.99)
+METRICS_WINDOW = int(os.environ.get('METRICS_WINDOW', 1024))  # Recent observations kept per stage
+
+
+class Histogram:
+    """Fixed-bucket histogram plus a window of recent values for percentiles"""
+
+    def __init__(self, buckets=STAGE_BUCKETS, window=METRICS_WINDOW):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+
+    def quantile(self, q):
+        """q-quantile of the recent window (nearest rank), or None when empty"""
+        if not self.recent:
+            return None
+        values = sorted(self.recent)
+        return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def _bucket_labels(buckets):
+    return [f"{bound:g}" for bound in buckets] + ["+Inf"]
+
+
+class StageMetrics:
+    """Thread-safe registry of stage histograms keyed by (route, stage)"""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route, stage, seconds):
+        with self._lock:
+            histogram = self._histograms.get((route, stage))
+            if histogram is None:
+                histogram = self._histograms[(route, stage)] = Histogram()
+            histogram.observe(seconds)
+
+    def record(self, timer):
+        """Record every stage of a finished StageTimer"""
+        for stage, seconds in timer.spans.items():
+            self.observe(timer.route, stage, seconds)
+
+    def percentiles(self):
+        """{route: {stage: {'count', 'p50', 'p90', 'p99'}}} in seconds, from the recent window"""
+        with self._lock:
+            result = {}
+            for (route, stage), histogram in sorted(self._histograms.items()):
+                entry = {'count': histogram.count}
+                for q in QUANTILES:
+                    entry[f"p{int(q * 100)}"] = histogram.quantile(q)
+                result.setdefault(route, {})[stage] = entry
+            return result
+
+    def render_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = [
+            "# HELP face_stage_seconds Time spent in each stage of a request",
+            "# TYPE face_stage_seconds histogram",
+        ]
+        summary = [
+            "# HELP face_stage_recent_seconds Stage latency percentiles over recent requests of this process",
+            "# TYPE face_stage_recent_seconds summary",
+        ]
+        with self._lock:
+            for (route, stage), histogram in sorted(self._histograms.items()):
+                labels = f'route="{route}",stage="{stage}"'
+                cumulative = 0
+                for bound, count in zip(_bucket_labels(histogram.buckets), histogram.counts):
+                    cumulative += count
+                    lines.append(f'face_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"face_stage_seconds_sum{{{labels}}} {histogram.sum:.6f}")
+                lines.append(f"face_stage_seconds_count{{{labels}}} {histogram.count}")
+
+                for q in QUANTILES:
+                    value = histogram.quantile(q)
+                    summary.append(f'face_stage_recent_seconds{{{labels},quantile="{q}"}} '
+                                   f'{"NaN" if value is None else f"{value:.6f}"}')
+                summary.append(f"face_stage_recent_seconds_sum{{{labels}}} {sum(histogram.recent):.6f}")
+                summary.append(f"face_stage_recent_seconds_count{{{labels}}} {len(histogram.recent)}")
+        return "\n".join(lines + summary) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+class StageTimer:
+    """Collects the stage timings of one request"""
+
+    def __init__(self, route):
+        self.route = route
+        self.spans = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def finish(self):
+        """Close the timer, recording the request total as the 'total' stage"""
+        self.spans['total'] = time.perf_counter() - self._start
+        return self.spans
+
+    def server_timing(self):
+        """Server-Timing header value, durations in milliseconds"""
+        return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.spans.items())
+
+
+class LatencyAverage:
+    """Exponentially weighted moving average of one route's request latency"""
+
+    def __init__(self, alpha=0.2):
+        self.alpha = alpha
+        self.seconds = None
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.seconds = seconds if self.seconds is None else self.seconds + self.alpha * (seconds - self.seconds)
+
+
+# Process-wide registry used by app.py
+stage_metrics = StageMetrics()
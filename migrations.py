@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations
+
+init_db (also run by setup_database.py and reset_database.py) creates the
+base tables with CREATE TABLE IF NOT EXISTS; everything added to the schema
+after that lives here as a numbered migration. schema_migrations records
+which versions have run, so migrate() applies only the pending ones, in
+order, and is cheap enough to call on every startup.
+
+MySQL commits DDL implicitly, so a migration can't be rolled back if the
+process dies halfway. Each one is therefore written to be re-runnable - the
+helpers below check information_schema before adding a column or index -
+and is recorded only after it has completed. A named lock serialises
+workers that start at the same time.
+
+To change the schema, append a migration with the next version number;
+never edit or renumber one that has shipped.
+
+Usage:
+    python3 migrations.py           # apply pending migrations
+    python3 migrations.py --status  # list applied and pending versions
+"""
+
+import argparse
+import sys
+from contextlib import contextmanager
+
+from db import __get_db_connection
+
+MIGRATION_LOCK = 'face_attendance_migrations'
+MIGRATION_LOCK_TIMEOUT = 60  # seconds another worker may hold the lock
+
+CREATE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INT PRIMARY KEY,
+        description VARCHAR(255) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+
+class LockTimeout(RuntimeError):
+    """Another process held the schema lock for longer than the timeout"""
+
+
+@contextmanager
+def schema_lock(cursor, timeout=MIGRATION_LOCK_TIMEOUT):
+    """Hold the named lock that serialises schema changes between processes"""
+    cursor.execute("SELECT GET_LOCK(%s, %s)", (MIGRATION_LOCK, timeout))
+    if cursor.fetchone()[0] != 1:
+        raise LockTimeout(f"Timed out after {timeout}s waiting for another process to change the schema")
+    try:
+        yield
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK,))
+        cursor.fetchone()
+
+
+def column_exists(cursor, table, column):
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    """, (table, column))
+    return cursor.fetchone()[0] > 0
+
+
+def index_exists(cursor, table, index):
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+    """, (table, index))
+    return cursor.fetchone()[0] > 0
+
+
+def add_column(cursor, table, column, definition):
+    if not column_exists(cursor, table, column):
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def add_index(cursor, table, index, columns):
+    if not index_exists(cursor, table, index):
+        cursor.execute(f"ALTER TABLE {table} ADD INDEX {index} ({columns})")
+
+
+def embedding_source(cursor):
+    add_column(cursor, 'face_embeddings', 'source',
+               "ENUM('enrolment', 'attendance') NOT NULL DEFAULT 'enrolment' AFTER embedding")
+
+
+def student_has_face(cursor):
+    add_column(cursor, 'students', 'has_face', "BOOLEAN AS (face_encoding IS NOT NULL) STORED AFTER face_encoding")
+
+
+def attendance_indexes(cursor):
+    # /attendance (newest first within a date window), date-range backfills and archival
+    add_index(cursor, 'attendance', 'idx_timestamp', 'timestamp')
+    # view_student's latest records and attendance_summary.refresh_day()
+    add_index(cursor, 'attendance', 'idx_student_timestamp', 'student_id, timestamp')
+
+
+# (version, description, function) - append only
+MIGRATIONS = [
+    (1, "face_embeddings.source column", embedding_source),
+    (2, "students.has_face column", student_has_face),
+    (3, "attendance indexes on (timestamp) and (student_id, timestamp)", attendance_indexes),
+]
+
+
+def applied_versions(cursor):
+    cursor.execute(CREATE_TABLE)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {version for (version,) in cursor.fetchall()}
+
+
+def pending(applied, migrations=MIGRATIONS):
+    """Migrations not yet in `applied`, in version order"""
+    return sorted((m for m in migrations if m[0] not in applied), key=lambda m: m[0])
+
+
+def migrate(conn, migrations=MIGRATIONS, log=print, timeout=MIGRATION_LOCK_TIMEOUT):
+    """Apply pending migrations; returns the versions applied (commits after each)
+
+    Raises LockTimeout if another process holds the schema lock for longer than
+    timeout. That process is applying the same migrations, so callers at startup
+    can log it and carry on.
+    """
+    cursor = conn.cursor()
+    try:
+        with schema_lock(cursor, timeout):
+            done = []
+            for version, description, apply in pending(applied_versions(cursor), migrations):
+                log(f"Applying migration {version}: {description}")
+                apply(cursor)
+                cursor.execute("INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                               (version, description))
+                conn.commit()
+                done.append(version)
+            return done
+    finally:
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply versioned schema migrations")
+    parser.add_argument('--status', action='store_true', help="List applied and pending migrations")
+    args = parser.parse_args()
+
+    conn = __get_db_connection()
+    try:
+        if args.status:
+            cursor = conn.cursor()
+            applied = applied_versions(cursor)
+            cursor.close()
+            for version, description, _ in MIGRATIONS:
+                print(f"   {'✅' if version in applied else '⏳'} {version:>3}  {description}")
+            return 0
+        done = migrate(conn)
+        print(f"✅ Applied {len(done)} migration(s)" if done else "✅ Schema is up to date")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Server-side motion gate in front of the detection pipeline
+
+Keeps a tiny (64x48) grayscale reference frame per camera. A new frame is
+only sent through detection/embedding when its mean absolute difference
+from the reference ("energy", 0..1) crosses the camera's threshold, or when
+the keep-alive interval has passed since the last processed frame.
+Otherwise the previous result for that camera is returned.
+
+Camera keys are opaque; the app uses (session key, camera id) so a client
+can only ever touch the state of its own cameras. The camera id is the room
+a browser was configured with (see static/capture.js). Per-camera
+thresholds can be set with MOTION_THRESHOLDS, a JSON object of camera id ->
+threshold, e.g. '{"room-101": 0.03}'. Gating statistics are exposed through
+stats(), summed per camera id over its sessions, so rooms can be tuned from
+real numbers: 'processed' counts frames that went through inference,
+'cached' those that passed the gate but were answered from the frame cache.
+"""
+
+import json
+import os
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+from PIL import Image
+
+MOTION_THRESHOLD = float(os.environ.get('MOTION_THRESHOLD', 0.02))
+MOTION_KEEPALIVE = float(os.environ.get('MOTION_KEEPALIVE', 10.0))  # seconds
+MOTION_THRESHOLDS = json.loads(os.environ.get('MOTION_THRESHOLDS', '{}'))
+MOTION_MAX_CAMERAS = int(os.environ.get('MOTION_MAX_CAMERAS', 256))
+
+REFERENCE_SIZE = (64, 48)
+
+
+def camera_id(camera_key):
+    """Camera id of a key: the id part of (session, id) keys, which never appears in stats"""
+    return str(camera_key[-1] if isinstance(camera_key, tuple) else camera_key)
+
+
+class _CameraState:
+    __slots__ = ('reference', 'last_processed', 'last_result', 'result_version',
+                 'frames', 'processed', 'cached', 'gated', 'reasons', 'last_energy', 'mean_energy')
+
+    def __init__(self):
+        self.reference = None
+        self.last_processed = 0.0
+        self.last_result = None
+        self.result_version = None
+        self.frames = 0
+        self.processed = 0
+        self.cached = 0
+        self.gated = 0
+        self.reasons = {'first': 0, 'motion': 0, 'keepalive': 0, 'stale': 0}
+        self.last_energy = 0.0
+        self.mean_energy = 0.0
+
+
+class MotionGate:
+    """Decides per camera whether a frame is worth running inference on"""
+
+    def __init__(self, threshold=MOTION_THRESHOLD, keepalive=MOTION_KEEPALIVE,
+                 thresholds=None, max_cameras=MOTION_MAX_CAMERAS):
+        self.threshold = threshold
+        self.keepalive = keepalive
+        self.thresholds = dict(MOTION_THRESHOLDS if thresholds is None else thresholds)
+        self.max_cameras = max_cameras
+        self._cameras = OrderedDict()
+        self._lock = threading.Lock()
+
+    def threshold_for(self, camera_key):
+        return self.thresholds.get(camera_id(camera_key), self.threshold)
+
+    def check(self, camera_key, img, version=None):
+        """Return the previous result if the frame can be skipped, else None
+
+        When None is returned the caller must run the pipeline and hand the
+        result back with remember(). version ties remembered results to a
+        gallery version so an enrolment always forces a fresh pass.
+        """
+        small = np.asarray(img.convert('L').resize(REFERENCE_SIZE, Image.BILINEAR), dtype=np.float32)
+        now = time.monotonic()
+
+        with self._lock:
+            state = self._cameras.get(camera_key)
+            if state is None:
+                state = self._cameras[camera_key] = _CameraState()
+                while len(self._cameras) > self.max_cameras:
+                    self._cameras.popitem(last=False)
+            self._cameras.move_to_end(camera_key)
+            state.frames += 1
+
+            if state.reference is None or state.last_result is None:
+                reason = 'first'
+            else:
+                energy = float(np.abs(small - state.reference).mean() / 255.0)
+                state.last_energy = energy
+                state.mean_energy = 0.9 * state.mean_energy + 0.1 * energy
+
+                if energy >= self.threshold_for(camera_key):
+                    reason = 'motion'
+                elif now - state.last_processed >= self.keepalive:
+                    reason = 'keepalive'
+                elif state.result_version != version:
+                    reason = 'stale'
+                else:
+                    state.gated += 1
+                    return state.last_result
+
+            state.reasons[reason] += 1
+            state.reference = small
+            state.last_processed = now
+            return None
+
+    def remember(self, camera_key, result, version=None, cached=False):
+        """Store the result for a frame that passed the gate (cached: it came from the frame cache)"""
+        with self._lock:
+            state = self._cameras.get(camera_key)
+            if state is not None:
+                state.last_result = result
+                state.result_version = version
+                if cached:
+                    state.cached += 1
+                else:
+                    state.processed += 1
+
+    def stats(self):
+        """Gating statistics per camera id, summed over the sessions using it"""
+        with self._lock:
+            stats = {}
+            for camera_key, state in self._cameras.items():
+                entry = stats.setdefault(camera_id(camera_key), {
+                    'sessions': 0, 'frames': 0, 'processed': 0, 'cached': 0, 'gated': 0,
+                    'reasons': dict.fromkeys(state.reasons, 0),
+                    'threshold': self.threshold_for(camera_key),
+                    'mean_energy': 0.0,
+                })
+                entry['sessions'] += 1
+                for field in ('frames', 'processed', 'cached', 'gated'):
+                    entry[field] += getattr(state, field)
+                for reason, count in state.reasons.items():
+                    entry['reasons'][reason] += count
+                # Cameras are kept in least recently used order, so the last session wins
+                entry['last_energy'] = round(state.last_energy, 5)
+                entry['mean_energy'] += state.mean_energy
+
+            for entry in stats.values():
+                entry['gated_ratio'] = entry['gated'] / entry['frames'] if entry['frames'] else 0.0
+                entry['mean_energy'] = round(entry['mean_energy'] / entry['sessions'], 5)
+            return stats
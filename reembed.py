@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Re-embed every student with a new face model, then switch over atomically
+
+Stored embeddings are tagged with the model that produced them
+(face_embeddings.model_tag) and the gallery is only ever built from one tag,
+recorded in app_settings.face_model_tag. This job:
+
+1. Embeds every student's stored photos (known_faces/ files, or the base64
+   face_image column) with the target model, in parallel worker processes,
+   a batch at a time. Each batch is committed as soon as it is done, so the
+   committed rows are the checkpoint and an interrupted run resumes where it
+   stopped. Students whose photo fails are recorded in a checkpoint file and
+   skipped on resume unless --retry-failed is given. Embeddings learnt from
+   attendance captures have no stored photo and are not carried over.
+2. While it runs, the app keeps serving the old model's gallery untouched.
+3. When every student is done, app_settings is switched to the new tag in a
+   single UPDATE and the gallery is republished; every worker remaps it on
+   its next request. A final pass picks up students enrolled during the
+   switch.
+
+Usage:
+    python3 reembed.py --model Facenet512
+    python3 reembed.py --model ArcFace --workers 4 --batch-size 32
+    python3 reembed.py --model ArcFace --no-switch     # prepare only
+"""
+
+import argparse
+import base64
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+import numpy as np
+from PIL import Image
+
+import app as attendance_app
+from db import __get_db_connection
+
+CHECKPOINT_DIR = 'reembed_checkpoints'
+
+
+def checkpoint_path(tag):
+    return os.path.join(CHECKPOINT_DIR, tag.replace('/', '_') + '.json')
+
+
+def load_checkpoint(tag):
+    try:
+        with open(checkpoint_path(tag)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'tag': tag, 'done': 0, 'failed': []}
+
+
+def save_checkpoint(checkpoint):
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    tmp_path = checkpoint_path(checkpoint['tag']) + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, checkpoint_path(checkpoint['tag']))
+
+
+def pending_student_ids(cursor, tag, skip_ids=()):
+    """Students that have a photo but no embedding for the target tag yet"""
+    cursor.execute("""
+        SELECT s.id FROM students s
+        WHERE (s.image_path IS NOT NULL OR s.face_image IS NOT NULL)
+          AND NOT EXISTS (SELECT 1 FROM face_embeddings f WHERE f.student_id = s.id AND f.model_tag = %s)
+        ORDER BY s.id
+    """, (tag,))
+    skip = set(skip_ids)
+    return [row[0] for row in cursor.fetchall() if row[0] not in skip]
+
+
+def extra_photo_paths(image_path):
+    """Additional enrolment photos saved next to the main one as <name>_2.png, <name>_3.png, ..."""
+    stem, ext = os.path.splitext(image_path)
+    return sorted(path for path in glob.glob(f"{glob.escape(stem)}_*{ext}")
+                  if path[len(stem) + 1:-len(ext)].isdigit())
+
+
+def load_student_images(image_path, face_image):
+    """Decode a student's stored photos into RGB arrays (main photo first)"""
+    if image_path and os.path.exists(image_path):
+        paths = [image_path] + extra_photo_paths(image_path)
+        images = [Image.open(path).convert('RGB') for path in paths]
+    elif face_image:
+        images = [Image.open(BytesIO(base64.b64decode(face_image.split(',')[-1]))).convert('RGB')]
+    else:
+        return []
+    return [np.array(img, dtype=np.uint8) for img in images]
+
+
+def embed_student(job):
+    """Worker process: (student_id, image_path, face_image, model_name) -> (student_id, embeddings or None, error)"""
+    student_id, image_path, face_image, model_name = job
+    try:
+        img_arrays = load_student_images(image_path, face_image)
+        if not img_arrays:
+            return student_id, None, "no stored photo"
+        embeddings = []
+        for img_array in img_arrays:
+            embedding = attendance_app.cached_face_embedding(img_array, profile='enrolment', model_name=model_name)
+            if embedding is not None:
+                embeddings.append([float(v) for v in embedding])
+        if not embeddings:
+            return student_id, None, "no embedding"
+        return student_id, embeddings, None
+    except Exception as e:
+        return student_id, None, str(e)
+
+
+def run_batches(pool, tag, model_name, student_ids, batch_size, checkpoint):
+    """Embed student_ids in batches, committing each batch as a checkpoint"""
+    total = len(student_ids)
+    for start in range(0, total, batch_size):
+        batch_ids = student_ids[start:start + batch_size]
+
+        conn = __get_db_connection()
+        cursor = conn.cursor()
+        try:
+            placeholders = ', '.join(['%s'] * len(batch_ids))
+            cursor.execute(f"SELECT id, image_path, face_image FROM students WHERE id IN ({placeholders})", batch_ids)
+            jobs = [(sid, path, face_image, model_name) for sid, path, face_image in cursor.fetchall()]
+
+            for student_id, embeddings, error in pool.map(embed_student, jobs):
+                if embeddings is None:
+                    print(f"   ⚠️  Student {student_id}: {error}")
+                    checkpoint['failed'].append(student_id)
+                    continue
+                # Replace any partial earlier attempt for this tag
+                cursor.execute("DELETE FROM face_embeddings WHERE student_id = %s AND model_tag = %s", (student_id, tag))
+                for embedding in embeddings:
+                    attendance_app.save_face_embedding(cursor, student_id, embedding, tag)
+                checkpoint['done'] += 1
+
+            conn.commit()
+            save_checkpoint(checkpoint)
+        finally:
+            cursor.close()
+            conn.close()
+
+        print(f"   📦 {min(start + batch_size, total)}/{total} students processed")
+
+
+def switch_model(tag):
+    """Point the gallery at the new tag (one UPDATE) and republish it"""
+    conn = __get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("UPDATE app_settings SET value = %s WHERE name = 'face_model_tag'", (tag,))
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+    attendance_app.load_known_faces()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-embed all students with a new face model")
+    parser.add_argument('--model', required=True, help="DeepFace model name, e.g. Facenet512 or ArcFace")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help="Parallel embedding processes")
+    parser.add_argument('--batch-size', type=int, default=16, help="Students per committed batch")
+    parser.add_argument('--retry-failed', action='store_true', help="Retry students that failed in earlier runs")
+    parser.add_argument('--no-switch', action='store_true', help="Prepare embeddings but keep serving the old model")
+    args = parser.parse_args()
+
+    attendance_app.init_db()
+    tag = attendance_app.model_tag(args.model)
+    checkpoint = load_checkpoint(tag)
+    if args.retry_failed:
+        checkpoint['failed'] = []
+
+    conn = __get_db_connection()
+    cursor = conn.cursor()
+    try:
+        current_tag = attendance_app.get_active_model_tag(cursor)
+        student_ids = pending_student_ids(cursor, tag, checkpoint['failed'])
+    finally:
+        cursor.close()
+        conn.close()
+
+    print(f"🔁 Re-embedding for {tag} (currently serving {current_tag})")
+    print(f"   {len(student_ids)} students pending, {checkpoint['done']} done in earlier runs, "
+          f"{len(checkpoint['failed'])} previously failed")
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        run_batches(pool, tag, args.model, student_ids, args.batch_size, checkpoint)
+
+        if args.no_switch:
+            print("⏸️  Embeddings prepared; not switching (--no-switch)")
+            return
+        if tag == current_tag:
+            print("✅ Already serving this model - gallery is up to date")
+            attendance_app.load_known_faces()
+            return
+        if checkpoint['failed']:
+            print(f"⚠️  {len(checkpoint['failed'])} students have no {tag} embedding and will not be recognized "
+                  "after the switch (fix their photos and rerun with --retry-failed)")
+
+        switch_model(tag)
+        print(f"🔀 Switched gallery to {tag}")
+
+        # Students enrolled while we were switching still carry the old tag
+        conn = __get_db_connection()
+        cursor = conn.cursor()
+        try:
+            late_ids = pending_student_ids(cursor, tag, checkpoint['failed'])
+        finally:
+            cursor.close()
+            conn.close()
+        if late_ids:
+            print(f"   Catching up {len(late_ids)} late enrolment(s)...")
+            run_batches(pool, tag, args.model, late_ids, args.batch_size, checkpoint)
+            attendance_app.load_known_faces()
+
+    print("🎉 Re-embedding complete")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,18 @@
 #!/usr/bin/env python3
 """
-Database reset script to recreate tables with the new structure
+Database reset script to drop every app table and recreate it with the current structure
 """
 
 from db import __get_db_connection
+from logging_setup import configure_logging
+import app
+import migrations
 import mysql.connector
 
+# Every table the app or its scripts create, children first ('admins' predates migrate_to_teachers.py)
+APP_TABLES = ['attendance_daily', 'attendance', 'face_embeddings', 'teacher_sessions', 'students',
+              'teachers', 'admins', 'app_settings', 'schema_migrations']
+
 def reset_database():
     """Drop all tables and recreate with new structure"""
     
@@ -15,66 +22,21 @@ def reset_database():
         conn = __get_db_connection()
         cursor = conn.cursor()
         
-        # Drop existing tables
+        # Drop existing tables - schema_migrations too, so every migration runs again on the new tables
         print('1. Dropping existing tables...')
-        cursor.execute('DROP TABLE IF EXISTS attendance')
-        print('   ✅ Dropped attendance table')
-        
-        cursor.execute('DROP TABLE IF EXISTS students')
-        print('   ✅ Dropped students table')
-        
-        cursor.execute('DROP TABLE IF EXISTS admins')
-        print('   ✅ Dropped admins table')
+        cursor.execute('SET FOREIGN_KEY_CHECKS = 0')
+        for table in APP_TABLES:
+            cursor.execute(f'DROP TABLE IF EXISTS {table}')
+            print(f'   ✅ Dropped {table} table')
+        cursor.execute('SET FOREIGN_KEY_CHECKS = 1')
         
-        # Create admins table
+        # Recreate through the app's own schema and migrations
         print('\n2. Creating new table structure...')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS admins (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                username VARCHAR(50) NOT NULL UNIQUE,
-                email VARCHAR(100) NOT NULL UNIQUE,
-                password VARCHAR(255) NOT NULL,
-                face_image LONGTEXT,
-                face_encoding TEXT,
-                image_path VARCHAR(255),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        print('   ✅ Created admins table')
-        
-        # Create students table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS students (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                username VARCHAR(50) NOT NULL UNIQUE,
-                email VARCHAR(100) NOT NULL UNIQUE,
-                serial_number VARCHAR(2) NOT NULL UNIQUE,
-                phone VARCHAR(10) NOT NULL,
-                face_image LONGTEXT,
-                face_encoding TEXT,
-                image_path VARCHAR(255),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        print('   ✅ Created students table')
-        
-        # Create attendance table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS attendance (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                student_id INT NOT NULL,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                status ENUM('Present', 'Absent', 'Late') DEFAULT 'Present',
-                method ENUM('Face Recognition', 'Manual') DEFAULT 'Face Recognition',
-                admin_id INT,
-                notes TEXT,
-                FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE,
-                FOREIGN KEY (admin_id) REFERENCES admins(id) ON DELETE SET NULL
-            )
-        ''')
-        print('   ✅ Created attendance table')
+        configure_logging()
+        app.init_db()
+        done = migrations.migrate(conn)
+        print(f'   ✅ Created tables and applied {len(done)} pending migration(s)')
         
-        conn.commit()
         print('\n🎉 Database reset completed successfully!')
         
         cursor.close()
@@ -82,7 +44,7 @@ def reset_database():
         
         return True
         
-    except mysql.connector.Error as e:
+    except (mysql.connector.Error, migrations.LockTimeout) as e:
         print(f'❌ Database error: {e}')
         return False
 
@@ -0,0 +1,97 @@
+"""
+Read-through cache of student rows for the roster and detail pages
+
+/student, /view_student and /edit_student read the same few short columns
+on every page view. The rows are cached per process and keyed by query
+(roster or one student). Embeddings and images are never part of the
+cached projections.
+
+Routes that write to students call invalidate(). That writes a fresh
+generation token to a small file shared by every worker, like the gallery's
+CURRENT pointer, and each worker re-reads the token on access. A write in
+one worker is therefore seen by all of them on their next request. Entries
+also expire after ROSTER_CACHE_TTL as a safety net for writes made outside
+the app (setup scripts, manual SQL).
+
+Pages get ETags built from a hash of the cached rows they were rendered
+from, so browsers can revalidate a roster page with a 304 instead of
+re-downloading it, and a TTL reload that brings different rows (a write
+made outside the app) changes the ETag too.
+"""
+
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from gallery import GALLERY_DIR
+
+ROSTER_CACHE_FILE = os.environ.get('ROSTER_CACHE_FILE', os.path.join(GALLERY_DIR, 'ROSTER'))
+ROSTER_CACHE_TTL = float(os.environ.get('ROSTER_CACHE_TTL', 300.0))  # seconds
+ROSTER_CACHE_MAX_ENTRIES = int(os.environ.get('ROSTER_CACHE_MAX_ENTRIES', 4096))
+
+
+class RosterCache:
+    """Per-process LRU of query results, invalidated through a shared generation file"""
+
+    def __init__(self, path=ROSTER_CACHE_FILE, ttl=ROSTER_CACHE_TTL, max_entries=ROSTER_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (loaded_at, generation, value, content digest)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self):
+        """Current generation token shared by all workers ('0' before the first invalidation)"""
+        try:
+            with open(self.path) as f:
+                return f.read().strip() or '0'
+        except FileNotFoundError:
+            return '0'
+
+    def get(self, key, loader):
+        """Cached value for key, else loader() (errors propagate and nothing is cached)"""
+        generation = self.generation()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == generation and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        value = loader()
+        digest = hashlib.sha1(repr(value).encode()).hexdigest()
+        with self._lock:
+            self._entries[key] = (now, generation, value, digest)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self):
+        """Drop every worker's cached rows (call after writing to students)"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(uuid.uuid4().hex)
+        os.replace(tmp_path, self.path)
+        with self._lock:
+            self._entries.clear()
+
+    def etag(self, key, *parts):
+        """ETag (unquoted) for a page built from key's cached rows plus parts (e.g. page, user)
+
+        None if key isn't cached (e.g. its load failed): such pages aren't revalidated.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return hashlib.sha1('|'.join(map(str, (entry[3], key) + parts)).encode()).hexdigest()[:20]
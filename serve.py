@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Face Recognition Attendance System - Production Launcher
+
+Runs the Flask app under gunicorn instead of the Flask development server:
+- Multiple worker processes, each with a configurable number of threads
+- The app, database schema and face gallery are loaded once in the master
+  process before forking. The DeepFace model is warmed up in each worker
+  after the fork: TensorFlow's thread pools don't survive fork()
+- Request timeouts, graceful shutdown and graceful restart
+  (send SIGHUP to the master to recycle workers without dropping requests)
+
+Usage:
+    python3 serve.py                          # 4 workers x 4 threads on :5001
+    python3 serve.py --workers 8 --threads 2 --bind 0.0.0.0:5001
+    SERVE_WORKERS=8 python3 serve.py
+
+Every option can also be set with an environment variable (SERVE_<OPTION>).
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
+
+
+def _env(name, default):
+    return os.environ.get(f"SERVE_{name}", default)
+
+
+def parse_args(argv=None):
+    default_workers = min(4, multiprocessing.cpu_count())
+
+    parser = argparse.ArgumentParser(description="Production launcher for the attendance system")
+    parser.add_argument('--bind', default=_env('BIND', '127.0.0.1:5001'),
+                        help="Address to listen on (default: 127.0.0.1:5001)")
+    parser.add_argument('--workers', type=int, default=int(_env('WORKERS', default_workers)),
+                        help="Number of worker processes")
+    parser.add_argument('--threads', type=int, default=int(_env('THREADS', 4)),
+                        help="Threads per worker (requests handled concurrently per process)")
+    parser.add_argument('--timeout', type=int, default=int(_env('TIMEOUT', 60)),
+                        help="Seconds before a stuck request's worker is killed and restarted")
+    parser.add_argument('--graceful-timeout', type=int, default=int(_env('GRACEFUL_TIMEOUT', 30)),
+                        help="Seconds workers get to finish in-flight requests on restart/shutdown")
+    parser.add_argument('--keepalive', type=int, default=int(_env('KEEPALIVE', 5)),
+                        help="Seconds to keep idle HTTP connections open")
+    parser.add_argument('--max-requests', type=int, default=int(_env('MAX_REQUESTS', 0)),
+                        help="Recycle a worker after this many requests (0 = never)")
+    parser.add_argument('--no-preload-model', action='store_true',
+                        default=_env('NO_PRELOAD_MODEL', '') == '1',
+                        help="Skip warming the DeepFace model in each worker")
+    return parser.parse_args(argv)
+
+
+def warm_worker(worker):
+    """post_worker_init hook: load the model in the background so the worker can start serving"""
+    import app as attendance_app
+
+    threading.Thread(target=attendance_app.warmup_models, name='model-warmup', daemon=True).start()
+
+
+def gunicorn_options(args):
+    """Translate launcher arguments into gunicorn settings"""
+    options = {
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread' if args.threads > 1 else 'sync',
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'keepalive': args.keepalive,
+        'max_requests': args.max_requests,
+        'max_requests_jitter': args.max_requests // 10 if args.max_requests else 0,
+        # Import app (schema, gallery) once in the master and fork from there
+        'preload_app': True,
+        'accesslog': '-',
+        'errorlog': '-',
+    }
+    if not args.no_preload_model:
+        # Never in the master: TensorFlow isn't fork-safe
+        options['post_worker_init'] = warm_worker
+    return options
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        print("❌ Error: gunicorn is not installed. Run: pip install gunicorn")
+        sys.exit(1)
+
+    class AttendanceApplication(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # Runs once in the master because preload_app is set; no DeepFace/TensorFlow here
+            import app as attendance_app
+
+            return attendance_app.create_app()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    print("=" * 60)
+    print("🚀 Face Recognition Attendance System (production)")
+    print("=" * 60)
+    print(f"🌐 Listening on: http://{args.bind}")
+    print(f"⚙️  Workers: {args.workers} x {args.threads} threads")
+    print(f"⏱️  Request timeout: {args.timeout}s (graceful: {args.graceful_timeout}s)")
+    print("🔁 Graceful restart: kill -HUP <master pid>")
+    print("=" * 60)
+
+    AttendanceApplication(gunicorn_options(args)).run()
+
+
+if __name__ == "__main__":
+    main()
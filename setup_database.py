@@ -1,82 +1,30 @@
 #!/usr/bin/env python3
 """
 Database setup script for Face Recognition System
-Creates separate tables for admins and students
+Creates the app's tables through init_db() and applies pending migrations
 """
 
 from db import __get_db_connection
+from logging_setup import configure_logging
+import app
+import migrations
 import mysql.connector
 
 def setup_database():
     """Create all necessary tables for the face recognition system"""
     
     try:
-        conn = __get_db_connection()
-        cursor = conn.cursor()
-        
         print('=== CREATING DATABASE TABLES ===')
+        configure_logging()
         
-        # Create admins table (renamed to teachers for consistency)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS teachers (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                username VARCHAR(50) NOT NULL UNIQUE,
-                email VARCHAR(100) NOT NULL UNIQUE,
-                password VARCHAR(255) NOT NULL,
-                face_image LONGTEXT,
-                face_encoding TEXT,
-                image_path VARCHAR(255),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        print('✅ Created teachers table')
-        
-        # Create students table (no password required)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS students (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                username VARCHAR(50) NOT NULL UNIQUE,
-                email VARCHAR(100) NOT NULL UNIQUE,
-                serial_number VARCHAR(10) NOT NULL UNIQUE,
-                phone VARCHAR(10) NOT NULL,
-                face_image LONGTEXT,
-                face_encoding TEXT,
-                image_path VARCHAR(255),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        print('✅ Created students table')
+        # Same base schema as the app creates on startup
+        app.init_db()
         
-        # Create attendance table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS attendance (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                student_id INT NOT NULL,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                status ENUM('Present', 'Absent', 'Late') DEFAULT 'Present',
-                method ENUM('Face Recognition', 'Manual') DEFAULT 'Face Recognition',
-                teacher_id INT,
-                notes TEXT,
-                FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE,
-                FOREIGN KEY (teacher_id) REFERENCES teachers(id) ON DELETE SET NULL
-            )
-        ''')
-        print('✅ Created attendance table')
-        
-        # Create teacher_sessions table for login tracking
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS teacher_sessions (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                teacher_id INT,
-                login_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                logout_time TIMESTAMP NULL,
-                ip_address VARCHAR(45),
-                FOREIGN KEY (teacher_id) REFERENCES teachers(id) ON DELETE CASCADE
-            )
-        ''')
-        print('✅ Created teacher_sessions table')
-        
-        conn.commit()
+        # init_db() applies migrations too but only logs a failure; run them here so one is reported
+        conn = __get_db_connection()
+        cursor = conn.cursor()
+        done = migrations.migrate(conn)
+        print(f'✅ Applied {len(done)} migration(s)' if done else '✅ Schema is up to date')
         print('\n✅ All tables created successfully!')
         
         # Show table structure
@@ -95,7 +43,7 @@ def setup_database():
         
         return True
         
-    except mysql.connector.Error as e:
+    except (mysql.connector.Error, migrations.LockTimeout) as e:
         print(f'❌ Database error: {e}')
         return False
 
@@ -0,0 +1,185 @@
+// Frame capture for the live camera pages.
+//
+// Frames are downscaled in the browser to the resolution the server actually
+// processes (from /detection_config) and uploaded as WebP or JPEG, instead of
+// sending the full camera resolution as PNG and letting the server throw most
+// of it away.
+const FrameCapture = (() => {
+  // Used if /detection_config can't be reached (matches the server defaults)
+  const DEFAULT_CONFIG = {
+    detect: { width: 400, height: 300, formats: ['image/webp', 'image/jpeg'], quality: 0.7 },
+    recognize: { width: 800, height: 800, formats: ['image/webp', 'image/jpeg'], quality: 0.9 },
+    poll: { interval_ms: 500, max_interval_ms: 5000 }
+  };
+  const LATENCY_FACTOR = 1.5;  // Leave the server idle for half a request between polls when it is slow
+
+  let configPromise = null;
+  const encodable = {};
+  const canvases = {};
+
+  function loadConfig() {
+    if (!configPromise) {
+      configPromise = fetch('/detection_config')
+        .then(res => (res.ok ? res.json() : DEFAULT_CONFIG))
+        .catch(() => DEFAULT_CONFIG);
+    }
+    return configPromise;
+  }
+
+  // First format the browser can actually encode (Safari has no WebP canvas encoder)
+  function pickFormat(formats) {
+    for (const type of formats) {
+      if (!(type in encodable)) {
+        const probe = document.createElement('canvas');
+        probe.width = probe.height = 1;
+        encodable[type] = probe.toDataURL(type).startsWith(`data:${type}`);
+      }
+      if (encodable[type]) return type;
+    }
+    return 'image/jpeg';
+  }
+
+  // Room/camera id sent with every /detect_face frame, so MOTION_THRESHOLDS can tune
+  // the motion gate per room and /motion_stats reports by room. Configured once per
+  // browser by opening the page with ?camera=room-101; remembered in localStorage.
+  function cameraId() {
+    const fromUrl = new URLSearchParams(window.location.search).get('camera');
+    try {
+      if (fromUrl) localStorage.setItem('cameraId', fromUrl);
+      return fromUrl || localStorage.getItem('cameraId') || 'default';
+    } catch (e) {
+      return fromUrl || 'default';  // Storage disabled
+    }
+  }
+
+  // Largest size within maxWidth x maxHeight that keeps the aspect ratio (never upscales)
+  function fitSize(width, height, maxWidth, maxHeight) {
+    const scale = Math.min(1, maxWidth / width, maxHeight / height);
+    return [Math.max(1, Math.round(width * scale)), Math.max(1, Math.round(height * scale))];
+  }
+
+  // Capture a <video> or <canvas> for one purpose ('detect' or 'recognize')
+  function capture(source, target) {
+    const sourceWidth = source.videoWidth || source.width;
+    const sourceHeight = source.videoHeight || source.height;
+    const [width, height] = fitSize(sourceWidth, sourceHeight, target.width, target.height);
+
+    const key = `${width}x${height}`;
+    const canvas = canvases[key] || (canvases[key] = document.createElement('canvas'));
+    canvas.width = width;
+    canvas.height = height;
+    canvas.getContext('2d').drawImage(source, 0, 0, width, height);
+
+    const image = canvas.toDataURL(pickFormat(target.formats), target.quality);
+    return { image, width, height, bytes: Math.round((image.length - image.indexOf(',') - 1) * 3 / 4) };
+  }
+
+  // Scale factors from the frame the server measured boxes in to a display canvas
+  function boxScale(data, canvasElement) {
+    const frameWidth = data.frame_width || DEFAULT_CONFIG.detect.width;
+    const frameHeight = data.frame_height || DEFAULT_CONFIG.detect.height;
+    return { x: canvasElement.width / frameWidth, y: canvasElement.height / frameHeight };
+  }
+
+  // POST /recognize. With the result_token of the latest /detect_face response
+  // the server reuses that result's embedding (no upload, no second inference);
+  // if the token is no longer valid (410) the frame is sent at recognition size.
+  // onFrame(frame) is called when a frame actually has to be captured.
+  function recognize(source, resultToken, onFrame) {
+    const send = body => fetch('/recognize', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', 'Cache-Control': 'no-cache' },
+      body: JSON.stringify(body)
+    });
+    const sendFrame = () => loadConfig().then(config => {
+      const frame = capture(source, config.recognize);
+      if (onFrame) onFrame(frame);
+      return send({ image: frame.image });
+    });
+
+    const first = resultToken ? send({ result_token: resultToken }) : sendFrame();
+    return first
+      .then(res => (res.status === 410 ? sendFrame() : res))
+      .then(res => res.json());
+  }
+
+  // Detection polling with backpressure. At most one request is in flight and
+  // the next one is scheduled from the smoothed request latency and the
+  // server's recommended_interval_ms, instead of a fixed setInterval that
+  // piles requests onto a slow server. Frames the nominal rate would have
+  // sent in the meantime are counted as dropped.
+  //
+  // run() sends one frame and resolves with the parsed response.
+  function createPoller(run, { shouldRun = () => true, onStats = () => {} } = {}) {
+    const stats = { sent: 0, dropped: 0, latencyMs: null, intervalMs: null, serverIntervalMs: null };
+    let running = false;
+    let timer = null;
+    let lastSent = 0;
+
+    function schedule(delay) {
+      if (running) timer = setTimeout(tick, delay);
+    }
+
+    function tick() {
+      loadConfig().then(config => {
+        const poll = config.poll || DEFAULT_CONFIG.poll;
+        if (!running) return;
+        if (!shouldRun()) {
+          lastSent = 0;  // Paused (e.g. while scanning), not dropping
+          schedule(poll.interval_ms);
+          return;
+        }
+
+        const started = performance.now();
+        if (lastSent) {
+          stats.dropped += Math.max(0, Math.floor((started - lastSent) / poll.interval_ms) - 1);
+        }
+        lastSent = started;
+        stats.sent++;
+
+        let failed = false;
+        Promise.resolve()
+          .then(run)
+          .then(data => {
+            stats.serverIntervalMs = (data && data.recommended_interval_ms) || null;
+          })
+          .catch(err => {
+            failed = true;
+            console.error('Detection request failed:', err);
+          })
+          .then(() => {
+            const latency = performance.now() - started;
+            stats.latencyMs = stats.latencyMs === null ? latency : 0.7 * stats.latencyMs + 0.3 * latency;
+            let interval = Math.max(poll.interval_ms, stats.latencyMs * LATENCY_FACTOR, stats.serverIntervalMs || 0);
+            if (failed) interval = Math.max(interval, (stats.intervalMs || poll.interval_ms) * 2);  // Back off on errors
+            stats.intervalMs = Math.min(interval, poll.max_interval_ms);
+            onStats(stats);
+            schedule(Math.max(0, started + stats.intervalMs - performance.now()));
+          });
+      });
+    }
+
+    return {
+      start() {
+        if (running) return;
+        running = true;
+        lastSent = 0;
+        tick();
+      },
+      stop() {
+        running = false;
+        clearTimeout(timer);
+      },
+      stats
+    };
+  }
+
+  function formatStats(stats) {
+    if (stats.latencyMs === null) return '';
+    return `Detection ${Math.round(stats.latencyMs)} ms · every ${(stats.intervalMs / 1000).toFixed(1)} s` +
+      (stats.serverIntervalMs > DEFAULT_CONFIG.poll.interval_ms ? ' (server busy)' : '') +
+      ` · ${stats.dropped} dropped frame${stats.dropped === 1 ? '' : 's'}`;
+  }
+
+  return { loadConfig, cameraId, capture, boxScale, recognize, createPoller, formatStats };
+})();
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for admission control on the inference endpoints.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from admission import AdmissionController, Overloaded
+
+def hold_slot(controller, priority_class, seconds, outcomes):
+    try:
+        with controller.slot(priority_class):
+            outcomes.append(priority_class)
+            time.sleep(seconds)
+    except Overloaded as e:
+        outcomes.append((priority_class, e.status))
+
+def test_admission():
+    print("🧪 Testing admission control...")
+    limits = {'attendance': (8, 2.0), 'overlay': (1, 0.05), 'enrolment': (2, 2.0)}
+    controller = AdmissionController(concurrency=2, reserved=1, limits=limits)
+
+    # Overlay can't take the slot reserved for attendance
+    controller.acquire('overlay')
+    try:
+        controller.acquire('overlay')
+        assert False, "overlay should have been shed"
+    except Overloaded as e:
+        assert e.status == 503 and e.retry_after >= 1
+    controller.acquire('attendance')
+    assert controller.in_flight == 2
+    print("   ✅ Reserved slot is kept for attendance captures")
+    controller.release()
+    controller.release()
+
+    # slot() wraps only the wait in `waiting` (the app times it as the 'admission' stage)
+    waits = []
+    @contextmanager
+    def waiting():
+        waits.append(controller.in_flight)
+        yield
+        waits.append(controller.in_flight)
+    with controller.slot('enrolment', waiting=waiting()):
+        assert controller.in_flight == 1
+    assert waits == [0, 1] and controller.in_flight == 0
+    print("   ✅ slot() reports the time spent waiting")
+
+    # With every slot busy, queued attendance is served before queued enrolment
+    outcomes = []
+    busy = [threading.Thread(target=hold_slot, args=(controller, 'attendance', 0.2, outcomes)) for _ in range(2)]
+    for thread in busy:
+        thread.start()
+    time.sleep(0.05)
+    waiters = [threading.Thread(target=hold_slot, args=(controller, name, 0.01, outcomes))
+               for name in ('enrolment', 'attendance')]
+    for thread in waiters:
+        thread.start()
+        time.sleep(0.02)
+    for thread in busy + waiters:
+        thread.join()
+    assert outcomes[2:] == ['attendance', 'enrolment'], outcomes
+    print("   ✅ Waiting requests are admitted by priority")
+
+    # A full class queue is rejected straight away with 429
+    outcomes = []
+    busy = [threading.Thread(target=hold_slot, args=(controller, 'attendance', 0.3, outcomes)) for _ in range(2)]
+    for thread in busy:
+        thread.start()
+    time.sleep(0.05)
+    queued = threading.Thread(target=hold_slot, args=(controller, 'enrolment', 0.01, outcomes))
+    queued.start()
+    time.sleep(0.02)
+    extra = [threading.Thread(target=hold_slot, args=(controller, 'enrolment', 0.01, outcomes)) for _ in range(2)]
+    for thread in extra:
+        thread.start()
+    started = time.monotonic()
+    extra[-1].join()
+    assert time.monotonic() - started < 0.1
+    for thread in busy + [queued] + extra:
+        thread.join()
+    assert ('enrolment', 429) in outcomes, outcomes
+    stats = controller.stats()
+    assert stats['in_flight'] == 0 and stats['rejected']['enrolment']['429'] == 1
+    assert 'face_admission_rejected_total{class="enrolment",status="429"} 1' in controller.render_prometheus()
+    print(f"   ✅ Full queue shed with 429: {stats['rejected']}")
+
+if __name__ == "__main__":
+    test_admission()
+    print("\n🎉 Admission control tests passed!")
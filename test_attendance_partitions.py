@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for attendance partition layout and archive files.
+"""
+
+import csv
+import gzip
+import os
+import tempfile
+from datetime import date, datetime
+import mysql.connector
+from attendance_partitions import (ARCHIVE_COLUMNS, TriggerError, add_months, archivable, archive_path,
+                                   ensure_triggers, live_since, partition_definitions, write_archive)
+
+class TriggerCursor:
+    """Partitioned attendance with teachers_clear_attendance already in place"""
+    def __init__(self, can_create=True):
+        self.can_create = can_create
+        self.created = []
+        self.result = []
+
+    def execute(self, sql, params=()):
+        if "information_schema.PARTITIONS" in sql:
+            self.result = [('p202610', datetime(2026, 11, 1), 3), ('pmax', None, 0)]
+        elif "information_schema.TRIGGERS" in sql:
+            self.result = [('teachers_clear_attendance',)]
+        elif sql.strip().startswith("CREATE TRIGGER"):
+            if not self.can_create:
+                raise mysql.connector.Error("You do not have the SUPER privilege and binary logging is enabled")
+            self.created.append(sql.split()[2])
+
+    def fetchall(self):
+        return self.result
+
+def test_attendance_partitions():
+    print("🧪 Testing attendance partitions...")
+
+    assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+    clauses = partition_definitions(date(2026, 11, 15), date(2027, 1, 1)).split(",\n")
+    assert len(clauses) == 4
+    assert "p202611 VALUES LESS THAN (UNIX_TIMESTAMP('2026-12-01 00:00:00'))" in clauses[0]
+    assert "p202701 VALUES LESS THAN (UNIX_TIMESTAMP('2027-02-01 00:00:00'))" in clauses[2]
+    assert clauses[-1].strip() == "PARTITION pmax VALUES LESS THAN MAXVALUE"
+    print("   ✅ One partition per month plus pmax")
+
+    partitions = [('p202608', datetime(2026, 9, 1), 10), ('p202609', datetime(2026, 10, 1), 12),
+                  ('pmax', None, 0)]
+    assert [name for name, _, _ in archivable(partitions, date(2026, 9, 20))] == ['p202608']
+    assert [name for name, _, _ in archivable(partitions, date(2026, 10, 1))] == ['p202608', 'p202609']
+    print("   ✅ Only whole months before the cutoff are archived")
+
+    assert live_since(partitions) == date(2026, 8, 1)
+    assert live_since(partitions[1:]) == date(2026, 9, 1) and live_since([]) is None
+    print("   ✅ Live data starts at the first remaining partition")
+
+    cursor = TriggerCursor()
+    assert ensure_triggers(cursor) == ['students_delete_attendance'] == cursor.created
+    try:
+        ensure_triggers(TriggerCursor(can_create=False))
+        assert False, "a missing trigger should raise"
+    except TriggerError:
+        pass
+    print("   ✅ Missing delete triggers are created, or raise when they can't be")
+
+    with tempfile.TemporaryDirectory() as root:
+        rows = [(1, 7, '07', 'ann', datetime(2026, 8, 3, 9, 0), 'Present', 'Face Recognition', None, None),
+                (2, 8, '08', None, datetime(2026, 8, 3, 9, 5), 'Late', 'Manual', 1, 'bus')]
+        path = archive_path(os.path.join(root, 'archive'), 'p202608', 'csv')
+        assert write_archive(rows, path) == 2
+        with gzip.open(path, 'rt', newline='') as f:
+            read = list(csv.reader(f))
+        assert read[0] == ARCHIVE_COLUMNS and len(read) == 3
+        assert read[2][3] == '' and read[2][8] == 'bus'
+        assert os.listdir(os.path.dirname(path)) == ['attendance_p202608.csv.gz']
+        print("   ✅ Archive written as gzip CSV with a header row")
+
+if __name__ == "__main__":
+    test_attendance_partitions()
+    print("\n🎉 Attendance partition tests passed!")
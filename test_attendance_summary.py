@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Test script for the daily attendance summary upserts.
+"""
+
+from datetime import date, datetime
+from attendance_summary import backfill, record_event
+
+class RecordingCursor:
+    def __init__(self, partitions=()):
+        self.statements = []
+        self.partitions = list(partitions)
+        self.rowcount = 0
+
+    def execute(self, sql, params=()):
+        self.statements.append((" ".join(sql.split()), params))
+
+    def fetchall(self):
+        return self.partitions
+
+def test_attendance_summary():
+    print("🧪 Testing attendance summary...")
+    cursor = RecordingCursor()
+    seen = datetime(2026, 10, 19, 9, 5)
+
+    assert record_event(cursor, 7, seen, 'Late')
+    sql, params = cursor.statements[0]
+    assert "late_count = late_count + 1" in sql and "present_count" not in sql
+    assert params == (7, seen, seen, seen)
+    print("   ✅ Known statuses bump their own counter")
+
+    for status in ('Excused', None, 'present'):
+        assert not record_event(cursor, 7, seen, status)
+    assert len(cursor.statements) == 1
+    print("   ✅ Unknown statuses are skipped, not counted as Present")
+
+    # p202609 is the oldest live partition; earlier months have been archived
+    cursor = RecordingCursor([('p202609', datetime(2026, 10, 1), 5), ('pmax', None, 0)])
+    backfill(cursor)
+    delete, params = cursor.statements[1]
+    assert delete.startswith("DELETE FROM attendance_daily WHERE day >= %s") and params == [date(2026, 9, 1)]
+    cursor = RecordingCursor([('p202609', datetime(2026, 10, 1), 5), ('pmax', None, 0)])
+    assert backfill(cursor, until=date(2026, 8, 31)) == 0 and len(cursor.statements) == 1
+    print("   ✅ Backfill leaves the summary of archived months alone")
+
+if __name__ == "__main__":
+    test_attendance_summary()
+    print("\n🎉 Attendance summary tests passed!")
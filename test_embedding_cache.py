@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Test script for the on-disk embedding cache.
+"""
+
+import tempfile
+import numpy as np
+from embedding_cache import EmbeddingCache
+
+def test_embedding_cache():
+    print("🧪 Testing embedding cache...")
+
+    with tempfile.TemporaryDirectory() as root:
+        cache = EmbeddingCache(root, max_bytes=10 ** 6)
+        image = np.zeros((32, 32, 3), dtype=np.uint8)
+        key = cache.key(image, 'Facenet', 'retinaface-align1')
+        assert key != cache.key(image, 'Facenet', 'opencv-align1')
+
+        assert cache.get(key) is None
+        cache.put(key, np.arange(128))
+        assert np.array_equal(cache.get(key), np.arange(128, dtype=np.float32))
+        print("   ✅ Embeddings round-trip by image, model and detector")
+
+        # Overwriting a key replaces its bytes instead of adding to them
+        size = cache._total_bytes
+        for _ in range(5):
+            cache.put(key, np.ones(128))
+        assert cache._total_bytes == size == cache._scan_size()
+        print("   ✅ Size accounting survives overwrites")
+
+        small = EmbeddingCache(root, max_bytes=size * 3)
+        for i in range(6):
+            small.put(f"{i:02d}-entry", np.full(128, i))
+        assert small._scan_size() <= size * 3
+        print("   ✅ Entries are evicted past the size budget")
+
+if __name__ == "__main__":
+    test_embedding_cache()
+    print("\n🎉 Embedding cache tests passed!")
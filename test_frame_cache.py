@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the near-identical frame detection cache.
+"""
+
+import time
+from PIL import Image, ImageDraw
+from frame_cache import FrameResultCache, ResultTokenStore, frame_hash
+
+def create_scene(face_x=100):
+    """Create a simple classroom-like frame with one face-like blob"""
+    img = Image.new('RGB', (400, 300), color='lightgray')
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([0, 200, 400, 300], fill='brown')
+    draw.ellipse([face_x, 60, face_x + 80, 160], fill='peachpuff', outline='black')
+    return img
+
+def test_frame_cache():
+    print("🧪 Testing frame result cache...")
+    cache = FrameResultCache(ttl=0.5, max_sessions=2)
+    result = {"success": True, "faces": [], "total_faces": 0}
+
+    scene = create_scene()
+    h = frame_hash(scene)
+    cache.put('cam-1', h, result, version=1)
+
+    # Same scene with a little sensor noise still hits
+    noisy = scene.copy()
+    noisy.putpixel((10, 10), (0, 0, 0))
+    assert cache.get('cam-1', frame_hash(noisy), version=1) == result
+    print("   ✅ Near-identical frame hit the cache")
+
+    # A moved face misses
+    assert cache.get('cam-1', frame_hash(create_scene(face_x=260)), version=1) is None
+    print("   ✅ Changed frame missed the cache")
+
+    # Other sessions and other gallery versions never share results
+    assert cache.get('cam-2', h, version=1) is None
+    assert cache.get('cam-1', h, version=2) is None
+    print("   ✅ Results are isolated per session and gallery version")
+
+    # TTL expiry
+    time.sleep(0.6)
+    assert cache.get('cam-1', h, version=1) is None
+    print("   ✅ Entries expire after the TTL")
+
+    # Session bound
+    for key in ('a', 'b', 'c'):
+        cache.put(key, h, result)
+    assert cache.get('a', h) is None and cache.get('c', h) == result
+    print("   ✅ Least recently used sessions are evicted")
+
+def test_result_tokens():
+    print("🧪 Testing detection result tokens...")
+    tokens = ResultTokenStore(ttl=0.2, max_tokens=2)
+    faces = [[0.1, 0.2, 0.3]]
+
+    token = tokens.issue('cam-1', faces, version=1)
+    assert tokens.redeem(token, 'cam-1', version=1) == faces
+    assert tokens.redeem(token, 'cam-1', version=1) == faces
+    print("   ✅ Tokens redeem until they expire")
+
+    # Bound to the issuing session and gallery version
+    assert tokens.redeem(tokens.issue('cam-1', faces, version=1), 'cam-2', version=1) is None
+    assert tokens.redeem(tokens.issue('cam-1', faces, version=1), 'cam-1', version=2) is None
+    print("   ✅ Tokens are bound to session and gallery version")
+
+    # Expiry and size bound
+    token = tokens.issue('cam-1', faces)
+    time.sleep(0.25)
+    assert tokens.redeem(token, 'cam-1') is None
+    oldest = tokens.issue('cam-1', faces)
+    tokens.issue('cam-1', faces)
+    tokens.issue('cam-1', faces)
+    assert tokens.redeem(oldest, 'cam-1') is None
+    print("   ✅ Tokens expire and the oldest are evicted")
+
+if __name__ == "__main__":
+    test_frame_cache()
+    test_result_tokens()
+    print("\n🎉 Frame cache tests passed!")
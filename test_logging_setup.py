@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test script for the structured, sampled logging setup.
+"""
+
+import io
+import json
+import logging
+from contextlib import contextmanager
+from logging_setup import ROOT_LOGGER, configure_logging, get_logger, parse_sample_rates
+
+@contextmanager
+def saved_logging():
+    """Restore the "face" logger's handlers, level and propagation afterwards"""
+    logger = logging.getLogger(ROOT_LOGGER)
+    handlers, level, propagate = list(logger.handlers), logger.level, logger.propagate
+    try:
+        yield
+    finally:
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        for handler in handlers:
+            logger.addHandler(handler)
+        logger.setLevel(level)
+        logger.propagate = propagate
+
+def test_logging_setup():
+    print("🧪 Testing structured logging...")
+    with saved_logging():
+        check_logging_setup()
+    assert not any(isinstance(getattr(h, 'stream', None), io.StringIO)
+                   for h in logging.getLogger(ROOT_LOGGER).handlers)
+    print("   ✅ Logger restored after the test")
+
+def check_logging_setup():
+    stream = io.StringIO()
+    configure_logging(level='INFO', fmt='json', sample='face.detect=0', stream=stream)
+    log = get_logger('recognize')
+
+    log.info("Face recognized as %s", "01_alice", extra={'distance': 4.2})
+    log.debug("Not emitted at INFO: %s", "x")
+    entry = json.loads(stream.getvalue().strip())
+    assert entry['level'] == 'INFO' and entry['logger'] == 'face.recognize'
+    assert entry['msg'] == "Face recognized as 01_alice"
+    assert entry['distance'] == 4.2
+    print(f"   ✅ JSON line: {stream.getvalue().strip()}")
+
+    # Arguments are only formatted when a record is emitted
+    class Expensive:
+        def __str__(self):
+            raise AssertionError("formatted a suppressed record")
+    log.debug("Distances: %s", Expensive())
+    print("   ✅ Suppressed records are never formatted")
+
+    # Sampling drops sub-warning records of face.detect (and children) but never warnings
+    stream.truncate(0)
+    stream.seek(0)
+    get_logger('detect').info("dropped")
+    get_logger('detect.cache').info("dropped too")
+    get_logger('detect').warning("kept")
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line['msg'] for line in lines] == ["kept"]
+    print("   ✅ Sampling drops info records but keeps warnings")
+
+    assert parse_sample_rates("face.detect=0.01, face.recognize=2,bad=x") == {'face.detect': 0.01, 'face.recognize': 1.0}
+    assert not logging.getLogger('face').propagate
+    print("   ✅ Sample rates parsed and clamped")
+
+if __name__ == "__main__":
+    test_logging_setup()
+    print("\n🎉 Logging tests passed!")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test script for the stage latency metrics.
+"""
+
+import time
+from metrics import LatencyAverage, StageMetrics, StageTimer
+
+def test_stage_metrics():
+    print("🧪 Testing stage metrics...")
+    registry = StageMetrics()
+
+    for i in range(100):
+        timer = StageTimer('recognize')
+        with timer.stage('decode'):
+            pass
+        # A stage entered twice in one request is recorded as the sum
+        timer.add('embed', 0.010)
+        timer.add('embed', 0.001 * (i % 10))
+        timer.finish()
+        registry.record(timer)
+
+    stats = registry.percentiles()['recognize']
+    assert set(stats) == {'decode', 'embed', 'total'}
+    assert stats['embed']['count'] == 100
+    assert abs(stats['embed']['p50'] - 0.015) < 1e-9
+    assert abs(stats['embed']['p99'] - 0.019) < 1e-9
+    print(f"   ✅ embed p50={stats['embed']['p50'] * 1000:.1f}ms p99={stats['embed']['p99'] * 1000:.1f}ms")
+
+    text = registry.render_prometheus()
+    assert '# TYPE face_stage_seconds histogram' in text
+    assert 'face_stage_seconds_bucket{route="recognize",stage="embed",le="0.01"} 10' in text
+    assert 'face_stage_seconds_bucket{route="recognize",stage="embed",le="+Inf"} 100' in text
+    assert 'face_stage_seconds_count{route="recognize",stage="embed"} 100' in text
+    assert 'face_stage_recent_seconds{route="recognize",stage="embed",quantile="0.9"}' in text
+    print("   ✅ Prometheus exposition has cumulative buckets and percentiles")
+
+    timer = StageTimer('detect_face')
+    with timer.stage('detect'):
+        time.sleep(0.002)
+    timer.finish()
+    header = timer.server_timing()
+    assert header.startswith('detect;dur=') and 'total;dur=' in header
+    print(f"   ✅ Server-Timing header: {header}")
+
+def test_latency_average():
+    print("🧪 Testing latency average...")
+    average = LatencyAverage(alpha=0.5)
+    assert average.seconds is None
+    average.observe(0.1)
+    assert average.seconds == 0.1
+    average.observe(0.3)
+    average.observe(0.3)
+    assert abs(average.seconds - 0.25) < 1e-9
+    print(f"   ✅ EWMA follows a slowdown: {average.seconds * 1000:.0f}ms")
+
+if __name__ == "__main__":
+    test_stage_metrics()
+    test_latency_average()
+    print("\n🎉 Stage metrics tests passed!")
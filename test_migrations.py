@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for the versioned migration runner.
+Uses an in-memory stand-in for the schema_migrations table.
+"""
+
+from migrations import MIGRATIONS, LockTimeout, migrate, pending
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.result = []
+
+    def execute(self, sql, params=()):
+        sql = " ".join(sql.split())
+        if sql.startswith("SELECT GET_LOCK"):
+            self.result = [(0 if self.db['locked'] else 1,)]
+        elif sql.startswith("SELECT RELEASE_LOCK"):
+            self.result = [(1,)]
+        elif sql.startswith("SELECT version FROM schema_migrations"):
+            self.result = [(version,) for version in self.db['applied']]
+        elif sql.startswith("INSERT INTO schema_migrations"):
+            self.db['applied'].append(params[0])
+        self.db['statements'].append(sql)
+
+    def fetchone(self):
+        return self.result[0]
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+class FakeConnection:
+    def __init__(self, locked=False):
+        self.db = {'applied': [], 'statements': [], 'commits': 0, 'locked': locked}
+
+    def cursor(self):
+        return FakeCursor(self.db)
+
+    def commit(self):
+        self.db['commits'] += 1
+
+def test_migrations():
+    print("🧪 Testing migrations...")
+
+    versions = [version for version, _, _ in MIGRATIONS]
+    assert versions == sorted(set(versions)), "versions must be unique and increasing"
+    assert [m[0] for m in pending({1})] == versions[1:]
+    print("   ✅ Pending migrations come in version order")
+
+    calls = []
+    steps = [(2, "second", lambda cursor: calls.append(2)), (1, "first", lambda cursor: calls.append(1))]
+    conn = FakeConnection()
+    assert migrate(conn, steps, log=lambda message: None) == [1, 2]
+    assert calls == [1, 2] and conn.db['applied'] == [1, 2] and conn.db['commits'] == 2
+    assert conn.db['statements'][-1].startswith("SELECT RELEASE_LOCK")
+    print("   ✅ Each migration is recorded and committed as it completes")
+
+    assert migrate(conn, steps, log=lambda message: None) == []
+    assert calls == [1, 2]
+    print("   ✅ A second run (next startup) applies nothing")
+
+    def broken(cursor):
+        raise RuntimeError("duplicate column")
+    conn = FakeConnection()
+    try:
+        migrate(conn, [(1, "first", lambda cursor: None), (2, "broken", broken)], log=lambda message: None)
+        assert False, "error should propagate"
+    except RuntimeError:
+        pass
+    assert conn.db['applied'] == [1] and conn.db['statements'][-1].startswith("SELECT RELEASE_LOCK")
+    print("   ✅ A failed migration stays pending and the lock is released")
+
+    # Another worker holds the lock past the timeout: nothing runs and nothing is released
+    conn = FakeConnection(locked=True)
+    try:
+        migrate(conn, steps, log=lambda message: None, timeout=0)
+        assert False, "lock timeout should raise"
+    except LockTimeout:
+        pass
+    assert conn.db['applied'] == [] and calls == [1, 2]
+    assert not any(s.startswith("SELECT RELEASE_LOCK") for s in conn.db['statements'])
+    print("   ✅ Lock timeout raises LockTimeout without applying anything")
+
+if __name__ == "__main__":
+    test_migrations()
+    print("\n🎉 Migration tests passed!")
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Test script for the /detect_face motion gate.
+"""
+
+from PIL import Image
+from motion_gate import MotionGate
+
+def test_motion_gate():
+    print("🧪 Testing motion gate...")
+    gate = MotionGate(threshold=0.02, keepalive=60, thresholds={'room-101': 0.5})
+    still = Image.new('RGB', (400, 300), (120, 120, 120))
+    moved = Image.new('RGB', (400, 300), (200, 200, 200))
+    mine, theirs = ('session-a', 'room-101'), ('session-b', 'room-101')
+
+    assert gate.check(mine, still) is None
+    gate.remember(mine, {'faces': []})
+    assert gate.check(mine, still) == {'faces': []}
+    print("   ✅ Unchanged frames are gated")
+
+    # Same camera id from another session gets its own state
+    assert gate.check(theirs, moved) is None
+    gate.remember(theirs, {'faces': ['x']})
+    assert gate.check(mine, still) == {'faces': []}
+    assert gate.threshold_for(theirs) == 0.5
+    print("   ✅ Camera state is scoped to the session")
+
+    # Frame cache hits pass the gate but don't count as inference
+    gate = MotionGate(threshold=0.02, keepalive=60)
+    assert gate.check(mine, still) is None
+    gate.remember(mine, {'faces': []})
+    assert gate.check(mine, moved) is None
+    gate.remember(mine, {'faces': []}, cached=True)
+    gate.check(theirs, moved)
+    gate.remember(theirs, {'faces': []})
+    stats = gate.stats()
+    assert list(stats) == ['room-101'], "stats are labelled by camera id, not session"
+    stats = stats['room-101']
+    assert stats['sessions'] == 2 and stats['frames'] == 3, stats
+    assert stats['processed'] == 2 and stats['cached'] == 1, stats
+    print(f"   ✅ Stats by room: {stats['processed']} processed, {stats['cached']} cached")
+
+if __name__ == "__main__":
+    test_motion_gate()
+    print("\n🎉 Motion gate tests passed!")
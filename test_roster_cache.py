@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script for the student roster read-through cache.
+Simulates two workers sharing one generation file.
+"""
+
+import os
+import tempfile
+import time
+from roster_cache import RosterCache
+
+def test_roster_cache():
+    print("🧪 Testing roster cache...")
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'ROSTER')
+        worker_a = RosterCache(path, ttl=60)
+        worker_b = RosterCache(path, ttl=60)
+        loads = []
+
+        def loader():
+            loads.append(1)
+            return [(1, '7', 'ann')]
+
+        assert worker_a.get('roster', loader) == [(1, '7', 'ann')]
+        assert worker_a.get('roster', loader) == [(1, '7', 'ann')]
+        assert len(loads) == 1 and worker_a.hits == 1
+        print("   ✅ Second read served from cache")
+
+        worker_b.get('roster', loader)
+        etag = worker_b.etag('roster', 'teacher')
+        assert etag == worker_a.etag('roster', 'teacher') != worker_a.etag('roster', 'other')
+        assert worker_a.etag(('student', 1), 'teacher') is None
+
+        # A write in one worker invalidates the other's rows
+        worker_a.invalidate()
+        worker_b.get('roster', loader)
+        assert len(loads) == 3
+        print("   ✅ Invalidation reaches other workers")
+
+        # The ETag follows the rows, e.g. after a TTL reload picks up an outside write
+        assert worker_b.etag('roster', 'teacher') == etag
+        expired = RosterCache(path, ttl=0)
+        expired.get('roster', loader)
+        assert expired.etag('roster', 'teacher') == etag
+        expired.get('roster', lambda: [(1, '7', 'ann'), (2, '8', 'bo')])  # Reload sees a manual INSERT
+        assert expired.etag('roster', 'teacher') != etag
+        print("   ✅ ETags change with the cached content")
+
+        # Loader errors propagate and aren't cached
+        def failing():
+            raise RuntimeError("db down")
+        try:
+            worker_a.get(('student', 1), failing)
+            assert False, "error should propagate"
+        except RuntimeError:
+            pass
+        assert worker_a.get(('student', 1), loader) == [(1, '7', 'ann')]
+        print("   ✅ Failed loads are not cached")
+
+        short = RosterCache(path, ttl=0.05)
+        short.get('roster', loader)
+        time.sleep(0.06)
+        short.get('roster', loader)
+        assert short.misses == 2
+        print("   ✅ Entries expire after the TTL")
+
+if __name__ == "__main__":
+    test_roster_cache()
+    print("\n🎉 Roster cache tests passed!")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared memory-mapped gallery.
+Simulates two workers: one publishes, the other picks up the new version.
+"""
+
+import tempfile
+import numpy as np
+from gallery import SharedGallery, build_identity_arrays, identities_within, nearest_identity
+
+def test_shared_gallery():
+    """Publish from one gallery handle and check another handle sees it"""
+    print("🧪 Testing shared gallery publish/refresh...")
+
+    with tempfile.TemporaryDirectory() as root:
+        writer = SharedGallery(root)
+        reader = SharedGallery(root)
+
+        # Nothing published yet
+        assert not reader.refresh()
+        assert reader.version == 0
+        print("   ✅ Empty store reports no gallery")
+
+        embeddings = [np.random.rand(128).astype(np.float32) for _ in range(3)]
+        names = ['01_alice', '02_bob', '03_carol']
+        version = writer.publish(embeddings, names, model='Facenet')
+
+        assert reader.refresh()
+        snapshot = reader.snapshot()
+        assert snapshot.version == version
+        assert snapshot.names == names
+        assert snapshot.embeddings.dtype == np.float32
+        assert snapshot.embeddings.shape == (3, 128)
+        assert isinstance(snapshot.embeddings, np.memmap)
+        assert snapshot.meta['model'] == 'Facenet'
+        print(f"   ✅ Reader mapped version {version} with {len(names)} faces")
+
+        # Re-publishing bumps the version counter and the reader follows
+        new_version = writer.publish(embeddings[:1], names[:1], model='Facenet')
+        assert new_version == version + 1
+        reader.refresh()
+        assert reader.snapshot().names == names[:1]
+        print(f"   ✅ Reader followed republish to version {new_version}")
+
+        # Empty gallery is valid
+        writer.publish([], [], model='Facenet')
+        reader.refresh()
+        assert len(reader.snapshot().embeddings) == 0
+        print("   ✅ Empty gallery published and mapped")
+
+def test_multi_embedding_gallery():
+    """Several embeddings per student: prototype shortlist then exact re-rank"""
+    print("🧪 Testing multi-embedding gallery matching...")
+
+    with tempfile.TemporaryDirectory() as root:
+        rng = np.random.default_rng(0)
+        centers = rng.normal(size=(20, 128)).astype(np.float32) * 10
+        embeddings, names = [], []
+        for i, center in enumerate(centers):
+            for _ in range(3):
+                embeddings.append(center + rng.normal(size=128).astype(np.float32))
+                names.append(f"{i:02d}_student")
+
+        identities, offsets, prototypes = build_identity_arrays(embeddings, names)
+        assert len(identities) == 20
+        assert list(offsets[:3]) == [0, 3, 6] and offsets[-1] == 60
+        assert prototypes.shape == (20, 128)
+
+        gallery = SharedGallery(root)
+        gallery.publish(embeddings, names, arrays={'offsets': offsets, 'prototypes': prototypes},
+                        identities=identities, model='Facenet')
+        snapshot = gallery.snapshot()
+        assert isinstance(snapshot.arrays['prototypes'], np.memmap)
+
+        # The exact distance matches a brute-force search over every row
+        query = embeddings[31] + 0.1
+        name, distance = nearest_identity(snapshot, query, candidates=3)
+        brute = np.linalg.norm(np.vstack(embeddings) - query, axis=1)
+        assert name == names[int(brute.argmin())]
+        assert abs(distance - float(brute.min())) < 1e-4
+        print(f"   ✅ Matched {name} at distance {distance:.3f} (same as brute force)")
+
+        # Radius query: one entry per student within the radius, closest first
+        close = identities_within(snapshot, query, radius=distance + 1e-3, limit=3)
+        assert close == [(name, close[0][1])] and abs(close[0][1] - distance) < 1e-4
+        per_student = brute.reshape(20, 3).min(axis=1)
+        wide = identities_within(snapshot, query, radius=float(np.sort(per_student)[4]) + 1e-3, limit=3)
+        assert [n for n, _ in wide] == [f"{i:02d}_student" for i in np.argsort(per_student)[:3]]
+        print(f"   ✅ Radius query returned the {len(wide)} closest students")
+
+        identities, offsets, prototypes = build_identity_arrays([], [])
+        gallery.publish([], [], arrays={'offsets': offsets, 'prototypes': prototypes},
+                        identities=identities, model='Facenet')
+        assert nearest_identity(gallery.snapshot(), query) == (None, float('inf'))
+        assert identities_within(gallery.snapshot(), query, radius=1e9) == []
+        print("   ✅ Empty gallery matches nothing")
+
+def test_append_gallery():
+    """Appending a student matches a full publish of the same rows"""
+    print("🧪 Testing incremental gallery append...")
+
+    with tempfile.TemporaryDirectory() as root:
+        rng = np.random.default_rng(1)
+        embeddings = [rng.normal(size=128).astype(np.float32) for _ in range(5)]
+        names = ['01_alice', '01_alice', '02_bob', '03_carol', '03_carol']
+
+        gallery = SharedGallery(root)
+        gallery.append(embeddings[:2], names[:2], model_tag='Facenet/retinaface/v2')
+        gallery.append(embeddings[2:3], names[2:3], model_tag='Facenet/retinaface/v2')
+        version = gallery.append(embeddings[3:], names[3:], model_tag='Facenet/retinaface/v2')
+        snapshot = gallery.snapshot()
+
+        identities, offsets, prototypes = build_identity_arrays(embeddings, names)
+        assert snapshot.version == version == 3 and snapshot.names == names
+        assert snapshot.meta['identities'] == identities and list(snapshot.arrays['offsets']) == list(offsets)
+        assert np.allclose(snapshot.arrays['prototypes'], prototypes)
+        assert np.array_equal(snapshot.embeddings, np.vstack(embeddings))
+        assert nearest_identity(snapshot, embeddings[2])[0] == '02_bob'
+        print(f"   ✅ Three appends built the same gallery as one publish (version {version})")
+
+        for rows, row_names, tag in [(embeddings[:1], ['02_bob'], 'Facenet/retinaface/v2'),
+                                     (embeddings[:1], ['04_dan'], 'Facenet/opencv/v1'),
+                                     ([np.zeros(64)], ['04_dan'], 'Facenet/retinaface/v2')]:
+            try:
+                gallery.append(rows, row_names, model_tag=tag)
+                assert False, "append should refuse"
+            except ValueError:
+                pass
+        assert gallery.version == version
+        print("   ✅ Known identities, another model tag or dimension are refused")
+
+if __name__ == "__main__":
+    test_shared_gallery()
+    test_multi_embedding_gallery()
+    test_append_gallery()
+    print("\n🎉 Shared gallery tests passed!")